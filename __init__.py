@@ -30,8 +30,24 @@ __version__ = "1.0.0"
 __author__ = "Leandro Fernandes"
 __license__ = "MIT"
 
-# Exportações principais
-from analyzer.disk_analyzer import analyzer
-from main import main
+import sys
+from importlib import import_module
+from typing import Any
+
+# Exportações principais, importadas no primeiro acesso (PEP 562)
+_EXPORTS = {"main": "main", "analyzer": "analyzer.disk_analyzer"}
 
 __all__ = ["main", "analyzer", "__version__", "__author__", "__license__"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):  # sem __getattr__ de módulo: importa tudo
+    for _name in _EXPORTS:
+        __getattr__(_name)
@@ -6,12 +6,41 @@ dos discos até a geração de relatórios.
 
 Funções principais:
     analyzer(): Executa o fluxo completo de análise de discos
+    run_scan(): Núcleo não interativo que retorna resultados estruturados
+    write_reports(): Grava os relatórios de um resultado de run_scan
+    ScanService / serve_http(): Serviço HTTP/JSON local de escaneamentos
+
+As funções são importadas no primeiro acesso (PEP 562), como em ``infos``.
 
 Exemplo:
     >>> from analyzer import analyzer
     >>> analyzer()
 """
 
-from .disk_analyzer import analyzer
+import sys
+from importlib import import_module
+from typing import Any
+
+# Nome exportado -> módulo que o define
+_EXPORTS = {
+    'analyzer': '.disk_analyzer',
+    'run_scan': '.disk_analyzer',
+    'write_reports': '.disk_analyzer',
+    'ScanService': '.server',
+    'serve_http': '.server',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['analyzer']
+if sys.version_info < (3, 7):  # sem __getattr__ de módulo: importa tudo
+    for _name in __all__:
+        __getattr__(_name)
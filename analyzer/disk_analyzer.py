@@ -3,8 +3,10 @@
 Este módulo fornece funcionalidade para identificar e analisar discos
 no sistema, localizando arquivos grandes que ocupam espaço significativo.
 
-Principal função:
-    analyzer(): Executa o fluxo completo de análise de discos
+Principais funções:
+    analyzer(): Executa o fluxo completo (interativo) de análise de discos
+    run_scan(): Núcleo não interativo que retorna resultados estruturados
+    write_reports(): Grava os relatórios TXT/CSV/JSON de um resultado
 
 Exemplo:
     >>> from disk_analyzer import analyzer
@@ -14,23 +16,836 @@ Exemplo:
     >>> python main.py
 """
 
+import math
+import os
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from generators.main import generate_report, generate_csv_report
-from infos.main import get_all_disks, scan_large_files, select_disks
+from generators.main import (
+    generate_csv_report,
+    generate_diff_csv,
+    generate_json_report,
+    generate_report,
+)
+from infos.budget import ScanBudget
+from infos.checkpoint import (
+    DEFAULT_CHECKPOINT_DIR,
+    DEFAULT_CHECKPOINT_INTERVAL,
+    ScanCheckpoint,
+    ScanInterrupted,
+    checkpoint_path,
+)
+from infos.dedupe import HashCache, find_duplicates
+from infos.disks import get_all_disks
+from infos.filters import FileFilter
+from infos.histogram import FileHistogram
+from infos.index import DEFAULT_INDEX_FILE, ScanIndex
+from infos.logs import setup_logging
+from infos.main import MatchCallback, scan_large_files, select_disks
+from infos.metrics import ScanMetrics, merge_metrics
+from infos.snapshot import (
+    DEFAULT_SNAPSHOT_DIR,
+    DEFAULT_SNAPSHOT_KEEP,
+    SnapshotWriter,
+    diff_snapshots,
+    directory_hints,
+    latest_snapshot,
+    prune_snapshots,
+    snapshot_meta,
+    snapshot_path,
+    snapshot_scope,
+    summarize_diff,
+)
+from infos.throttle import Throttle
+from infos.topk import merge_top_files
+from infos.tree import DirectoryTree
 
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
-)
 logger = logging.getLogger(__name__)
 
 
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def _scan_disk(
+    disk: Dict[str, Any],
+    min_size: float,
+    max_files: int,
+    is_fast_mode: bool,
+    workers: int,
+    index: Optional[ScanIndex] = None,
+    on_match: Optional[MatchCallback] = None,
+    exclude: Optional[Sequence[str]] = None,
+    one_filesystem: bool = True,
+    rank_by: str = "apparent",
+    metrics: Optional[ScanMetrics] = None,
+    checkpoint: Optional[ScanCheckpoint] = None,
+    throttle: Optional[Throttle] = None,
+    snapshot: Optional[SnapshotWriter] = None,
+    budget: Optional[ScanBudget] = None,
+    file_filter: Optional[FileFilter] = None,
+    histogram: Optional[FileHistogram] = None,
+    stop: Optional[threading.Event] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], float]:
+    """Escaneia um disco.
+
+    Returns:
+        Tupla (arquivos grandes, diretórios mais pesados, tempo gasto)
+    """
+    disk_start = time.time()
+    logger.info(
+        f"Iniciando escaneamento do disco {disk['drive']} ({disk['mountpoint']})"
+    )
+
+    tree = DirectoryTree()
+    large_files = scan_large_files(
+        disk["mountpoint"],
+        min_size,
+        max_files,
+        is_fast_mode,
+        workers=workers,
+        index=index,
+        tree=tree,
+        on_match=on_match,
+        exclude=exclude,
+        one_filesystem=one_filesystem,
+        rank_by=rank_by,
+        metrics=metrics,
+        checkpoint=checkpoint,
+        throttle=throttle,
+        budget=budget,
+        file_filter=file_filter,
+        histogram=histogram,
+        stop=stop,
+    )
+    directories = tree.top_directories(max_files)
+    if snapshot is not None:
+        snapshot.add_tree(tree)
+    return large_files, directories, time.time() - disk_start
+
+
+def _scan_disks(
+    selected_disks: List[Dict[str, Any]],
+    min_size: float,
+    max_files: int,
+    is_fast_mode: bool,
+    workers: int = 1,
+    index: Optional[ScanIndex] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    on_match: Optional[MatchCallback] = None,
+    exclude: Optional[Sequence[str]] = None,
+    one_filesystem: bool = True,
+    rank_by: str = "apparent",
+    collect_metrics: bool = False,
+    checkpoint_for: Optional[Callable[[Dict[str, Any]], ScanCheckpoint]] = None,
+    throttle: Optional[Throttle] = None,
+    snapshot: Optional[SnapshotWriter] = None,
+    time_budget: Optional[float] = None,
+    hints: Optional[Dict[str, int]] = None,
+    file_filter: Optional[FileFilter] = None,
+    histogram: Optional[FileHistogram] = None,
+    stop: Optional[threading.Event] = None,
+) -> Tuple[
+    List[List[Dict[str, Any]]], List[List[Dict[str, Any]]], List[Dict[str, Any]]
+]:
+    """Escaneia os discos selecionados, em paralelo quando workers > 1.
+
+    As threads são divididas entre os discos: até ``workers`` discos são
+    escaneados ao mesmo tempo e cada um recebe ``workers // discos``
+    threads para dividir a própria árvore de diretórios.
+
+    Args:
+        selected_disks: Discos a escanear
+        min_size: Tamanho mínimo em GB
+        max_files: Quantidade máxima de arquivos por disco
+        is_fast_mode: Se True, usa o modo rápido
+        workers: Total de threads de escaneamento (padrão: 1)
+        index: Índice persistente para escaneamento incremental (padrão: None)
+        on_progress: Função chamada com ``(evento, dados)`` a cada disco
+            iniciado ('disk_start'), concluído ('disk_done') ou com falha
+            ('disk_error') (padrão: None)
+        on_match: Repassado a ``scan_large_files`` (padrão: None)
+        exclude: Padrões extras de exclusão de pastas (padrão: None)
+        one_filesystem: Se True, cada disco não sai do próprio sistema de
+            arquivos (padrão: True)
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent')
+        collect_metrics: Se True, o resumo de cada disco inclui as
+            métricas do escaneamento em 'metrics' (padrão: False)
+        checkpoint_for: Função que cria o checkpoint de cada disco; com
+            Ctrl+C, o estado de todos os discos em andamento é gravado
+            antes de a interrupção seguir adiante (padrão: None)
+        throttle: Limites compartilhados por todos os discos (padrão: None)
+        snapshot: Recebe os diretórios de cada disco concluído (padrão: None)
+        time_budget: Prazo total em segundos. Discos que esperam a vez
+            recebem uma parte igual do tempo restante, e o resumo de cada
+            disco inclui a cobertura em 'coverage' (padrão: None)
+        hints: Tamanho das pastas numa execução anterior, para priorizar
+            a visita com prazo (padrão: None)
+        file_filter: Filtro de arquivos de todos os discos (padrão: None)
+        histogram: Recebe os arquivos de todos os discos (padrão: None)
+        stop: Evento que para todos os discos em andamento; o Ctrl+C o
+            marca antes de seguir adiante (padrão: None, um evento próprio)
+
+    Returns:
+        Tupla (arquivos, diretórios, resumo por disco); arquivos e
+        diretórios têm uma lista por disco, cada uma ordenada por tamanho
+
+    Raises:
+        ScanInterrupted: Se ``stop`` for marcado durante o escaneamento
+    """
+    per_disk_files = []
+    per_disk_dirs = []
+    per_disk = []
+    checkpoints = []  # type: List[ScanCheckpoint]
+    total = len(selected_disks)
+    disk_workers = max(1, min(workers, total))
+    scan_workers = max(1, workers // disk_workers)
+    deadline = time.monotonic() + (time_budget or 0.0)
+    started = []  # type: List[int]
+    started_lock = threading.Lock()
+    if stop is None:
+        stop = threading.Event()
+
+    def budget_for_next_disk() -> ScanBudget:
+        # Os discos ainda não iniciados rodam em "rodadas" de disk_workers:
+        # cada rodada restante recebe uma parte igual do tempo que sobra
+        with started_lock:
+            waiting = total - len(started)
+            started.append(1)
+        rounds = math.ceil(waiting / disk_workers)
+        return ScanBudget(max(0.0, deadline - time.monotonic()) / rounds, hints)
+
+    def notify(event: str, **info: Any) -> None:
+        if on_progress is not None:
+            on_progress(event, dict(info, total=total))
+
+    def job(idx: int, disk: Dict[str, Any]) -> Any:
+        notify("disk_start", index=idx, disk=disk)
+        metrics = ScanMetrics() if collect_metrics else None
+        budget = budget_for_next_disk() if time_budget is not None else None
+        checkpoint = None
+        if checkpoint_for is not None:
+            checkpoint = checkpoint_for(disk)
+            checkpoints.append(checkpoint)
+        return _scan_disk(
+            disk,
+            min_size,
+            max_files,
+            is_fast_mode,
+            scan_workers,
+            index,
+            on_match,
+            exclude,
+            one_filesystem,
+            rank_by,
+            metrics,
+            checkpoint,
+            throttle,
+            snapshot,
+            budget,
+            file_filter,
+            histogram,
+            stop,
+        ) + (metrics, budget)
+
+    with ThreadPoolExecutor(max_workers=disk_workers) as executor:
+        futures = {
+            executor.submit(job, idx, disk): (idx, disk)
+            for idx, disk in enumerate(selected_disks, 1)
+        }
+
+        try:
+            for future in as_completed(futures):
+                idx, disk = futures[future]
+                try:
+                    (
+                        large_files,
+                        directories,
+                        disk_elapsed,
+                        metrics,
+                        budget,
+                    ) = future.result()
+                    per_disk_files.append(large_files)
+                    per_disk_dirs.append(directories)
+
+                    logger.info(
+                        f"Disco {disk['drive']}: {len(large_files)} arquivo(s) encontrado(s) em {disk_elapsed:.1f}s"
+                    )
+                    per_disk.append(
+                        {
+                            "drive": disk["drive"],
+                            "mountpoint": disk["mountpoint"],
+                            "files_found": len(large_files),
+                            "elapsed": disk_elapsed,
+                            "error": None,
+                            "metrics": metrics.to_dict() if metrics else None,
+                            "coverage": budget.coverage() if budget else None,
+                        }
+                    )
+                    notify(
+                        "disk_done",
+                        index=idx,
+                        disk=disk,
+                        files_found=len(large_files),
+                        elapsed=disk_elapsed,
+                    )
+                except ScanInterrupted:
+                    # Parada pedida por ``stop``: levantada de novo ao fim
+                    continue
+                except Exception as e:
+                    logger.error(f"Erro ao escanear {disk['drive']}: {e}")
+                    per_disk.append(
+                        {
+                            "drive": disk["drive"],
+                            "mountpoint": disk["mountpoint"],
+                            "files_found": 0,
+                            "elapsed": 0.0,
+                            "error": str(e),
+                            "metrics": None,
+                            "coverage": None,
+                        }
+                    )
+                    notify("disk_error", index=idx, disk=disk, error=str(e))
+        except KeyboardInterrupt:
+            # Os discos rodam em outras threads: pede que parem (cada um
+            # termina a pasta em andamento) e grava o estado dos que têm
+            # checkpoint antes de seguir com a interrupção
+            stop.set()
+            for future in futures:
+                future.cancel()
+            for checkpoint in checkpoints:
+                checkpoint.interrupt()
+            raise
+
+    if stop.is_set():
+        raise ScanInterrupted("Escaneamento interrompido")
+    return per_disk_files, per_disk_dirs, per_disk
+
+
+def run_scan(
+    disks: List[Dict[str, Any]],
+    min_size_gb: float = 1.0,
+    max_files: int = 50,
+    fast_mode: bool = True,
+    workers: int = 1,
+    index_path: Optional[str] = None,
+    check_duplicates: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+    on_match: Optional[MatchCallback] = None,
+    exclude: Optional[Sequence[str]] = None,
+    one_filesystem: bool = True,
+    rank_by: str = "apparent",
+    collect_metrics: bool = False,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+    checkpoint_dirs: int = 0,
+    throttle: Optional[Throttle] = None,
+    snapshot_dir: Optional[str] = None,
+    time_budget: Optional[float] = None,
+    file_filter: Optional[FileFilter] = None,
+    histograms: bool = False,
+    stop: Optional[threading.Event] = None,
+    snapshot_keep: int = DEFAULT_SNAPSHOT_KEEP,
+) -> Dict[str, Any]:
+    """Executa o escaneamento sem interação e retorna resultados estruturados.
+
+    Núcleo não interativo do analisador: não imprime nada nem lê da
+    entrada padrão (apenas registra no log), podendo ser embutido em
+    outros serviços Python.
+
+    Args:
+        disks: Discos a escanear (formato de ``get_all_disks``)
+        min_size_gb: Tamanho mínimo dos arquivos em GB (padrão: 1.0)
+        max_files: Quantidade máxima de arquivos por disco (padrão: 50)
+        fast_mode: Se True, usa o modo rápido (padrão: True)
+        workers: Total de threads de escaneamento (padrão: 1)
+        index_path: Arquivo do índice incremental; None desativa o modo
+            incremental (padrão: None)
+        check_duplicates: Se True, procura duplicados entre os arquivos
+            encontrados (padrão: False)
+        on_progress: Função chamada a cada evento de disco (padrão: None)
+        on_match: Chamada com ``(tamanho, caminho, mtime, alocado)`` para cada
+            arquivo grande assim que encontrado, ex: ``StreamSink.write``
+            (padrão: None)
+        exclude: Padrões extras de exclusão de pastas: nomes, globs,
+            caminhos ancorados e negações ``!padrão`` (padrão: None)
+        one_filesystem: Se True, cada disco é escaneado sem atravessar
+            outros pontos de montagem (como ``du -x``), de modo que cada
+            byte seja lido uma única vez (padrão: True)
+        rank_by: Ordena e filtra pelo tamanho aparente ('apparent') ou
+            pelo espaço ocupado em disco ('allocated'). Hardlinks de um
+            mesmo arquivo contam uma única vez (padrão: 'apparent')
+        collect_metrics: Se True, instrumenta o escaneamento e preenche
+            'metrics' no resultado (padrão: False)
+        checkpoint_dir: Pasta onde cada disco grava periodicamente um
+            checkpoint do escaneamento; None desativa (padrão: None)
+        resume: Se True, discos com checkpoint compatível em
+            ``checkpoint_dir`` continuam de onde pararam (padrão: False)
+        checkpoint_interval: Segundos entre checkpoints (padrão: 60)
+        checkpoint_dirs: Também grava a cada N pastas; 0 desativa (padrão: 0)
+        throttle: Limites de pastas/stat por segundo e pausas por carga,
+            compartilhados por todos os discos (ver ``infos.throttle``)
+            (padrão: None)
+        snapshot_dir: Pasta onde gravar um snapshot da execução (arquivos
+            acima do tamanho mínimo e todos os diretórios) e comparar com o
+            snapshot anterior de mesmo escopo; None desativa (padrão: None)
+        time_budget: Prazo em segundos para o escaneamento aproximado: as
+            pastas com mais bytes estimados (pelo snapshot anterior em
+            ``snapshot_dir``, se houver) são visitadas primeiro e, no fim
+            do prazo, vale o melhor top-N encontrado. Escaneamentos
+            incompletos não gravam snapshot (padrão: None, sem prazo)
+        file_filter: Expressões que os arquivos precisam satisfazer
+            (extensão, nome, caminho, tamanho, idade, dono), avaliadas na
+            travessia: quem falha pelo nome nem chega a receber um stat.
+            Os totais dos diretórios passam a somar só os arquivos que
+            passam pelo filtro (ver ``infos.filters``) (padrão: None)
+        histograms: Se True, registra tamanho, idades e extensão de todos
+            os arquivos contados (não só os grandes) e preenche
+            'histograms'; o índice incremental não é consultado nessa
+            execução (ver ``infos.histogram``) (padrão: False)
+        stop: Evento que, marcado de outra thread, para o escaneamento de
+            todos os discos ao fim da pasta em andamento (padrão: None)
+        snapshot_keep: Snapshots mantidos por escopo em ``snapshot_dir``;
+            depois de gravar o novo, os mais antigos são apagados. 0 mantém
+            todos (padrão: 10)
+
+    Returns:
+        Dicionário com:
+        - disks: Discos escaneados
+        - settings: Parâmetros usados
+        - files: Arquivos grandes, do maior para o menor
+        - directories: Diretórios mais pesados, do maior para o menor
+        - duplicates: Grupos de duplicados (ou None se não solicitado)
+        - per_disk: Resumo de cada disco (arquivos, tempo, erro)
+        - index: Pastas do cache/reescaneadas (ou None)
+        - timing: Tempos de escaneamento e de busca de duplicados (s)
+        - throttle: Tempo de espera pelos limites e de pausas por carga
+          (ou None sem ``throttle``)
+        - snapshot: Snapshot gravado e o anterior comparado (ou None)
+        - diff: Diferença para o snapshot anterior (ver
+          ``infos.snapshot.summarize_diff``), com 'old' e 'new' contendo
+          o cabeçalho de cada snapshot (ou None)
+        - coverage: Cobertura do escaneamento com prazo, somada entre os
+          discos: pastas visitadas e pendentes, fração visitada, bytes
+          vistos e estimativa de bytes não escaneados (ou None sem prazo;
+          a de cada disco fica em per_disk)
+        - metrics: Métricas da execução (ou None se não solicitado):
+          totais, taxas, tempo por fase, erros por errno, pastas mais
+          lentas e as métricas de cada disco em 'disks'
+        - histograms: Distribuição dos arquivos de todos os discos por
+          faixa de tamanho, idade (modificação e acesso) e extensão (ver
+          ``FileHistogram.summarize``) (ou None se não solicitado)
+
+    Raises:
+        ScanInterrupted: Se ``stop`` for marcado durante o escaneamento
+
+    Example:
+        >>> result = run_scan(get_all_disks()[:1], min_size_gb=2.0)
+        >>> result['files'][0]['path']
+    """
+    settings = {
+        "min_size_gb": min_size_gb,
+        "max_files": max_files,
+        "fast_mode": fast_mode,
+        "workers": workers,
+        "incremental": index_path is not None,
+        "check_duplicates": check_duplicates,
+        "exclude": list(exclude or []),
+        "one_filesystem": one_filesystem,
+        "rank_by": rank_by,
+        "collect_metrics": collect_metrics,
+        "checkpoint_dir": checkpoint_dir,
+        "resume": resume,
+        "throttled": throttle is not None,
+        "snapshot_dir": snapshot_dir,
+        "snapshot_keep": snapshot_keep,
+        "time_budget": time_budget,
+        "filter": list(file_filter.expressions) if file_filter else [],
+        "histograms": histograms,
+    }
+    logger.info(f"Escaneamento iniciado: {settings}")
+    scan_start = time.time()
+
+    def checkpoint_for(disk: Dict[str, Any]) -> ScanCheckpoint:
+        return ScanCheckpoint(
+            checkpoint_path(checkpoint_dir, disk["mountpoint"]),
+            checkpoint_interval,
+            checkpoint_dirs,
+            resume,
+        )
+
+    snapshot = None
+    hints = None
+    if snapshot_dir is not None:
+        scope = snapshot_scope(
+            (disk["mountpoint"] for disk in disks),
+            min_size_gb * (1024**3),
+            fast_mode,
+            exclude or [],
+            one_filesystem,
+            rank_by,
+            file_filter.expressions if file_filter else (),
+        )
+        snapshot = SnapshotWriter(snapshot_path(snapshot_dir, scope), scope)
+        on_match = _chain_matches(on_match, snapshot.add_file)
+
+        previous = latest_snapshot(snapshot_dir, scope)
+        if time_budget is not None and previous is not None:
+            try:
+                hints = directory_hints(previous)
+                logger.info(f"Prioridade pelo snapshot anterior: {len(hints)} pasta(s)")
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"Snapshot anterior ilegível ({previous}): {e}")
+
+    index = ScanIndex(index_path) if index_path is not None else None
+    histogram = FileHistogram() if histograms else None
+    try:
+        per_disk_files, per_disk_dirs, per_disk = _scan_disks(
+            disks,
+            min_size_gb,
+            max_files,
+            fast_mode,
+            workers,
+            index,
+            on_progress,
+            on_match,
+            exclude,
+            one_filesystem,
+            rank_by,
+            collect_metrics,
+            checkpoint_for if checkpoint_dir is not None else None,
+            throttle,
+            snapshot,
+            time_budget,
+            hints,
+            file_filter,
+            histogram,
+            stop,
+        )
+    except BaseException:
+        if snapshot is not None:
+            snapshot.discard()
+        raise
+    finally:
+        if index is not None:
+            index.close()
+
+    scan_elapsed = time.time() - scan_start
+    logger.info(f"Escaneamento concluído em {scan_elapsed:.1f}s")
+    if throttle is not None:
+        logger.info(
+            f"   • Modo de baixa prioridade: {throttle.throttled_seconds:.1f}s de "
+            f"espera pelos limites | {throttle.pauses} pausa(s) por carga, "
+            f"{throttle.paused_seconds:.1f}s"
+        )
+
+    coverage = None
+    if time_budget is not None:
+        coverage = _run_coverage(per_disk)
+        unscanned = coverage["unscanned_bytes_estimate"]
+        logger.info(
+            f"   • Cobertura: {coverage['directory_fraction']:.0%} das pastas "
+            f"conhecidas ({'prazo esgotado' if coverage['exhausted'] else 'completo'})"
+            + (
+                f", ~{unscanned / (1024**3):.2f} GB não escaneados"
+                if unscanned is not None
+                else ""
+            )
+        )
+
+    logger.info("Intercalando arquivos por tamanho...")
+    total_limit = max_files * len(disks)
+    all_large_files = merge_top_files(per_disk_files, total_limit, rank_by)
+    heaviest_dirs = merge_top_files(per_disk_dirs, total_limit)
+    logger.info(
+        f"Total de arquivos no relatório: {len(all_large_files)} (limite: {total_limit})"
+    )
+
+    duplicates = None
+    dedupe_elapsed = 0.0
+    if check_duplicates:
+        logger.info("Procurando arquivos duplicados...")
+        dedupe_start = time.time()
+        with HashCache() as cache:
+            duplicates = find_duplicates(
+                all_large_files, workers=max(workers, 4), cache=cache
+            )
+        dedupe_elapsed = time.time() - dedupe_start
+        logger.info(f"Busca de duplicados concluída em {dedupe_elapsed:.1f}s")
+
+    snapshot_info = None
+    diff = None
+    snapshot_elapsed = 0.0
+    if snapshot is not None:
+        snapshot_start = time.time()
+        snapshot_info, diff = _save_snapshot(
+            snapshot,
+            snapshot_dir,
+            per_disk,
+            all_large_files,
+            total_limit,
+            snapshot_keep,
+        )
+        snapshot_elapsed = time.time() - snapshot_start
+
+    return {
+        "disks": disks,
+        "settings": settings,
+        "files": all_large_files,
+        "directories": heaviest_dirs,
+        "duplicates": duplicates,
+        "per_disk": per_disk,
+        "index": (
+            {"cache_hits": index.cache_hits, "rescanned": index.rescanned}
+            if index is not None
+            else None
+        ),
+        "timing": {
+            "scan": scan_elapsed,
+            "duplicates": dedupe_elapsed,
+            "snapshot": snapshot_elapsed,
+        },
+        "throttle": throttle.to_dict() if throttle is not None else None,
+        "snapshot": snapshot_info,
+        "diff": diff,
+        "coverage": coverage,
+        "histograms": histogram.summarize() if histogram is not None else None,
+        "metrics": (
+            _run_metrics(
+                per_disk, scan_elapsed, dedupe_elapsed, throttle, snapshot_elapsed
+            )
+            if collect_metrics
+            else None
+        ),
+    }
+
+
+def _run_coverage(per_disk: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Soma a cobertura dos discos de uma execução com prazo."""
+    coverages = [disk["coverage"] for disk in per_disk if disk["coverage"]]
+    visited = sum(c["directories_visited"] for c in coverages)
+    pending = sum(c["directories_pending"] for c in coverages)
+    unscanned = [c["unscanned_bytes_estimate"] for c in coverages]
+    return {
+        "exhausted": any(c["exhausted"] for c in coverages),
+        "directories_visited": visited,
+        "directories_pending": pending,
+        "directory_fraction": (
+            visited / (visited + pending) if visited + pending else 1.0
+        ),
+        "bytes_seen": sum(c["bytes_seen"] for c in coverages),
+        "unscanned_bytes_estimate": (
+            sum(unscanned) if unscanned and None not in unscanned else None
+        ),
+    }
+
+
+def _chain_matches(
+    first: Optional[MatchCallback], second: MatchCallback
+) -> MatchCallback:
+    """Combina dois callbacks ``on_match`` em um."""
+    if first is None:
+        return second
+
+    def both(size: int, path: str, mtime: float, allocated: int) -> None:
+        first(size, path, mtime, allocated)
+        second(size, path, mtime, allocated)
+
+    return both
+
+
+def _save_snapshot(
+    snapshot: SnapshotWriter,
+    snapshot_dir: str,
+    per_disk: List[Dict[str, Any]],
+    files: List[Dict[str, Any]],
+    limit: int,
+    keep: int = DEFAULT_SNAPSHOT_KEEP,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Grava o snapshot da execução e o compara com o anterior.
+
+    Depois da comparação, apaga os snapshots do escopo além dos ``keep``
+    mais recentes (0 mantém todos).
+
+    Returns:
+        Tupla (snapshot gravado, diferença para o anterior), com None
+        onde não houver
+    """
+    failed = [
+        disk["drive"]
+        for disk in per_disk
+        if disk["error"] is not None
+        or (disk["coverage"] is not None and disk["coverage"]["exhausted"])
+    ]
+    if failed:
+        # O que não foi visto apareceria como removido na próxima comparação
+        snapshot.discard()
+        logger.warning(
+            f"Snapshot não gravado: escaneamento incompleto em {', '.join(failed)}"
+        )
+        return None, None
+
+    # Ao retomar um checkpoint, achados anteriores a ele não passam por on_match
+    for file in files:
+        snapshot.add_file(
+            file["size_bytes"], file["path"], file.mtime, file["allocated_bytes"]
+        )
+    previous = latest_snapshot(snapshot_dir, snapshot.meta["scope"])
+    records = snapshot.close()
+    logger.info(f"Snapshot salvo em {snapshot.path} ({records} registros)")
+
+    info = {"path": snapshot.path, "records": records, "previous": previous}
+    diff = None
+    if previous is None:
+        logger.info("Nenhum snapshot anterior com os mesmos parâmetros para comparar")
+    else:
+        try:
+            diff = summarize_diff(diff_snapshots(previous, snapshot.path), limit)
+            diff["old"] = snapshot_meta(previous)
+            diff["new"] = snapshot.meta
+        except (OSError, ValueError, EOFError) as e:
+            logger.error(f"Falha ao comparar com o snapshot {previous}: {e}")
+            diff = None
+
+    try:
+        removed = prune_snapshots(snapshot_dir, snapshot.meta["scope"], keep)
+    except OSError as e:
+        logger.warning(f"Falha ao apagar snapshots antigos: {e}")
+    else:
+        if removed:
+            logger.info(f"{len(removed)} snapshot(s) antigo(s) apagado(s)")
+    if diff is None:
+        return info, None
+
+    files_total = diff["totals"]["files"]
+    grown = (files_total["grown"]["bytes"] + files_total["new"]["bytes"]) / (1024**3)
+    logger.info(
+        f"Desde {diff['old']['created_at']}: "
+        f"{files_total['new']['count']} arquivo(s) novo(s) e "
+        f"{files_total['grown']['count']} que cresceram (+{grown:.2f} GB), "
+        f"{files_total['deleted']['count']} removido(s)"
+    )
+    return info, diff
+
+
+def _run_metrics(
+    per_disk: List[Dict[str, Any]],
+    scan_elapsed: float,
+    dedupe_elapsed: float,
+    throttle: Optional[Throttle] = None,
+    snapshot_elapsed: float = 0.0,
+) -> Dict[str, Any]:
+    """Consolida as métricas dos discos de uma execução."""
+    disks = {
+        disk["mountpoint"]: disk["metrics"]
+        for disk in per_disk
+        if disk["metrics"] is not None
+    }
+    metrics = merge_metrics(disks.values())
+    metrics["directories_per_second"] = (
+        metrics["directories"] / scan_elapsed if scan_elapsed else 0.0
+    )
+    metrics["entries_per_second"] = (
+        metrics["entries"] / scan_elapsed if scan_elapsed else 0.0
+    )
+    metrics["phases"] = {
+        "scan": scan_elapsed,
+        "duplicates": dedupe_elapsed,
+        "snapshot": snapshot_elapsed,
+    }
+    metrics["disks"] = disks
+    if throttle is not None:
+        metrics["throttle"] = throttle.to_dict()
+    return metrics
+
+
+def write_reports(
+    result: Dict[str, Any],
+    txt_file: Optional[str] = "relatorio_discos.txt",
+    csv_file: Optional[str] = "relatorio_arquivos.csv",
+    json_file: Optional[str] = None,
+    diff_csv_file: Optional[str] = "relatorio_diferencas.csv",
+    columnar_file: Optional[str] = None,
+) -> float:
+    """Grava os relatórios de um resultado de ``run_scan``.
+
+    Args:
+        result: Resultado retornado por ``run_scan``
+        txt_file: Relatório TXT; None para não gerar
+        csv_file: Relatório CSV; None para não gerar
+        json_file: Relatório JSON; None para não gerar, '-' para stdout
+        diff_csv_file: CSV da diferença para o snapshot anterior, gerado
+            só quando o resultado tiver uma; None para não gerar
+        columnar_file: Exportação colunar dos arquivos (Parquet/Arrow com
+            ``pyarrow``, senão formato próprio); None para não gerar
+
+    Returns:
+        Tempo gasto na geração dos relatórios (s)
+    """
+    logger.info("Iniciando geração de relatórios...")
+    report_start = time.time()
+
+    if txt_file is not None:
+        generate_report(
+            result["disks"],
+            result["files"],
+            txt_file,
+            directories=result["directories"],
+            duplicates=result["duplicates"],
+            diff=result.get("diff"),
+            coverage=result.get("coverage"),
+            filters=result["settings"].get("filter"),
+            histograms=result.get("histograms"),
+        )
+    if csv_file is not None:
+        generate_csv_report(
+            result["files"],
+            csv_file,
+            directories=result["directories"],
+            duplicates=result["duplicates"],
+            histograms=result.get("histograms"),
+        )
+    if columnar_file is not None:
+        # Sob demanda: com pyarrow instalado, a importação custa caro
+        from generators.columnar import generate_columnar_report
+
+        generate_columnar_report(
+            result["files"],
+            columnar_file,
+            [disk["mountpoint"] for disk in result["disks"]],
+        )
+    if diff_csv_file is not None and result.get("diff") is not None:
+        generate_diff_csv(result["diff"], diff_csv_file)
+    if json_file is not None:
+        generate_json_report(result, json_file)
+
+    report_elapsed = time.time() - report_start
+    logger.info(f"Relatórios gerados em {report_elapsed:.1f}s")
+    if result.get("metrics") is not None:
+        result["metrics"]["phases"]["reports"] = report_elapsed
+    return report_elapsed
+
+
+def _print_disk_progress(event: str, info: Dict[str, Any]) -> None:
+    """Exibe no terminal o progresso de cada disco (modo interativo)."""
+    prefix = f"[{info['index']}/{info['total']}]"
+    drive = info["disk"]["drive"]
+
+    if event == "disk_start":
+        print(f"\n📂 {prefix} Escaneando disco: {drive}")
+    elif event == "disk_done":
+        print(
+            f"   ✓ {prefix} {drive}: {info['files_found']} arquivo(s) grande(s) encontrado(s) ({info['elapsed']:.1f}s)"
+        )
+    elif event == "disk_error":
+        print(f"   ✗ {prefix} Erro ao escanear {drive}: {info['error']}")
+
+
 def analyzer() -> None:
     """Executa o analisador de discos completo.
 
@@ -51,8 +866,14 @@ def analyzer() -> None:
 
     Note:
         Os relatórios são salvos como 'relatorio_discos.txt' e
-        'relatorio_arquivos.csv' no diretório atual.
+        'relatorio_arquivos.csv' no diretório atual. Cada execução grava um
+        snapshot em 'snapshots_escaneamento/' e, havendo um anterior com os
+        mesmos parâmetros, o que mudou desde ele vai para uma seção do TXT
+        e para 'relatorio_diferencas.csv'. No modo completo, o
+        progresso de cada disco é salvo em 'checkpoints_escaneamento/' e
+        pode ser retomado na próxima execução após um Ctrl+C.
     """
+    setup_logging()
     start_time = time.time()
 
     print("=" * 80)
@@ -105,62 +926,66 @@ def analyzer() -> None:
     max_files = int(max_files) if max_files else 50
     logger.info(f"Máximo de arquivos por disco: {max_files}")
 
-    all_large_files = []
+    workers = input("Quantidade de threads de escaneamento (padrão 1): ").strip()
+    workers = max(1, int(workers)) if workers else 1
+    logger.info(f"Threads de escaneamento: {workers}")
 
-    print("\n" + "=" * 80)
-    print("INICIANDO ESCANEAMENTO...")
-    print("=" * 80)
-    logger.info("Escaneamento iniciado")
-    print()
+    incremental = input(
+        "Usar índice incremental (reaproveita pastas inalteradas)? (s/N): "
+    ).strip().lower() in ["s", "sim", "y", "yes"]
+    logger.info(f"Modo incremental: {'sim' if incremental else 'não'}")
 
-    scan_start_time = time.time()
+    check_duplicates = input(
+        "Procurar duplicados entre os arquivos encontrados? (s/N): "
+    ).strip().lower() in ["s", "sim", "y", "yes"]
+    logger.info(f"Busca de duplicados: {'sim' if check_duplicates else 'não'}")
 
-    for idx, disk in enumerate(selected_disks, 1):
-        disk_start = time.time()
-        print(f"\n📂 [{idx}/{len(selected_disks)}] Escaneando disco: {disk['drive']}")
-        logger.info(
-            f"Iniciando escaneamento do disco {disk['drive']} ({disk['mountpoint']})"
-        )
-
-        try:
-            large_files = scan_large_files(
-                disk["mountpoint"], min_size, max_files, is_fast_mode
-            )
-            all_large_files.extend(large_files)
-
-            disk_elapsed = time.time() - disk_start
-            logger.info(
-                f"Disco {disk['drive']}: {len(large_files)} arquivo(s) encontrado(s) em {disk_elapsed:.1f}s"
-            )
+    # O modo completo pode levar horas: grava checkpoints e oferece retomar
+    checkpoint_dir = None
+    resume = False
+    if not is_fast_mode:
+        checkpoint_dir = DEFAULT_CHECKPOINT_DIR
+        interrupted = [
+            disk
+            for disk in selected_disks
+            if os.path.exists(checkpoint_path(checkpoint_dir, disk["mountpoint"]))
+        ]
+        if interrupted:
             print(
-                f"   ✓ {len(large_files)} arquivo(s) grande(s) encontrado(s) ({disk_elapsed:.1f}s)"
+                f"\n⏸  Escaneamento interrompido encontrado para: "
+                f"{', '.join(d['drive'] for d in interrupted)}"
             )
-        except Exception as e:
-            logger.error(f"Erro ao escanear {disk['drive']}: {e}")
-            print(f"   ✗ Erro ao escanear: {e}")
+            resume = input(
+                "Retomar de onde parou? (S/n): "
+            ).strip().lower() not in ["n", "nao", "não", "no"]
+            logger.info(f"Retomar checkpoint: {'sim' if resume else 'não'}")
 
-    scan_elapsed = time.time() - scan_start_time
-    logger.info(f"Escaneamento concluído em {scan_elapsed:.1f}s")
-
-    logger.info("Ordenando arquivos por tamanho...")
-    all_large_files.sort(key=lambda x: x["size_bytes"], reverse=True)
+    print("\n" + "=" * 80)
+    print("INICIANDO ESCANEAMENTO...")
+    print("=" * 80)
+    print()
 
-    total_limit = max_files * len(selected_disks)
-    all_large_files = all_large_files[:total_limit]
-    logger.info(
-        f"Total de arquivos no relatório: {len(all_large_files)} (limite: {total_limit})"
+    result = run_scan(
+        selected_disks,
+        min_size,
+        max_files,
+        is_fast_mode,
+        workers,
+        index_path=DEFAULT_INDEX_FILE if incremental else None,
+        check_duplicates=check_duplicates,
+        on_progress=_print_disk_progress,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        snapshot_dir=DEFAULT_SNAPSHOT_DIR,
     )
+    all_large_files = result["files"]
+    duplicates = result["duplicates"]
 
     print("\n" + "=" * 80)
     print("GERANDO RELATÓRIOS...")
     print("=" * 80)
-    logger.info("Iniciando geração de relatórios...")
 
-    report_start = time.time()
-    generate_report(selected_disks, all_large_files)
-    generate_csv_report(all_large_files)
-    report_elapsed = time.time() - report_start
-    logger.info(f"Relatórios gerados em {report_elapsed:.1f}s")
+    report_elapsed = write_reports(result)
 
     total_elapsed = time.time() - start_time
     total_time_str = str(timedelta(seconds=int(total_elapsed)))
@@ -172,10 +997,38 @@ def analyzer() -> None:
 
     if all_large_files:
         total_size = sum(f["size_gb"] for f in all_large_files)
-        print(f"💾 Tamanho total dos arquivos listados: {total_size:.2f} GB")
+        total_allocated = sum(f["allocated_gb"] for f in all_large_files)
+        print(
+            f"💾 Tamanho total dos arquivos listados: {total_size:.2f} GB "
+            f"({total_allocated:.2f} GB ocupados em disco)"
+        )
+
+    if duplicates:
+        reclaimable = sum(group["reclaimable_gb"] for group in duplicates)
+        print(
+            f"♻️  {len(duplicates)} grupo(s) de duplicados | "
+            f"{reclaimable:.2f} GB recuperáveis"
+        )
+
+    diff = result["diff"]
+    if diff is not None:
+        files = diff["totals"]["files"]
+        growth = (files["grown"]["bytes"] + files["new"]["bytes"]) / (1024**3)
+        print(
+            f"📈 Desde {diff['old']['created_at']}: {files['new']['count']} "
+            f"arquivo(s) novo(s) e {files['grown']['count']} que cresceram "
+            f"(+{growth:.2f} GB)"
+        )
 
     print(f"\n⏱️  Tempo de execução: {total_time_str}")
-    print(f"   • Escaneamento: {scan_elapsed:.1f}s")
+    print(f"   • Escaneamento: {result['timing']['scan']:.1f}s")
+    if result["index"] is not None:
+        print(
+            f"   • Índice: {result['index']['cache_hits']} pasta(s) do cache | "
+            f"{result['index']['rescanned']} reescaneada(s)"
+        )
+    if check_duplicates:
+        print(f"   • Busca de duplicados: {result['timing']['duplicates']:.1f}s")
     print(f"   • Geração de relatórios: {report_elapsed:.1f}s")
 
     logger.info(f"Execução completa em {total_time_str}")
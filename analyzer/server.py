@@ -0,0 +1,660 @@
+"""Serviço HTTP/JSON local com fila de escaneamentos e resultados em cache.
+
+Painéis e outros serviços perguntam "maiores arquivos de /dados" sem que
+cada um rode o próprio ``analyzer()``: o servidor recebe pedidos de
+escaneamento, roda ``run_scan`` numa fila com limite de concorrência e
+guarda os resultados recentes.
+
+    - Pedidos idênticos (mesmos parâmetros normalizados) enquanto um
+      escaneamento está na fila ou rodando são agrupados nele
+    - Resultados concluídos ficam em cache por ``cache_ttl`` segundos;
+      acima de ``cache_size`` resultados, os mais antigos saem primeiro
+    - No máximo ``max_scans`` escaneamentos rodam ao mesmo tempo; os
+      demais esperam na fila, em ordem de chegada
+
+API (só biblioteca padrão, JSON em UTF-8):
+
+    POST   /scans                       Envia um escaneamento (202; 200 se
+                                        já estiver em cache)
+    GET    /scans                       Lista os escaneamentos conhecidos
+    GET    /scans/<id>                  Estado e progresso
+    GET    /scans/<id>/result           Resumo do resultado (sem as listas)
+    GET    /scans/<id>/files            Arquivos, paginados (offset, limit)
+    GET    /scans/<id>/directories      Diretórios, paginados (offset, limit)
+    DELETE /scans/<id>                  Cancela um escaneamento (na fila ou
+                                        rodando, ao fim da pasta em curso)
+    GET    /health                      Contadores do serviço
+
+Classes:
+    ScanService: Fila de escaneamentos, agrupamento e cache
+
+Funções:
+    serve_http(): Atende a API numa thread própria
+"""
+
+import http.server
+import itertools
+import json
+import logging
+import math
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from infos.checkpoint import ScanInterrupted
+from infos.disks import get_disk_for_path
+from infos.filters import FileFilter
+
+from .disk_analyzer import run_scan
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_SCANS = 2
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_CACHE_SIZE = 32
+
+# Itens por página de /files e /directories
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Maior corpo aceito num POST
+MAX_BODY_BYTES = 64 * 1024
+
+# Parâmetros aceitos num pedido e seus valores padrão
+SCAN_DEFAULTS = {
+    "paths": [],
+    "min_size_gb": 1.0,
+    "max_files": 50,
+    "fast_mode": True,
+    "workers": 1,
+    "exclude": [],
+    "one_filesystem": True,
+    "rank_by": "apparent",
+    "filter": [],
+    "duplicates": False,
+    "histograms": False,
+}
+
+# Estados de um escaneamento
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def _string_list(params: Dict[str, Any], name: str) -> List[str]:
+    value = params[name]
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"'{name}' deve ser uma lista de textos")
+    return value
+
+
+def _number(params: Dict[str, Any], name: str, kind: type, low: float) -> Any:
+    value = params[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{name}' deve ser um número")
+    # JSON aceita NaN e 1e400 (inf): int(inf) levantaria OverflowError
+    if not math.isfinite(value):
+        raise ValueError(f"'{name}' deve ser um número finito")
+    if kind is int and value != int(value):
+        raise ValueError(f"'{name}' deve ser um inteiro")
+    if value < low:
+        raise ValueError(f"'{name}' deve ser >= {low}")
+    return kind(value)
+
+
+def _flag(params: Dict[str, Any], name: str) -> bool:
+    if not isinstance(params[name], bool):
+        raise ValueError(f"'{name}' deve ser true ou false")
+    return params[name]
+
+
+class _Job:
+    """Um escaneamento: parâmetros, estado, progresso e resultado."""
+
+    def __init__(self, job_id: str, key: str, params: Dict[str, Any]) -> None:
+        self.id = job_id
+        self.key = key
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None  # type: Optional[float]
+        self.finished_at = None  # type: Optional[float]
+        self.error = None  # type: Optional[str]
+        self.result = None  # type: Optional[Dict[str, Any]]
+        self.future = None
+        # Marcado para parar o escaneamento em curso (DELETE ou encerramento)
+        self.stop = threading.Event()
+        # Pedidos atendidos por este escaneamento (o original + agrupados)
+        self.requests = 1
+        self.disks_done = 0
+        self.large_files_seen = 0
+        self.current = []  # type: List[str]
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def reusable(self) -> bool:
+        """Se pedidos idênticos podem ser atendidos por este escaneamento."""
+        return self.status == DONE or (self.active and not self.stop.is_set())
+
+    def on_progress(self, event: str, info: Dict[str, Any]) -> None:
+        mountpoint = info["disk"]["mountpoint"]
+        with self._lock:
+            if event == "disk_start":
+                self.current.append(mountpoint)
+            else:
+                self.disks_done += 1
+                if mountpoint in self.current:
+                    self.current.remove(mountpoint)
+
+    def on_match(self, size: int, path: str, mtime: float, allocated: int) -> None:
+        with self._lock:
+            self.large_files_seen += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializável em JSON (sem as listas do resultado)."""
+        now = self.finished_at or time.time()
+        with self._lock:
+            progress = {
+                "disks_total": len(self.params["paths"]),
+                "disks_done": self.disks_done,
+                "scanning": list(self.current),
+                "large_files_seen": self.large_files_seen,
+                "elapsed": now - self.started_at if self.started_at else 0.0,
+            }
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "requests": self.requests,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "cancelling": self.status == RUNNING and self.stop.is_set(),
+            "progress": progress,
+        }
+
+
+class ScanService:
+    """Fila de escaneamentos com agrupamento de pedidos e cache.
+
+    Args:
+        max_scans: Escaneamentos rodando ao mesmo tempo; os demais esperam
+            na fila (padrão: 2)
+        cache_ttl: Segundos em que um resultado concluído atende pedidos
+            idênticos (padrão: 300)
+        cache_size: Máximo de escaneamentos concluídos guardados (ao
+            menos 1); acima disso saem os que terminaram há mais tempo
+            (padrão: 32)
+        allowed_roots: Se informado, só caminhos dentro destas pastas
+            podem ser escaneados (padrão: None, qualquer caminho)
+        max_workers: Maior ``workers`` aceito num pedido (padrão: 8)
+
+    Exemplo:
+        >>> service = ScanService(max_scans=1)
+        >>> job, reused = service.submit({'paths': ['/dados'], 'min_size_gb': 0.5})
+        >>> service.wait(job['id'])['status']
+        'done'
+    """
+
+    def __init__(
+        self,
+        max_scans: int = DEFAULT_MAX_SCANS,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        allowed_roots: Optional[Sequence[str]] = None,
+        max_workers: int = 8,
+    ) -> None:
+        self.max_scans = max(1, max_scans)
+        self.cache_ttl = cache_ttl
+        self.cache_size = max(1, cache_size)
+        self.allowed_roots = [
+            os.path.realpath(root) for root in allowed_roots or []
+        ] or None
+        self.max_workers = max(1, max_workers)
+        self.coalesced = 0
+        self.cache_hits = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}  # type: Dict[str, _Job]
+        # Escaneamento mais recente de cada conjunto de parâmetros
+        self._by_key = {}  # type: Dict[str, _Job]
+        # Concluídos (com sucesso ou não), do mais antigo ao mais recente
+        self._finished = OrderedDict()  # type: OrderedDict
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_scans, thread_name_prefix="scan-job"
+        )
+
+    # Pedidos
+
+    def normalize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Valida um pedido e o completa com os valores padrão.
+
+        Os caminhos viram absolutos, sem repetição e em ordem, para que
+        pedidos equivalentes tenham a mesma chave.
+
+        Raises:
+            ValueError: Parâmetro desconhecido, inválido ou caminho
+                inexistente ou fora de ``allowed_roots``
+        """
+        if not isinstance(params, Mapping):
+            raise ValueError("O pedido deve ser um objeto JSON")
+        unknown = sorted(set(params) - set(SCAN_DEFAULTS))
+        if unknown:
+            raise ValueError(f"Parâmetro(s) desconhecido(s): {', '.join(unknown)}")
+        params = dict(SCAN_DEFAULTS, **params)
+
+        paths = sorted(
+            {os.path.realpath(path) for path in _string_list(params, "paths")}
+        )
+        if not paths:
+            raise ValueError("Informe ao menos um caminho em 'paths'")
+        for path in paths:
+            if not os.path.isdir(path):
+                raise ValueError(f"Diretório inexistente: {path}")
+            if self.allowed_roots is not None and not any(
+                path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+                for root in self.allowed_roots
+            ):
+                raise ValueError(f"Caminho fora das pastas permitidas: {path}")
+
+        if params["rank_by"] not in ("apparent", "allocated"):
+            raise ValueError("'rank_by' deve ser 'apparent' ou 'allocated'")
+        expressions = _string_list(params, "filter")
+        FileFilter(expressions)  # valida as expressões
+
+        workers = _number(params, "workers", int, 1)
+        if workers > self.max_workers:
+            raise ValueError(f"'workers' deve ser <= {self.max_workers}")
+        return {
+            "paths": paths,
+            "min_size_gb": _number(params, "min_size_gb", float, 0),
+            "max_files": _number(params, "max_files", int, 1),
+            "fast_mode": _flag(params, "fast_mode"),
+            "workers": workers,
+            "exclude": _string_list(params, "exclude"),
+            "one_filesystem": _flag(params, "one_filesystem"),
+            "rank_by": params["rank_by"],
+            "filter": expressions,
+            "duplicates": _flag(params, "duplicates"),
+            "histograms": _flag(params, "histograms"),
+        }
+
+    def submit(self, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Envia um escaneamento, ou reaproveita um idêntico.
+
+        Args:
+            params: Parâmetros do pedido (ver ``SCAN_DEFAULTS``)
+
+        Returns:
+            Tupla (estado do escaneamento, reaproveitado?): reaproveitado
+            quando um pedido idêntico está na fila, rodando ou concluído
+            há menos de ``cache_ttl`` segundos
+
+        Raises:
+            ValueError: Pedido inválido (ver ``normalize``)
+            RuntimeError: Se o serviço já foi encerrado
+        """
+        params = self.normalize(params)
+        key = json.dumps(params, sort_keys=True)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Serviço encerrado")
+            self._prune()
+            job = self._by_key.get(key)
+            if job is not None and job.reusable:
+                job.requests += 1
+                if job.active:
+                    self.coalesced += 1
+                else:
+                    self.cache_hits += 1
+                return job.to_dict(), True
+
+            job = _Job(f"{next(self._ids):06d}", key, params)
+            # _run espera por este lock: o registro vem antes de ele rodar
+            job.future = self._executor.submit(self._run, job)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        logger.info(f"Escaneamento {job.id} na fila: {', '.join(params['paths'])}")
+        return job.to_dict(), False
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """Estado e progresso de um escaneamento.
+
+        Raises:
+            KeyError: Escaneamento desconhecido ou já fora do cache
+        """
+        return self._job(job_id).to_dict()
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Estado de todos os escaneamentos conhecidos, do mais antigo."""
+        with self._lock:
+            self._prune()
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs]
+
+    def result(self, job_id: str) -> Dict[str, Any]:
+        """Resultado completo (de ``run_scan``) de um escaneamento concluído.
+
+        Raises:
+            KeyError: Escaneamento desconhecido ou já fora do cache
+            LookupError: Escaneamento ainda não concluído com sucesso
+        """
+        job = self._job(job_id)
+        if job.status != DONE:
+            raise LookupError(f"Escaneamento {job_id} sem resultado ({job.status})")
+        return job.result
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancela um escaneamento na fila ou em andamento.
+
+        Na fila, ele sai na hora; rodando, a travessia termina a pasta em
+        curso e o escaneamento passa a 'cancelled' (até lá o estado traz
+        ``cancelling``). Pedidos idênticos deixam de ser agrupados nele.
+
+        Raises:
+            KeyError: Escaneamento desconhecido
+            LookupError: Escaneamento já concluído
+        """
+        job = self._job(job_id)
+        with self._lock:
+            if not job.active:
+                raise LookupError(f"Escaneamento {job_id} já terminou ({job.status})")
+            job.stop.set()
+            if job.status == QUEUED and job.future.cancel():
+                job.status = CANCELLED
+                job.finished_at = time.time()
+                self._finish(job)
+        return job.to_dict()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Espera um escaneamento terminar e retorna o estado final."""
+        job = self._job(job_id)
+        try:
+            job.future.result(timeout)
+        except Exception:  # o erro fica registrado no próprio escaneamento
+            pass
+        return job.to_dict()
+
+    def health(self) -> Dict[str, Any]:
+        """Contadores do serviço."""
+        with self._lock:
+            self._prune()
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {
+            "ok": True,
+            "max_scans": self.max_scans,
+            "jobs": counts,
+            "coalesced_requests": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "cache_ttl": self.cache_ttl,
+            "cache_size": self.cache_size,
+        }
+
+    def close(self, wait: bool = True) -> None:
+        """Cancela a fila e para os escaneamentos em curso.
+
+        Cada escaneamento em andamento termina a pasta atual e passa a
+        'cancelled'; com ``wait``, espera que todos tenham parado.
+        """
+        with self._lock:
+            self._closed = True
+            for job in self._jobs.values():
+                job.stop.set()
+                if job.status == QUEUED and job.future.cancel():
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+        self._executor.shutdown(wait=wait)
+
+    # Execução
+
+    def _run(self, job: _Job) -> None:
+        with self._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        params = job.params
+        logger.info(f"Escaneamento {job.id} iniciado")
+        try:
+            result = run_scan(
+                [get_disk_for_path(path) for path in params["paths"]],
+                min_size_gb=params["min_size_gb"],
+                max_files=params["max_files"],
+                fast_mode=params["fast_mode"],
+                workers=params["workers"],
+                check_duplicates=params["duplicates"],
+                on_progress=job.on_progress,
+                on_match=job.on_match,
+                exclude=params["exclude"],
+                one_filesystem=params["one_filesystem"],
+                rank_by=params["rank_by"],
+                file_filter=FileFilter(params["filter"]),
+                histograms=params["histograms"],
+                stop=job.stop,
+            )
+        except ScanInterrupted:
+            logger.info(f"Escaneamento {job.id} cancelado")
+            with self._lock:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+                self._finish(job)
+            return
+        except Exception as e:
+            logger.error(f"Escaneamento {job.id} falhou: {e}", exc_info=True)
+            with self._lock:
+                job.status = FAILED
+                job.error = str(e)
+                job.finished_at = time.time()
+                self._finish(job)
+            return
+
+        with self._lock:
+            job.result = result
+            job.status = DONE
+            job.finished_at = time.time()
+            self._finish(job)
+        logger.info(
+            f"Escaneamento {job.id} concluído em "
+            f"{job.finished_at - job.started_at:.1f}s: "
+            f"{len(result['files'])} arquivo(s)"
+        )
+
+    def _job(self, job_id: str) -> _Job:
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def _finish(self, job: _Job) -> None:
+        """Registra um escaneamento encerrado (com o lock obtido)."""
+        self._finished[job.id] = job
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove concluídos expirados e os excedentes (com o lock obtido)."""
+        expired = time.time() - self.cache_ttl
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if len(self._finished) <= self.cache_size and job.finished_at > expired:
+                break
+            del self._finished[job.id]
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+
+# HTTP
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa registros de arquivo (``FileRecord``) como objetos JSON."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Objeto não serializável em JSON: {type(value).__name__}")
+
+
+def _page(items: Sequence[Any], query: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Fatia ``items`` conforme ``offset`` e ``limit`` da query string."""
+    try:
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+    except ValueError:
+        raise ValueError("'offset' e 'limit' devem ser inteiros") from None
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"Use offset >= 0 e 1 <= limit <= {MAX_PAGE_SIZE}")
+    return {
+        "total": len(items),
+        "offset": offset,
+        "limit": limit,
+        "items": items[offset : offset + limit],
+    }
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Rotas da API; erros respondem ``{'error': mensagem}``."""
+
+    server_version = "DiskAnalyzer"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = parse_qs(url.query)
+        service = self.server.service
+        try:
+            status, body = self._route(service, method, parts, query)
+        except KeyError:
+            status, body = 404, {"error": "Escaneamento não encontrado"}
+        except LookupError as e:
+            status, body = 409, {"error": str(e)}
+        except ValueError as e:
+            status, body = 400, {"error": str(e)}
+        except RuntimeError as e:
+            status, body = 503, {"error": str(e)}
+        self._send(status, body)
+
+    def _route(
+        self,
+        service: ScanService,
+        method: str,
+        parts: List[str],
+        query: Dict[str, List[str]],
+    ) -> Tuple[int, Any]:
+        if parts == ["health"] and method == "GET":
+            return 200, service.health()
+        if parts == ["scans"]:
+            if method == "POST":
+                job, reused = service.submit(self._read_json())
+                cached = reused and job["status"] == DONE
+                return (200 if cached else 202), dict(job, reused=reused)
+            if method == "GET":
+                return 200, {"items": service.jobs()}
+        if len(parts) == 2 and parts[0] == "scans":
+            if method == "GET":
+                return 200, service.status(parts[1])
+            if method == "DELETE":
+                return 200, service.cancel(parts[1])
+        if len(parts) == 3 and parts[0] == "scans" and method == "GET":
+            result = service.result(parts[1])
+            if parts[2] == "result":
+                summary = {
+                    key: value
+                    for key, value in result.items()
+                    if key not in ("files", "directories")
+                }
+                summary["files_total"] = len(result["files"])
+                summary["directories_total"] = len(result["directories"])
+                return 200, summary
+            if parts[2] in ("files", "directories"):
+                return 200, dict(_page(result[parts[2]], query), id=parts[1])
+        return 404, {"error": f"Rota inexistente: {method} {self.path}"}
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Corpo maior que {MAX_BODY_BYTES} bytes")
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ValueError("Corpo não é um JSON válido") from None
+
+    def _send(self, status: int, body: Any) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=_json_default).encode(
+            "utf-8"
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    # Com a fila padrão (5), rajadas de clientes perdem conexões e o
+    # cliente só tenta de novo após ~1 s
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], service: ScanService) -> None:
+        self.service = service
+        super().__init__(address, _Handler)
+
+
+def serve_http(
+    service: ScanService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+) -> Any:
+    """Atende a API HTTP do serviço numa thread própria.
+
+    Por padrão escuta só em ``127.0.0.1``: não há autenticação, então
+    expor a API em outra interface permite a qualquer um na rede
+    disparar escaneamentos e ler os caminhos encontrados.
+
+    Args:
+        service: Serviço que recebe os pedidos
+        host: Endereço de escuta (padrão: '127.0.0.1')
+        port: Porta; 0 escolhe uma livre, informada em
+            ``server.server_address`` (padrão: 8765)
+
+    Returns:
+        O servidor; chame ``shutdown()`` e ``server_close()`` para parar
+
+    Raises:
+        OSError: Se o endereço não puder ser usado
+    """
+    server = _HTTPServer((host, port), service)
+    thread = threading.Thread(
+        target=server.serve_forever, name="scan-http", daemon=True
+    )
+    thread.start()
+    return server
@@ -0,0 +1,8 @@
+"""Pacote de Benchmarks.
+
+Scripts para medir o desempenho do escaneamento e da geração de
+relatórios. Execute a partir da raiz do projeto, por exemplo:
+
+    $ python -m benchmarks.bench_scandir
+    $ python -m benchmarks.suite
+"""
@@ -0,0 +1,151 @@
+"""Benchmark: filtro avaliado na travessia vs. filtro sobre o resultado.
+
+Sobre uma árvore sintética com extensões e idades variadas, compara duas
+formas de responder "só *.log/*.dump com mais de 90 dias":
+
+    - depois: escaneia tudo e filtra a lista de resultados (cada
+      arquivo custa um stat, passe ou não pelo filtro)
+    - na travessia: ``scan_large_files(file_filter=...)``, que testa a
+      extensão sobre o ``DirEntry`` e só faz stat de quem passar
+
+São medidos:
+    - Chamadas stat (via ``ScanMetrics``)
+    - Tempo de parede (melhor de N execuções)
+
+Usage:
+    $ python -m benchmarks.bench_filters
+    $ python -m benchmarks.bench_filters --depth 3 --fanout 8 --files 200
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from infos.filters import FileFilter
+from infos.main import scan_large_files
+from infos.metrics import ScanMetrics
+
+# Extensões da árvore sintética, com o peso de cada uma
+EXTENSIONS = (
+    ("log", 2),
+    ("dump", 1),
+    ("bin", 4),
+    ("txt", 6),
+    ("jpg", 5),
+    ("py", 6),
+    ("qcow2", 1),
+)
+
+FILTER = ["ext=log,dump", "mtime>90d"]
+
+
+def build_tree(
+    root: str, depth: int, fanout: int, files_per_dir: int, seed: int = 0
+) -> int:
+    """Cria uma árvore de arquivos esparsos com extensões e mtimes variados.
+
+    As idades ficam entre 0 e 365 dias.
+
+    Returns:
+        Quantidade total de arquivos criados
+    """
+    rng = random.Random(seed)
+    names = [ext for ext, weight in EXTENSIONS for _ in range(weight)]
+    now = time.time()
+    total = 0
+    level = [root]
+
+    for current_depth in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                file_path = os.path.join(directory, f"file_{i}.{rng.choice(names)}")
+                with open(file_path, "wb") as f:
+                    f.truncate(rng.randint(1, 64) * 1024)
+                mtime = now - rng.uniform(0, 365) * 86400
+                os.utime(file_path, (mtime, mtime))
+                total += 1
+
+            if current_depth < depth:
+                for i in range(fanout):
+                    sub = os.path.join(directory, f"dir_{i}")
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level = next_level
+
+    return total
+
+
+def scan_then_filter(root: str, metrics: ScanMetrics) -> List[str]:
+    """Escaneia tudo e filtra o resultado (sem pushdown)."""
+    cutoff = time.time() - 90 * 86400
+    files = scan_large_files(root, 0, 10**9, metrics=metrics)
+    return [
+        file["path"]
+        for file in files
+        if file["path"].lower().endswith((".log", ".dump")) and file.mtime < cutoff
+    ]
+
+
+def scan_with_filter(root: str, metrics: ScanMetrics) -> List[str]:
+    """Filtro avaliado durante a travessia."""
+    files = scan_large_files(
+        root, 0, 10**9, metrics=metrics, file_filter=FileFilter(FILTER)
+    )
+    return [file["path"] for file in files]
+
+
+def measure(
+    func: Callable[[str, ScanMetrics], List[str]], root: str, repeat: int
+) -> Tuple[float, int, List[str]]:
+    """Melhor tempo de ``repeat`` execuções, chamadas stat e resultado."""
+    best = float("inf")
+    stat_calls = 0
+    result = []  # type: List[str]
+    for _ in range(repeat):
+        metrics = ScanMetrics()
+        start = time.perf_counter()
+        result = func(root, metrics)
+        best = min(best, time.perf_counter() - start)
+        stat_calls = metrics.to_dict()["stat_calls"]
+    return best, stat_calls, sorted(result)
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=100, help="arquivos por pasta")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    root = tempfile.mkdtemp(prefix="bench_filters_")
+    try:
+        total = build_tree(root, args.depth, args.fanout, args.files)
+        print(f"{total} arquivos | filtro: {' E '.join(FILTER)}")
+
+        after = measure(scan_then_filter, root, args.repeat)
+        pushed = measure(scan_with_filter, root, args.repeat)
+        assert after[2] == pushed[2], "os resultados divergem"
+
+        print(f"\n{'':<18}{'depois':>12}{'na travessia':>14}")
+        print(f"{'stat':<18}{after[1]:>12}{pushed[1]:>14}")
+        print(f"{'tempo (s)':<18}{after[0]:>12.4f}{pushed[0]:>14.4f}")
+        avoided = after[1] - pushed[1]
+        print(
+            f"\nArquivos selecionados: {len(pushed[2])} | stat evitados: "
+            f"{avoided} ({avoided / max(after[1], 1):.0%})"
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark: consolidação de bundles de uma frota sintética.
+
+Gera uma pasta de bundles (um por host, com discos, arquivos e
+diretórios aleatórios) e compara duas formas de obter o top-N da frota:
+
+    - tudo em memória: carrega todos os registros de todos os bundles e
+      ordena a lista inteira
+    - merge: ``merge_bundles`` (k-way merge que lê de cada bundle só o
+      necessário, com no máximo ``--max-open`` bundles abertos)
+
+São medidos o tempo de parede e o pico de memória alocada
+(``tracemalloc``). Nada passa pela rede: com ``--keep PASTA`` os bundles
+ficam na pasta e podem ser usados com ``main.py --merge-bundles PASTA``.
+
+Usage:
+    $ python -m benchmarks.bench_fleet
+    $ python -m benchmarks.bench_fleet --hosts 400 --files 2000 --keep /tmp/frota
+"""
+
+import argparse
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Tuple
+
+from generators.fleet import (
+    _iter_files,
+    find_bundles,
+    merge_bundles,
+    read_bundle_header,
+    write_bundle,
+)
+from infos.topk import file_info
+
+_GB = 1024**3
+
+
+def synthetic_result(
+    rng: random.Random, files: int, directories: int
+) -> Dict[str, Any]:
+    """Resultado no formato de ``run_scan`` com registros aleatórios."""
+    disks = []
+    for i in range(rng.randint(1, 4)):
+        total = rng.choice((100, 250, 500, 1000, 2000))
+        used = total * rng.uniform(0.05, 0.98)
+        disks.append(
+            {
+                "drive": f"/dev/sd{'abcd'[i]}1",
+                "mountpoint": "/" if i == 0 else f"/dados{i}",
+                "fstype": "ext4",
+                "total_gb": float(total),
+                "used_gb": used,
+                "free_gb": total - used,
+                "percent": round(100 * used / total, 1),
+            }
+        )
+
+    now = time.time()
+    sizes = sorted(
+        (
+            int(math.exp(rng.uniform(math.log(_GB // 10), math.log(50 * _GB))))
+            for _ in range(files)
+        ),
+        reverse=True,
+    )
+    records = [
+        file_info(
+            size,
+            f"/dados/p{rng.randrange(1000)}/arquivo_{i}.img",
+            now - rng.uniform(0, 3e7),
+            size,
+        )
+        for i, size in enumerate(sizes)
+    ]
+    dir_sizes = sorted(
+        (rng.randint(_GB, 500 * _GB) for _ in range(directories)), reverse=True
+    )
+    entries = [
+        {
+            "path": f"/dados/p{i}",
+            "size_gb": size / _GB,
+            "size_bytes": size,
+            "own_bytes": size // 10,
+        }
+        for i, size in enumerate(dir_sizes)
+    ]
+    return {
+        "disks": disks,
+        "settings": {"rank_by": "apparent", "min_size_gb": 0.1},
+        "files": records,
+        "directories": entries,
+    }
+
+
+def build_bundles(root: str, hosts: int, files: int, directories: int) -> None:
+    """Grava ``hosts`` bundles sintéticos em ``root`` (semente fixa)."""
+    rng = random.Random(0)
+    os.makedirs(root, exist_ok=True)
+    with redirect_stdout(open(os.devnull, "w")):
+        for i in range(hosts):
+            hostname = f"host-{i:04d}"
+            write_bundle(
+                synthetic_result(rng, files, directories),
+                os.path.join(root, f"{hostname}.bundle.jsonl.gz"),
+                hostname,
+            )
+
+
+def load_everything(root: str, limit: int) -> List[Tuple[int, str]]:
+    """Referência ingênua: todos os registros em memória e um sort."""
+    rows = []
+    for path in find_bundles([root]):
+        rows.extend(_iter_files(path, read_bundle_header(path)))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return [(row[0], row[4]) for row in rows[:limit]]
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, float, Any]:
+    """Tempo (s), pico de memória alocada (MB) e resultado de ``func``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> None:
+    """Gera a frota sintética e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=400)
+    parser.add_argument("--files", type=int, default=1000, help="arquivos por host")
+    parser.add_argument("--directories", type=int, default=200, help="pastas por host")
+    parser.add_argument("--limit", type=int, default=100, help="top-N da frota")
+    parser.add_argument("--max-open", type=int, default=64)
+    parser.add_argument(
+        "--keep", metavar="PASTA", help="grava e mantém os bundles aqui"
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    root = args.keep or tempfile.mkdtemp(prefix="bench_fleet_")
+    try:
+        start = time.perf_counter()
+        build_bundles(root, args.hosts, args.files, args.directories)
+        print(
+            f"{args.hosts} bundles x {args.files} arquivos gerados em "
+            f"{time.perf_counter() - start:.1f}s ({root})"
+        )
+
+        naive = measure(lambda: load_everything(root, args.limit))
+        merged = measure(
+            lambda: merge_bundles([root], args.limit, max_open=args.max_open)
+        )
+        assert naive[2] == [
+            (file["size_bytes"], file["host"]) for file in merged[2]["files"]
+        ], "os resultados divergem"
+
+        print(f"\n{'':<20}{'tudo em memória':>16}{'merge':>12}")
+        print(f"{'tempo (s)':<20}{naive[0]:>16.3f}{merged[0]:>12.3f}")
+        print(f"{'pico de memória (MB)':<20}{naive[1]:>16.1f}{merged[1]:>12.1f}")
+        totals = merged[2]["totals"]
+        print(
+            f"\nFrota: {totals['hosts']} hosts, {totals['disks']} discos, "
+            f"{totals['used_gb']:.0f} de {totals['total_gb']:.0f} GB usados"
+        )
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
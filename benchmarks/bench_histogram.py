@@ -0,0 +1,127 @@
+"""Benchmark: custo dos histogramas de distribuição.
+
+Mede as duas partes de ``FileHistogram``:
+
+    - Na travessia: ``scan_large_files`` com e sem ``histogram`` sobre uma
+      árvore sintética (``benchmarks.treegen``); a diferença dividida
+      pelos arquivos é o custo por arquivo dos quatro ``append``
+    - No resumo: ``summarize`` sobre ``--records`` arquivos registrados
+      diretamente, com NumPy (se instalado) e com a biblioteca padrão,
+      conferindo que os dois caminhos dão o mesmo resultado
+
+Usage:
+    $ python -m benchmarks.bench_histogram
+    $ python -m benchmarks.bench_histogram --depth 3 --fanout 8 --records 5000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, Optional, Tuple
+
+from benchmarks.treegen import TreeShape, generate_tree
+from infos.histogram import FileHistogram, has_numpy
+from infos.main import scan_large_files
+
+EXTENSIONS = ("log", "txt", "jpg", "py", "gz", "mp4", "iso", "", "json", "so")
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """Melhor tempo (s) de ``repeat`` execuções."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_scan(root: str, repeat: int) -> Tuple[float, float, int]:
+    """Tempo do escaneamento sem e com histograma e arquivos registrados."""
+    histogram = FileHistogram()
+
+    def plain() -> None:
+        scan_large_files(root, 1.0, 100)
+
+    def with_histogram() -> None:
+        nonlocal histogram
+        histogram = FileHistogram()
+        scan_large_files(root, 1.0, 100, histogram=histogram)
+
+    return best_of(plain, repeat), best_of(with_histogram, repeat), len(histogram)
+
+
+def build_records(count: int, seed: int = 0) -> FileHistogram:
+    """Histograma com ``count`` arquivos de tamanhos e idades variados."""
+    rng = random.Random(seed)
+    now = time.time()
+    histogram = FileHistogram()
+    record = histogram.recorder()
+    names = [f"arquivo.{ext}" if ext else "arquivo" for ext in EXTENSIONS]
+    for _ in range(count):
+        mtime = now - rng.expovariate(1 / (400 * 86400))
+        record(
+            int(rng.lognormvariate(10, 3)),
+            mtime,
+            mtime + rng.uniform(0, now - mtime),
+            rng.choice(names),
+        )
+    return histogram
+
+
+def measure_summary(
+    histogram: FileHistogram, repeat: int
+) -> Tuple[Optional[float], float]:
+    """Tempo de ``summarize`` com NumPy (None sem ele) e sem NumPy."""
+    now = time.time()
+    fallback = best_of(lambda: histogram.summarize(now, vectorized=False), repeat)
+    if not has_numpy():
+        return None, fallback
+    vectorized = best_of(lambda: histogram.summarize(now), repeat)
+    assert histogram.summarize(now) == histogram.summarize(
+        now, vectorized=False
+    ), "os resultados divergem"
+    return vectorized, fallback
+
+
+def main() -> None:
+    """Executa o benchmark e imprime os custos."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files", type=int, default=50, help="arquivos por pasta")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    root = os.path.join(tempfile.mkdtemp(prefix="bench_histogram_"), "tree")
+    try:
+        shape = TreeShape(args.depth, args.fanout, args.files)
+        generate_tree(root, shape)
+        plain, with_histogram, files = measure_scan(root, args.repeat)
+    finally:
+        shutil.rmtree(os.path.dirname(root), ignore_errors=True)
+
+    overhead = (with_histogram - plain) / max(files, 1) * 1e9
+    print(f"Travessia: {files} arquivos")
+    print(f"{'sem histograma (s)':<28}{plain:>10.4f}")
+    print(f"{'com histograma (s)':<28}{with_histogram:>10.4f}")
+    print(f"{'custo por arquivo (ns)':<28}{overhead:>10.0f}")
+
+    histogram = build_records(args.records)
+    vectorized, fallback = measure_summary(histogram, args.repeat)
+    print(f"\nResumo: {len(histogram)} arquivos")
+    if vectorized is not None:
+        print(f"{'NumPy (s)':<28}{vectorized:>10.4f}")
+    else:
+        print(f"{'NumPy (s)':<28}{'ausente':>10}")
+    print(f"{'biblioteca padrão (s)':<28}{fallback:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: regras de exclusão compiladas vs. verificação ingênua.
+
+Mede o custo por pasta de decidir se ela deve ser ignorada, sobre uma
+lista sintética de caminhos profundos (nenhum arquivo é criado). São
+comparadas três formas de checar o mesmo conjunto de padrões:
+
+    - lista: ``nome.lower() not in lista`` (implementação anterior,
+      só nomes literais)
+    - fnmatch: cada padrão testado com ``fnmatch`` a cada pasta
+    - compilada: ``IgnoreRules.is_ignored`` (conjunto + regex única)
+
+Usage:
+    $ python -m benchmarks.bench_ignore_rules
+    $ python -m benchmarks.bench_ignore_rules --dirs 500000 --globs 50
+"""
+
+import argparse
+import fnmatch
+import random
+import time
+from typing import Callable, List, Tuple
+
+from infos.rules import FAST_MODE_IGNORED_FOLDERS, IGNORED_FOLDERS, IgnoreRules
+
+
+def build_paths(count: int, depth: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Gera ``(nome, caminho)`` de pastas sintéticas.
+
+    Cerca de 5% dos nomes são pastas que as regras padrão ignoram.
+    """
+    rng = random.Random(seed)
+    defaults = IGNORED_FOLDERS + FAST_MODE_IGNORED_FOLDERS
+    paths = []
+    for i in range(count):
+        parts = [f"pasta_{rng.randrange(1000)}" for _ in range(depth)]
+        if rng.random() < 0.05:
+            parts[-1] = rng.choice(defaults).title()
+        else:
+            parts[-1] = f"dir_{i}"
+        paths.append((parts[-1], "/dados/" + "/".join(parts)))
+    return paths
+
+
+def best_time(func: Callable[[], int], repeat: int) -> Tuple[float, int]:
+    """Retorna o menor tempo entre ``repeat`` execuções e o último resultado."""
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dirs", type=int, default=200000)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--globs", type=int, default=20, help="globs extras")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = build_paths(args.dirs, args.depth)
+    literal = IGNORED_FOLDERS + FAST_MODE_IGNORED_FOLDERS
+    globs = [f"*.cache{i}" for i in range(args.globs)]
+    print(
+        f"{len(paths)} pastas | {len(literal)} nomes literais | "
+        f"{len(globs)} globs"
+    )
+
+    def with_list() -> int:
+        return sum(1 for name, _ in paths if name.lower() in literal)
+
+    def with_fnmatch() -> int:
+        patterns = literal + globs
+        return sum(
+            1
+            for name, _ in paths
+            if any(fnmatch.fnmatch(name.lower(), p) for p in patterns)
+        )
+
+    def with_rules(patterns: List[str]) -> Callable[[], int]:
+        def run() -> int:
+            rules = IgnoreRules(patterns, "/dados")
+            return sum(1 for name, path in paths if rules.is_ignored(name, path))
+
+        return run
+
+    results = [
+        ("lista (só nomes)", best_time(with_list, args.repeat)),
+        ("compilada (só nomes)", best_time(with_rules(literal), args.repeat)),
+        ("fnmatch", best_time(with_fnmatch, args.repeat)),
+        ("compilada", best_time(with_rules(literal + globs), args.repeat)),
+        (
+            "compilada (regex)",
+            best_time(with_rules(literal + globs + ["cache-?"]), args.repeat),
+        ),
+    ]
+    ignored = {count for _, (_, count) in results}
+    assert len(ignored) == 1, f"os resultados divergem: {ignored}"
+
+    print(f"\n{'':<22}{'tempo (s)':>12}{'ns/pasta':>12}")
+    for label, (elapsed, _) in results:
+        print(f"{label:<22}{elapsed:>12.4f}{elapsed / len(paths) * 1e9:>12.0f}")
+    print(f"\nPastas ignoradas: {ignored.pop()}")
+
+
+if __name__ == "__main__":
+    main()
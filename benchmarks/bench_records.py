@@ -0,0 +1,116 @@
+"""Benchmark: registros compactos vs. dicionários por arquivo.
+
+Compara a memória e o tempo de montar N resultados como os antigos
+dicionários (GB e data formatados na hora) e como ``FileRecord``
+(``__slots__``, campos derivados calculados só quando lidos). Os
+caminhos são criados antes da medição e compartilhados pelos dois
+formatos, então só conta o custo do registro em si.
+
+São medidos:
+    - Bytes por registro (``tracemalloc``)
+    - Tempo para montar os registros
+    - Tempo para gerar o CSV a partir deles (formatação inclusa)
+
+Usage:
+    $ python -m benchmarks.bench_records
+    $ python -m benchmarks.bench_records --records 500000
+"""
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from generators.main import generate_csv_report
+from infos.records import FileRecord
+
+
+def legacy_file_info(size: int, path: str, mtime: float) -> Dict[str, Any]:
+    """Dicionário de resultado como era montado antes (tudo na hora)."""
+    return {
+        "path": path,
+        "size_gb": size / (1024**3),
+        "size_bytes": size,
+        "allocated_gb": size / (1024**3),
+        "allocated_bytes": size,
+        "modified": datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def measure(build: Callable[[], List[Any]]) -> Tuple[List[Any], int, float]:
+    """Monta os registros e retorna (registros, bytes alocados, tempo).
+
+    O tempo é medido numa execução separada, sem o custo do tracemalloc.
+    """
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    records = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, allocated, elapsed
+
+
+def csv_time(records: List[Any], directory: str) -> float:
+    """Tempo para gerar o relatório CSV a partir dos registros."""
+    output = os.path.join(directory, "relatorio.csv")
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        generate_csv_report(records, output)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = time.time()
+    raw = [
+        (
+            rng.randrange(1 << 20, 1 << 36),
+            f"/dados/pasta_{i % 1000}/arquivo_{i}.bin",
+            now - rng.randrange(10**8),
+        )
+        for i in range(args.records)
+    ]
+
+    legacy, legacy_bytes, legacy_time = measure(
+        lambda: [legacy_file_info(size, path, mtime) for size, path, mtime in raw]
+    )
+    compact, compact_bytes, compact_time = measure(
+        lambda: [FileRecord(size, path, mtime) for size, path, mtime in raw]
+    )
+    assert [dict(r) for r in compact[:1000]] == legacy[:1000], "registros divergem"
+
+    with tempfile.TemporaryDirectory(prefix="disk_analyzer_bench_") as tmp:
+        legacy_csv = csv_time(legacy, tmp)
+        compact_csv = csv_time(compact, tmp)
+
+    count = len(raw)
+    print(f"\n{count} registros")
+    print(f"{'':<24}{'dict':>12}{'FileRecord':>14}")
+    print(
+        f"{'bytes por registro':<24}"
+        f"{legacy_bytes / count:>12.0f}{compact_bytes / count:>14.0f}"
+    )
+    print(f"{'montagem (s)':<24}{legacy_time:>12.4f}{compact_time:>14.4f}")
+    print(
+        f"{'montagem + CSV (s)':<24}"
+        f"{legacy_time + legacy_csv:>12.4f}{compact_time + compact_csv:>14.4f}"
+    )
+    print(f"\nMemória: {legacy_bytes / compact_bytes:.2f}x menor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Benchmark: travessia com os.scandir vs. os.walk.
+
+Compara o ``scan_large_files`` atual (``os.scandir`` + pilha própria)
+com a implementação anterior baseada em ``os.walk`` e
+``os.path.islink``/``getsize``/``getmtime``. Ambas rodam sobre a mesma
+árvore sintética criada em um diretório temporário.
+
+São medidos:
+    - Tempo de parede (melhor de N execuções)
+    - Chamadas stat/lstat feitas a partir do Python
+
+Usage:
+    $ python -m benchmarks.bench_scandir
+    $ python -m benchmarks.bench_scandir --depth 4 --fanout 6 --files 40
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+
+from infos.main import get_size_in_gb, scan_large_files
+
+
+def build_tree(root: str, depth: int, fanout: int, files_per_dir: int) -> int:
+    """Cria uma árvore sintética de diretórios e arquivos esparsos.
+
+    Args:
+        root: Diretório onde a árvore será criada
+        depth: Profundidade da árvore
+        fanout: Quantidade de subdiretórios por diretório
+        files_per_dir: Quantidade de arquivos por diretório
+
+    Returns:
+        Quantidade total de arquivos criados
+    """
+    total = 0
+    level = [root]
+
+    for current_depth in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                file_path = os.path.join(directory, f"file_{i}.bin")
+                with open(file_path, "wb") as f:
+                    # Arquivos esparsos: tamanho aparente sem ocupar disco
+                    f.truncate((i + 1) * 1024 * 1024)
+                total += 1
+
+            if current_depth < depth:
+                for i in range(fanout):
+                    sub = os.path.join(directory, f"dir_{i}")
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level = next_level
+
+    return total
+
+
+def scan_with_os_walk(
+    path: str, min_size_gb: float = 0.1, max_files: int = 100
+) -> List[Dict[str, Any]]:
+    """Implementação anterior (os.walk + três chamadas por arquivo)."""
+    large_files = []
+    min_size_bytes = min_size_gb * (1024**3)
+
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                file_path = os.path.join(root, file)
+
+                if os.path.islink(file_path):
+                    continue
+
+                size = os.path.getsize(file_path)
+
+                if size >= min_size_bytes:
+                    large_files.append(
+                        {
+                            "path": file_path,
+                            "size_gb": get_size_in_gb(size),
+                            "size_bytes": size,
+                            "modified": datetime.fromtimestamp(
+                                os.path.getmtime(file_path)
+                            ).strftime("%Y-%m-%d %H:%M:%S"),
+                        }
+                    )
+            except OSError:
+                continue
+
+    large_files.sort(key=lambda x: x["size_bytes"], reverse=True)
+    return large_files[:max_files]
+
+
+class _CountingEntry:
+    """Proxy de ``os.DirEntry`` que conta chamadas a ``stat()``."""
+
+    __slots__ = ("_entry", "_counter")
+
+    def __init__(self, entry: os.DirEntry, counter: Dict[str, int]) -> None:
+        self._entry = entry
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._entry, name)
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        self._counter["stat"] += 1
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _CountingScandir:
+    """Iterador de ``os.scandir`` que embrulha as entradas em proxies.
+
+    Funciona como iterador e como gerenciador de contexto, assim serve
+    tanto para ``os.walk`` quanto para ``scan_large_files``.
+    """
+
+    def __init__(self, it: Any, counter: Dict[str, int]) -> None:
+        self._it = it
+        self._counter = counter
+
+    def __iter__(self) -> "_CountingScandir":
+        return self
+
+    def __next__(self) -> _CountingEntry:
+        return _CountingEntry(next(self._it), self._counter)
+
+    def __enter__(self) -> "_CountingScandir":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._it.close()
+
+
+@contextmanager
+def count_syscalls() -> Iterator[Dict[str, int]]:
+    """Conta chamadas stat/lstat/scandir feitas a partir do Python."""
+    counter = {"stat": 0, "scandir": 0}
+    real_stat, real_lstat, real_scandir = os.stat, os.lstat, os.scandir
+
+    def counting_stat(*args: Any, **kwargs: Any) -> os.stat_result:
+        counter["stat"] += 1
+        return real_stat(*args, **kwargs)
+
+    def counting_lstat(*args: Any, **kwargs: Any) -> os.stat_result:
+        counter["stat"] += 1
+        return real_lstat(*args, **kwargs)
+
+    # os.walk resolve scandir pelo módulo os, então o mesmo patch cobre
+    # os dois caminhos
+    os.stat, os.lstat = counting_stat, counting_lstat
+    def counting_scandir(path: str) -> _CountingScandir:
+        counter["scandir"] += 1
+        return _CountingScandir(real_scandir(path), counter)
+
+    os.scandir = counting_scandir
+    try:
+        yield counter
+    finally:
+        os.stat, os.lstat, os.scandir = real_stat, real_lstat, real_scandir
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """Retorna o menor tempo de parede entre ``repeat`` execuções."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=30, help="arquivos por pasta")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    root = tempfile.mkdtemp(prefix="disk_analyzer_bench_")
+    try:
+        total_files = build_tree(root, args.depth, args.fanout, args.files)
+        min_gb = 10 / 1024  # arquivos >= 10 MB
+        print(f"Árvore sintética: {total_files} arquivos em {root}")
+
+        legacy = scan_with_os_walk(root, min_gb, total_files)
+        current = scan_large_files(root, min_gb, total_files)
+        # A versão antiga não conhece o espaço alocado: compara o resto
+        fields = ("path", "size_bytes", "modified")
+        assert sorted(tuple(f[k] for k in fields) for f in legacy) == sorted(
+            tuple(f[k] for k in fields) for f in current
+        ), "os resultados divergem"
+
+        with count_syscalls() as legacy_calls:
+            scan_with_os_walk(root, min_gb, 100)
+        with count_syscalls() as current_calls:
+            scan_large_files(root, min_gb, 100)
+
+        legacy_time = best_time(
+            lambda: scan_with_os_walk(root, min_gb, 100), args.repeat
+        )
+        current_time = best_time(
+            lambda: scan_large_files(root, min_gb, 100), args.repeat
+        )
+
+        print(f"\n{'':<22}{'os.walk':>12}{'os.scandir':>14}")
+        print(
+            f"{'stat/lstat':<22}"
+            f"{legacy_calls['stat']:>12}{current_calls['stat']:>14}"
+        )
+        print(
+            f"{'scandir':<22}"
+            f"{legacy_calls['scandir']:>12}{current_calls['scandir']:>14}"
+        )
+        print(
+            f"{'stat por arquivo':<22}"
+            f"{legacy_calls['stat'] / total_files:>12.2f}"
+            f"{current_calls['stat'] / total_files:>14.2f}"
+        )
+        print(f"{'tempo (s)':<22}{legacy_time:>12.4f}{current_time:>14.4f}")
+        print(f"\nGanho de tempo: {legacy_time / current_time:.2f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: pedidos simultâneos ao serviço HTTP (``analyzer.server``).
+
+Sobe o serviço em ``127.0.0.1`` (porta livre) sobre uma árvore sintética
+(``benchmarks.treegen``) e dispara ``--clients`` clientes ao mesmo tempo,
+cada um enviando um escaneamento, acompanhando o estado até a conclusão e
+lendo a primeira página de arquivos:
+
+    - distintos: cada cliente pede um ``max_files`` diferente, então cada
+      pedido vira um escaneamento (no máximo ``--max-scans`` por vez)
+    - idênticos: todos pedem o mesmo escaneamento, agrupado num só
+
+Depois repete o pedido idêntico, que é respondido do cache.
+
+Usage:
+    $ python -m benchmarks.bench_server
+    $ python -m benchmarks.bench_server --clients 16 --max-scans 2 --depth 3
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from analyzer.server import ScanService, serve_http
+from benchmarks.treegen import TreeShape, generate_tree
+
+
+def call(base: str, method: str, path: str, body: Optional[Any] = None) -> Any:
+    """Faz uma requisição JSON e retorna o corpo da resposta."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(base + path, data=data, method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def client(base: str, params: Dict[str, Any], pages: List[int]) -> None:
+    """Envia um escaneamento, espera a conclusão e lê a primeira página."""
+    job = call(base, "POST", "/scans", params)
+    while job["status"] in ("queued", "running"):
+        time.sleep(0.02)
+        job = call(base, "GET", f"/scans/{job['id']}")
+    pages.append(len(call(base, "GET", f"/scans/{job['id']}/files")["items"]))
+
+
+def run_clients(base: str, requests: List[Dict[str, Any]]) -> float:
+    """Roda um cliente por pedido, todos ao mesmo tempo; retorna o tempo (s)."""
+    pages = []  # type: List[int]
+    threads = [
+        threading.Thread(target=client, args=(base, params, pages))
+        for params in requests
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert len(pages) == len(requests), "algum cliente falhou"
+    return elapsed
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a comparação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files", type=int, default=40, help="arquivos por pasta")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--max-scans", type=int, default=2)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    workdir = tempfile.mkdtemp(prefix="bench_server_")
+    root = os.path.join(workdir, "tree")
+    service = ScanService(max_scans=args.max_scans)
+    server = serve_http(service, port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        generate_tree(root, TreeShape(args.depth, args.fanout, args.files))
+        params = {"paths": [root], "min_size_gb": 0.001}
+
+        distinct = [dict(params, max_files=100 + i) for i in range(args.clients)]
+        distinct_elapsed = run_clients(base, distinct)
+        scans_before = service.health()["jobs"]["done"]
+
+        identical_elapsed = run_clients(base, [params] * args.clients)
+        identical_scans = service.health()["jobs"]["done"] - scans_before
+
+        cached_elapsed = run_clients(base, [params])
+        health = service.health()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.clients} clientes | até {args.max_scans} escaneamento(s) por vez")
+    print(f"\n{'':<18}{'escaneamentos':>14}{'tempo (s)':>12}")
+    print(f"{'distintos':<18}{args.clients:>14}{distinct_elapsed:>12.3f}")
+    print(f"{'idênticos':<18}{identical_scans:>14}{identical_elapsed:>12.3f}")
+    print(f"{'cache':<18}{0:>14}{cached_elapsed:>12.3f}")
+    print(
+        f"\nPedidos agrupados: {health['coalesced_requests']} | "
+        f"respondidos do cache: {health['cache_hits']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark: tempo de inicialização da linha de comando e das importações.
+
+Cada caso roda num processo novo (melhor de N execuções) e, além do tempo
+de parede, registra quais módulos pesados foram carregados. Serve de
+acompanhamento da inicialização:
+
+    - ``disks`` deve ficar abaixo de ``--max-ms`` (padrão: 100 ms) e não
+      pode carregar o escaneamento, os relatórios nem o ``psutil``
+    - ``import infos`` / ``generators`` / ``analyzer`` devem custar quase
+      nada (os nomes exportados são importados no primeiro acesso)
+
+Os casos importam ``main`` em vez de executar ``main.py`` como script,
+como faz o comando ``disk-analyzer`` instalado (o bytecode fica em cache).
+O código de saída é 1 se algum limite for violado.
+
+Usage:
+    $ python -m benchmarks.bench_startup
+    $ python -m benchmarks.bench_startup --repeat 20 --max-ms 80
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que o caminho rápido não pode carregar
+HEAVY_MODULES = (
+    "psutil",
+    "infos.main",
+    "infos.watch",
+    "analyzer.disk_analyzer",
+    "generators.main",
+)
+
+_MARKER = "@@modules "
+
+# (nome, código, deve ser leve?)
+CASES = [
+    ("python (vazio)", "pass", True),
+    ("import infos", "import infos", True),
+    ("import generators", "import generators", True),
+    ("import analyzer", "import analyzer", True),
+    ("disks", "from main import main; main(['disks'])", True),
+    ("disks --json", "from main import main; main(['disks', '--json'])", True),
+    ("--help", "from main import main; main(['--help'])", False),
+    ("import infos.main", "import infos.main", False),
+    ("import analyzer.disk_analyzer", "import analyzer.disk_analyzer", False),
+]
+
+
+def _child_code(code: str) -> str:
+    return (
+        f"try:\n    {code}\nexcept SystemExit:\n    pass\n"
+        "import sys, json\n"
+        f"sys.stderr.write({_MARKER!r} + json.dumps("
+        f"[m for m in {HEAVY_MODULES!r} if m in sys.modules]) + '\\n')\n"
+    )
+
+
+def run_case(code: str, repeat: int) -> Tuple[float, List[str]]:
+    """Melhor tempo (ms) de ``repeat`` processos e os módulos pesados carregados."""
+    best = float("inf")
+    loaded = []  # type: List[str]
+    command = [sys.executable, "-c", _child_code(code)]
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(
+            command,
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        best = min(best, (time.perf_counter() - start) * 1000)
+        for line in process.stderr.splitlines():
+            if line.startswith(_MARKER):
+                loaded = json.loads(line[len(_MARKER) :])
+    return best, loaded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Executa os casos, imprime a tabela e verifica os limites."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--max-ms", type=float, default=100.0, help="limite para 'disks' (ms)"
+    )
+    args = parser.parse_args(argv)
+
+    # Aquece o cache de bytecode antes de medir
+    subprocess.run(
+        [sys.executable, "-c", "import main, analyzer.disk_analyzer"],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    failures = []
+    print(f"{'':<32}{'ms':>8}  módulos pesados")
+    for name, code, light in CASES:
+        elapsed, loaded = run_case(code, args.repeat)
+        print(f"{name:<32}{elapsed:>8.1f}  {', '.join(loaded) or '-'}")
+        if light and loaded:
+            failures.append(f"{name} carregou {', '.join(loaded)}")
+        if name == "disks" and elapsed > args.max_ms:
+            failures.append(f"disks levou {elapsed:.0f} ms (limite: {args.max_ms:g})")
+
+    for failure in failures:
+        print(f"REGRESSÃO: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
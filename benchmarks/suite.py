@@ -0,0 +1,309 @@
+"""Suíte de benchmarks reprodutível do escaneamento e dos relatórios.
+
+Para cada perfil, gera (ou reaproveita) uma árvore sintética com
+``benchmarks.treegen`` e roda o pipeline completo sobre ela em um
+processo separado: ``run_scan`` seguido dos relatórios TXT, CSV e JSON.
+Rodar cada perfil em um processo próprio isola o pico de memória (RSS).
+
+São medidos (melhor de N execuções para os tempos):
+    - Tempo de escaneamento e de geração dos relatórios
+    - Arquivos e entradas por segundo no escaneamento
+    - Pico de RSS do processo
+
+Os resultados são comparados com um baseline JSON
+(``benchmarks/baseline.json``); qualquer métrica pior que o baseline
+além da tolerância é uma regressão e o código de saída passa a ser 1.
+
+Usage:
+    $ python -m benchmarks.suite
+    $ python -m benchmarks.suite --profile large --tree-dir /var/tmp/bench
+    $ python -m benchmarks.suite --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.treegen import MANIFEST_SUFFIX, TreeShape, load_or_generate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Perfis de árvore: o 'large' passa de 1 milhão de entradas e fica fora
+# da execução padrão (a árvore leva alguns minutos para ser criada)
+PROFILES = {
+    "small": TreeShape(depth=2, fanout=8, files_per_dir=40),
+    "medium": TreeShape(depth=3, fanout=10, files_per_dir=50),
+    "large": TreeShape(depth=4, fanout=10, files_per_dir=90),
+}
+DEFAULT_PROFILES = ("small", "medium")
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+PROJECT_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+# Parâmetros do escaneamento: arquivos >= 10 MB, ranking com até 1000
+MIN_SIZE_GB = 10 / 1024
+MAX_FILES = 1000
+
+# Métrica -> (maior é melhor?, tempo de que ela depende)
+METRICS = {
+    "scan_seconds": (False, "scan_seconds"),
+    "report_seconds": (False, "report_seconds"),
+    "files_per_second": (True, "scan_seconds"),
+    "peak_rss_mb": (False, None),
+}
+
+# Diferenças de tempo menores que isso são ruído, qualquer que seja a
+# variação relativa (o perfil 'small' roda em poucos milissegundos)
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_profile(
+    root: str, tree: Dict[str, int], repeat: int, workers: int
+) -> Dict[str, Any]:
+    """Roda o pipeline sobre uma árvore já criada (no processo atual).
+
+    Args:
+        root: Raiz da árvore sintética
+        tree: Contagens da árvore (ver ``treegen.generate_tree``)
+        repeat: Quantidade de execuções; os tempos são os melhores
+        workers: Threads de escaneamento
+
+    Returns:
+        Métricas do perfil (ver ``METRICS``) e ``files_found``
+    """
+    from analyzer.disk_analyzer import run_scan, write_reports
+    from infos.main import get_disk_for_path
+
+    disk = get_disk_for_path(root)
+    best_scan = best_report = float("inf")
+    files_found = 0
+
+    # Os geradores anunciam cada arquivo salvo: descarta essas mensagens
+    with tempfile.TemporaryDirectory(
+        prefix="disk_analyzer_reports_"
+    ) as out, open(os.devnull, "w") as devnull:
+        for _ in range(repeat):
+            result = run_scan(
+                [disk], MIN_SIZE_GB, MAX_FILES, fast_mode=False, workers=workers
+            )
+            with redirect_stdout(devnull):
+                start = time.perf_counter()
+                write_reports(
+                    result,
+                    txt_file=os.path.join(out, "relatorio.txt"),
+                    csv_file=os.path.join(out, "relatorio.csv"),
+                    json_file=os.path.join(out, "relatorio.json"),
+                )
+                best_report = min(best_report, time.perf_counter() - start)
+            best_scan = min(best_scan, result["timing"]["scan"])
+            files_found = len(result["files"])
+
+    scanned_files = tree["files"] + tree["symlinks"]
+    return {
+        "scan_seconds": best_scan,
+        "report_seconds": best_report,
+        "files_per_second": scanned_files / best_scan if best_scan else 0.0,
+        "entries_per_second": tree["entries"] / best_scan if best_scan else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "files_found": files_found,
+    }
+
+
+def _run_child(name: str, root: str, repeat: int, workers: int) -> Dict[str, Any]:
+    """Roda ``run_profile`` em um processo novo e devolve as métricas."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.suite",
+        "--child",
+        name,
+        "--child-root",
+        root,
+        "--repeat",
+        str(repeat),
+        "--workers",
+        str(workers),
+    ]
+    completed = subprocess.run(
+        command, cwd=PROJECT_ROOT, stdout=subprocess.PIPE, check=True
+    )
+    return json.loads(completed.stdout.decode("utf-8"))
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Imprime a comparação de um perfil e retorna as métricas que regrediram."""
+    regressions = []
+    print(f"{'':<20}{'baseline':>12}{'atual':>12}{'variação':>11}")
+
+    for metric, (higher_is_better, seconds_key) in METRICS.items():
+        old, new = baseline.get(metric), current.get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        noise = seconds_key is not None and (
+            abs(current[seconds_key] - baseline[seconds_key]) < NOISE_FLOOR_SECONDS
+        )
+        flag = "  REGRESSÃO" if worse > tolerance and not noise else ""
+        if flag:
+            regressions.append(metric)
+        print(f"{metric:<20}{old:>12.4f}{new:>12.4f}{change:>+10.1%}{flag}")
+
+    if baseline.get("files_found") != current["files_found"]:
+        regressions.append("files_found")
+        print(
+            f"{'files_found':<20}{baseline.get('files_found'):>12}"
+            f"{current['files_found']:>12}  DIVERGE"
+        )
+    return regressions
+
+
+def _print_results(current: Dict[str, Any]) -> None:
+    for metric in list(METRICS) + ["entries_per_second", "files_found"]:
+        value = current.get(metric)
+        text = "n/d" if value is None else f"{value:.4f}"
+        print(f"{metric:<20}{text:>12}")
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _load_baseline(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"profiles": {}}
+
+
+def main() -> int:
+    """Executa a suíte e retorna o código de saída (1 se houver regressão)."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=sorted(PROFILES) + ["all"],
+        help="perfil a executar (repetível; padrão: small e medium)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--tree-dir",
+        metavar="PASTA",
+        help="guarda as árvores geradas aqui e as reaproveita (padrão: temporário)",
+    )
+    parser.add_argument("--baseline", default=BASELINE_FILE, metavar="ARQUIVO")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="piora relativa aceita antes de acusar regressão (padrão: 0.25)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="grava os resultados como novo baseline em vez de comparar",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.WARNING)
+        root = args.child_root
+        with open(root + MANIFEST_SUFFIX, encoding="utf-8") as f:
+            tree = json.load(f)["stats"]
+        print(json.dumps(run_profile(root, tree, args.repeat, args.workers)))
+        return 0
+
+    names = args.profile or list(DEFAULT_PROFILES)
+    if "all" in names:
+        names = list(PROFILES)
+
+    baseline = _load_baseline(args.baseline)
+    tree_dir = args.tree_dir or tempfile.mkdtemp(prefix="disk_analyzer_suite_")
+    os.makedirs(tree_dir, exist_ok=True)
+    results = {}
+    regressions = {}
+
+    try:
+        for name in names:
+            shape = PROFILES[name]
+            root = os.path.join(tree_dir, name)
+            print(f"\n[{name}] gerando árvore (~{shape.estimated_entries} entradas)...")
+            start = time.perf_counter()
+            tree = load_or_generate(root, shape)
+            print(
+                f"[{name}] {tree['entries']} entradas, {tree['files']} arquivos "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+
+            current = _run_child(name, root, args.repeat, args.workers)
+            results[name] = {"shape": shape.to_dict(), "tree": tree, "results": current}
+
+            reference = baseline["profiles"].get(name)
+            if args.save_baseline:
+                _print_results(current)
+            elif reference is None:
+                print(f"[{name}] perfil ausente do baseline: sem comparação")
+                _print_results(current)
+            elif reference["shape"] != shape.to_dict():
+                print(f"[{name}] forma diferente da do baseline: sem comparação")
+                _print_results(current)
+            else:
+                failed = compare(current, reference["results"], args.tolerance)
+                if failed:
+                    regressions[name] = failed
+    finally:
+        if not args.tree_dir:
+            shutil.rmtree(tree_dir, ignore_errors=True)
+
+    if args.save_baseline:
+        baseline.update(_environment())
+        baseline["profiles"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline salvo em: {args.baseline}")
+        return 0
+
+    if regressions:
+        for name, metrics in regressions.items():
+            print(f"\nRegressão em '{name}': {', '.join(metrics)}")
+        return 1
+    print("\nNenhuma regressão além da tolerância.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Gerador de árvores sintéticas para os benchmarks.
+
+Cria, de forma reprodutível (mesma forma + mesma semente = mesma
+árvore), uma hierarquia de pastas e arquivos esparsos em que o tamanho
+aparente segue uma distribuição configurável sem ocupar disco. A árvore
+também pode conter symlinks e pastas com nomes ignorados pelo
+escaneamento (``node_modules``, ``.git``...), para exercitar esses
+caminhos do código.
+
+Usage:
+    $ python -m benchmarks.treegen /tmp/arvore --depth 3 --fanout 8 --files 50
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+from typing import Any, Dict, Optional
+
+# Nomes de pastas que o escaneamento ignora em qualquer modo
+IGNORED_NAMES = ("node_modules", ".git", "__pycache__", ".cache")
+
+# Nome do arquivo que descreve uma árvore gerada (fica ao lado dela)
+MANIFEST_SUFFIX = ".manifest.json"
+
+_MB = 1024 * 1024
+
+
+class TreeShape:
+    """Forma de uma árvore sintética.
+
+    Args:
+        depth: Níveis de subpastas abaixo da raiz
+        fanout: Subpastas por pasta
+        files_per_dir: Arquivos por pasta
+        min_size: Menor tamanho aparente de arquivo, em bytes
+        max_size: Maior tamanho aparente de arquivo, em bytes; os
+            tamanhos seguem uma distribuição log-uniforme entre os dois
+        large_fraction: Fração dos arquivos com tamanho entre
+            ``max_size`` e ``10 * max_size`` (a "cauda" que o ranking procura)
+        symlink_fraction: Fração dos arquivos que ganham um symlink ao lado
+        ignored_fraction: Fração das pastas que ganham uma subpasta com
+            nome ignorado, com ``files_per_dir`` arquivos
+        seed: Semente do gerador pseudoaleatório
+    """
+
+    __slots__ = (
+        "depth",
+        "fanout",
+        "files_per_dir",
+        "min_size",
+        "max_size",
+        "large_fraction",
+        "symlink_fraction",
+        "ignored_fraction",
+        "seed",
+    )
+
+    def __init__(
+        self,
+        depth: int = 3,
+        fanout: int = 8,
+        files_per_dir: int = 50,
+        min_size: int = 1024,
+        max_size: int = 64 * _MB,
+        large_fraction: float = 0.01,
+        symlink_fraction: float = 0.02,
+        ignored_fraction: float = 0.05,
+        seed: int = 42,
+    ) -> None:
+        self.depth = depth
+        self.fanout = fanout
+        self.files_per_dir = files_per_dir
+        self.min_size = min_size
+        self.max_size = max_size
+        self.large_fraction = large_fraction
+        self.symlink_fraction = symlink_fraction
+        self.ignored_fraction = ignored_fraction
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TreeShape":
+        return cls(**data)
+
+    @property
+    def directories(self) -> int:
+        """Pastas regulares da árvore (sem contar as ignoradas)."""
+        return sum(self.fanout**level for level in range(self.depth + 1))
+
+    @property
+    def estimated_entries(self) -> int:
+        """Estimativa de entradas (pastas + arquivos + symlinks)."""
+        per_dir = self.files_per_dir * (1 + self.symlink_fraction)
+        ignored = self.ignored_fraction * (1 + self.files_per_dir)
+        return int(self.directories * (1 + per_dir + ignored))
+
+
+def _file_size(rng: random.Random, shape: TreeShape) -> int:
+    if rng.random() < shape.large_fraction:
+        return rng.randint(shape.max_size, 10 * shape.max_size)
+    low, high = math.log(shape.min_size), math.log(shape.max_size)
+    return int(math.exp(rng.uniform(low, high)))
+
+
+def _make_file(path: str, size: int) -> None:
+    # Arquivo esparso: tamanho aparente sem ocupar disco
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+    try:
+        if size:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def _fill_directory(
+    rng: random.Random, directory: str, shape: TreeShape, stats: Dict[str, int]
+) -> None:
+    for i in range(shape.files_per_dir):
+        file_path = os.path.join(directory, f"file_{i}.bin")
+        size = _file_size(rng, shape)
+        _make_file(file_path, size)
+        stats["files"] += 1
+        stats["bytes"] += size
+
+        if rng.random() < shape.symlink_fraction:
+            os.symlink(f"file_{i}.bin", os.path.join(directory, f"link_{i}.bin"))
+            stats["symlinks"] += 1
+
+
+def generate_tree(root: str, shape: TreeShape) -> Dict[str, int]:
+    """Cria a árvore em ``root`` (que não pode existir ainda).
+
+    Args:
+        root: Diretório a criar
+        shape: Forma da árvore
+
+    Returns:
+        Contagens da árvore criada: directories, files, symlinks,
+        ignored_directories, ignored_files, bytes (tamanho aparente dos
+        arquivos fora das pastas ignoradas) e entries (total)
+    """
+    rng = random.Random(shape.seed)
+    stats = {
+        "directories": 0,
+        "files": 0,
+        "symlinks": 0,
+        "ignored_directories": 0,
+        "ignored_files": 0,
+        "bytes": 0,
+    }
+    os.mkdir(root)
+    level = [root]
+
+    for current_depth in range(shape.depth + 1):
+        next_level = []
+        for directory in level:
+            stats["directories"] += 1
+            _fill_directory(rng, directory, shape, stats)
+
+            if rng.random() < shape.ignored_fraction:
+                ignored = os.path.join(directory, rng.choice(IGNORED_NAMES))
+                os.mkdir(ignored)
+                ignored_stats = dict.fromkeys(stats, 0)
+                _fill_directory(rng, ignored, shape, ignored_stats)
+                stats["ignored_directories"] += 1
+                stats["ignored_files"] += ignored_stats["files"]
+                stats["symlinks"] += ignored_stats["symlinks"]
+
+            if current_depth < shape.depth:
+                for i in range(shape.fanout):
+                    sub = os.path.join(directory, f"dir_{i}")
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level = next_level
+
+    stats["entries"] = (
+        stats["directories"]
+        + stats["files"]
+        + stats["symlinks"]
+        + stats["ignored_directories"]
+        + stats["ignored_files"]
+    )
+    return stats
+
+
+def load_or_generate(root: str, shape: TreeShape) -> Dict[str, int]:
+    """Reaproveita a árvore em ``root`` se ela tiver a mesma forma.
+
+    A forma e as contagens ficam em ``root + MANIFEST_SUFFIX``, fora da
+    árvore. Árvores grandes levam minutos para criar, então execuções
+    repetidas com ``--tree-dir`` pulam essa etapa.
+
+    Returns:
+        Contagens da árvore (ver ``generate_tree``)
+    """
+    manifest_path = root + MANIFEST_SUFFIX
+    manifest = _read_manifest(manifest_path)
+    if manifest is not None and manifest["shape"] == shape.to_dict():
+        if os.path.isdir(root):
+            return manifest["stats"]
+
+    if os.path.lexists(manifest_path):
+        os.remove(manifest_path)
+    shutil.rmtree(root, ignore_errors=True)
+    stats = generate_tree(root, shape)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"shape": shape.to_dict(), "stats": stats}, f, indent=2)
+    return stats
+
+
+def _read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> None:
+    """Cria uma árvore sintética a partir da linha de comando."""
+    defaults = TreeShape()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="diretório a criar")
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fanout", type=int, default=defaults.fanout)
+    parser.add_argument(
+        "--files", type=int, default=defaults.files_per_dir, help="arquivos por pasta"
+    )
+    parser.add_argument("--min-size", type=int, default=defaults.min_size)
+    parser.add_argument("--max-size", type=int, default=defaults.max_size)
+    parser.add_argument(
+        "--large-fraction", type=float, default=defaults.large_fraction
+    )
+    parser.add_argument(
+        "--symlink-fraction", type=float, default=defaults.symlink_fraction
+    )
+    parser.add_argument(
+        "--ignored-fraction", type=float, default=defaults.ignored_fraction
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    shape = TreeShape(
+        depth=args.depth,
+        fanout=args.fanout,
+        files_per_dir=args.files,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        large_fraction=args.large_fraction,
+        symlink_fraction=args.symlink_fraction,
+        ignored_fraction=args.ignored_fraction,
+        seed=args.seed,
+    )
+    stats = generate_tree(args.root, shape)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
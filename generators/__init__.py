@@ -2,8 +2,48 @@
 
 Este pacote fornece funcionalidades para gerar relatórios de
 análise de discos em diferentes formatos.
+
+Módulos:
+    main: Geradores TXT, CSV e JSON
+    stream: Gravação incremental de resultados e relatórios a partir dela
+    metrics: Exportação das métricas de escaneamento (JSON e Prometheus)
+    columnar: Exportação colunar (Parquet/Arrow ou formato binário próprio)
+    fleet: Bundles por host e relatórios consolidados da frota
+
+Os nomes exportados são importados no primeiro acesso (PEP 562), como em
+``infos``.
 """
 
-from .main import generate_report, generate_csv_report
+import sys
+from importlib import import_module
+from typing import Any
+
+# Nome exportado -> módulo que o define
+_EXPORTS = {
+    'generate_report': '.main',
+    'generate_csv_report': '.main',
+    'generate_json_report': '.main',
+    'generate_diff_csv': '.main',
+    'generate_columnar_report': '.columnar',
+    'ColumnarWriter': '.columnar',
+    'read_columnar': '.columnar',
+    'write_bundle': '.fleet',
+    'merge_bundles': '.fleet',
+    'generate_fleet_report': '.fleet',
+    'generate_fleet_csv': '.fleet',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['generate_report', 'generate_csv_report']
+if sys.version_info < (3, 7):  # sem __getattr__ de módulo: importa tudo
+    for _name in __all__:
+        __getattr__(_name)
@@ -0,0 +1,463 @@
+"""Exportação colunar dos arquivos encontrados.
+
+Para inventários grandes (milhões de linhas) o CSV é lento de gravar,
+grande e caro de carregar: cada valor vira texto formatado. Este módulo
+grava os arquivos em colunas tipadas, em lotes:
+
+    - path: caminho completo (texto)
+    - size_bytes: tamanho aparente (int64)
+    - allocated_bytes: espaço alocado em disco (int64)
+    - mtime: data de modificação (timestamp em microssegundos, UTC)
+    - mountpoint: ponto de montagem do arquivo (texto, dicionário)
+    - extension: extensão em minúsculas, com o ponto (texto, dicionário)
+
+O formato é escolhido pela extensão do arquivo de saída:
+    - ``.parquet``: Apache Parquet (requer ``pyarrow``)
+    - ``.arrow`` / ``.feather``: arquivo Arrow IPC (requer ``pyarrow``)
+    - qualquer outra: formato binário próprio (``.dacol``), sem dependências
+
+Sem ``pyarrow`` instalado, pedidos de Parquet/Arrow caem no formato
+próprio, gravado ao lado com a extensão ``.dacol``. O ``pyarrow`` só é
+importado quando um arquivo Parquet/Arrow é gravado ou lido.
+
+Formato ``.dacol``: ``MAGIC``, um cabeçalho JSON precedido do tamanho
+(uint32) e uma sequência de lotes. Cada lote é ``(linhas, bytes)``
+(``<II``) seguido do conteúdo comprimido com zlib: as colunas numéricas
+como vetores int64 little-endian; ``path`` como comprimentos (uint32) +
+bytes UTF-8; ``mountpoint`` e ``extension`` como dicionário (quantidade,
+comprimentos e bytes) + códigos (uint32). Caminhos que não são UTF-8
+válido usam ``surrogateescape`` e voltam idênticos na leitura.
+
+Classes:
+    ColumnarWriter: Gravação em lotes, com a assinatura de ``on_match``
+
+Funções:
+    generate_columnar_report(): Grava uma lista de arquivos em formato colunar
+    read_columnar(): Lê um arquivo colunar em lotes de colunas
+    has_pyarrow(): Importa o pyarrow sob demanda e diz se está instalado
+"""
+
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from infos.records import FileRecord
+
+
+logger = logging.getLogger(__name__)
+
+# Dependência opcional, importada na primeira gravação/leitura Parquet/Arrow:
+# carregá-la custa caro e a maioria das execuções não a usa
+_UNLOADED = object()
+pyarrow = _UNLOADED  # type: Any
+
+MAGIC = b"DACOL1\n"
+FALLBACK_SUFFIX = ".dacol"
+
+# Linhas acumuladas em memória antes de gravar um lote
+DEFAULT_BATCH_ROWS = 65_536
+
+# Nível do zlib nos lotes do formato próprio
+COMPRESS_LEVEL = 1
+
+# Nome -> tipo, na ordem das colunas
+COLUMNS = (
+    ("path", "string"),
+    ("size_bytes", "int64"),
+    ("allocated_bytes", "int64"),
+    ("mtime", "timestamp[us, UTC]"),
+    ("mountpoint", "dictionary<string>"),
+    ("extension", "dictionary<string>"),
+)
+
+_BATCH = struct.Struct("<II")
+_COUNT = struct.Struct("<I")
+
+# Os vetores são gravados em little-endian; em máquinas big-endian os
+# bytes são invertidos na gravação e na leitura
+_SWAP = sys.byteorder != "little"
+
+_ARROW_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+
+def has_pyarrow() -> bool:
+    """Importa o pyarrow, se ainda não importado, e diz se está instalado."""
+    global pyarrow
+    if pyarrow is _UNLOADED:
+        try:
+            import pyarrow as module
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            module = None
+        pyarrow = module
+    return pyarrow is not None
+
+
+def _int_array(code: str, values: Iterable[int]) -> bytes:
+    data = array(code, values)
+    if _SWAP:
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_array(code: str, payload: bytes, offset: int, count: int) -> array:
+    data = array(code)
+    end = offset + count * data.itemsize
+    data.frombytes(payload[offset:end])
+    if _SWAP:
+        data.byteswap()
+    return data
+
+
+def _encode_strings(values: Sequence[str]) -> bytes:
+    """Comprimentos (uint32) seguidos dos bytes UTF-8 concatenados."""
+    encoded = [value.encode("utf-8", "surrogateescape") for value in values]
+    return _int_array("I", map(len, encoded)) + b"".join(encoded)
+
+
+def _decode_strings(payload: bytes, offset: int, count: int) -> Any:
+    """Inverso de ``_encode_strings``; retorna (valores, próximo offset)."""
+    lengths = _read_array("I", payload, offset, count)
+    offset += 4 * count
+    values = []
+    for length in lengths:
+        end = offset + length
+        values.append(payload[offset:end].decode("utf-8", "surrogateescape"))
+        offset = end
+    return values, offset
+
+
+def _encode_dictionary(values: Sequence[str]) -> bytes:
+    """Dicionário dos valores distintos seguido dos códigos (uint32)."""
+    codes = {}  # type: Dict[str, int]
+    indices = [codes.setdefault(value, len(codes)) for value in values]
+    return (
+        _COUNT.pack(len(codes))
+        + _encode_strings(list(codes))
+        + _int_array("I", indices)
+    )
+
+
+def _decode_dictionary(payload: bytes, offset: int, count: int) -> Any:
+    (size,) = _COUNT.unpack_from(payload, offset)
+    dictionary, offset = _decode_strings(payload, offset + _COUNT.size, size)
+    codes = _read_array("I", payload, offset, count)
+    return [dictionary[code] for code in codes], offset + 4 * count
+
+
+def _mountpoint_resolver(mountpoints: Iterable[str]) -> Callable[[str], str]:
+    """Função que devolve o ponto de montagem mais específico de um caminho."""
+    prefixes = []
+    for mountpoint in set(mountpoints):
+        prefix = mountpoint if mountpoint.endswith(os.sep) else mountpoint + os.sep
+        prefixes.append((prefix, mountpoint))
+    # O mais longo primeiro: /dados/backup antes de /dados e de /
+    prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def resolve(path: str) -> str:
+        for prefix, mountpoint in prefixes:
+            if path.startswith(prefix) or path == mountpoint:
+                return mountpoint
+        return ""
+
+    return resolve
+
+
+def _extensions(paths: Iterable[str]) -> List[str]:
+    """Extensões em minúsculas, como ``os.path.splitext`` (".bashrc" não
+    tem extensão), sem o custo de uma chamada por caminho."""
+    extensions = []
+    for path in paths:
+        name = path[path.rfind(os.sep) + 1 :].lstrip(".")
+        dot = name.rfind(".")
+        extensions.append(name[dot:].lower() if dot >= 0 else "")
+    return extensions
+
+
+def _arrow_schema() -> Any:
+    text = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    return pyarrow.schema(
+        [
+            ("path", pyarrow.string()),
+            ("size_bytes", pyarrow.int64()),
+            ("allocated_bytes", pyarrow.int64()),
+            ("mtime", pyarrow.timestamp("us", tz="UTC")),
+            ("mountpoint", text),
+            ("extension", text),
+        ]
+    )
+
+
+def _arrow_strings(values: List[str]) -> Any:
+    """Coluna de texto Arrow; caminhos que não são UTF-8 válido são
+    gravados com o caractere de substituição (Arrow exige UTF-8)."""
+    try:
+        return pyarrow.array(values, pyarrow.string())
+    except (pyarrow.ArrowException, UnicodeEncodeError):
+        return pyarrow.array(
+            [
+                value.encode("utf-8", "surrogateescape").decode("utf-8", "replace")
+                for value in values
+            ],
+            pyarrow.string(),
+        )
+
+
+class ColumnarWriter:
+    """Grava arquivos encontrados em colunas tipadas, em lotes.
+
+    As linhas são acumuladas em listas por coluna e gravadas a cada
+    ``batch_rows`` linhas, de modo que a memória fica limitada a um lote.
+    ``write`` tem a assinatura esperada por ``scan_large_files(on_match=)``
+    e é segura para uso com várias threads.
+
+    Args:
+        path: Arquivo de saída; a extensão escolhe o formato (ver o módulo)
+        mountpoints: Pontos de montagem escaneados, para a coluna
+            ``mountpoint`` (padrão: vazio)
+        batch_rows: Linhas por lote (padrão: 65536)
+
+    Attributes:
+        path: Arquivo efetivamente gravado (muda para ``.dacol`` se o
+            formato pedido exigir ``pyarrow`` e ele não estiver instalado)
+        format: 'parquet', 'arrow' ou 'dacol'
+        rows: Linhas gravadas até o momento
+
+    Example:
+        >>> with ColumnarWriter('inventario.parquet', ['/dados']) as writer:
+        ...     scan_large_files('/dados', 0.0, on_match=writer.write)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mountpoints: Iterable[str] = (),
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+    ) -> None:
+        base, extension = os.path.splitext(path)
+        self.format = _ARROW_FORMATS.get(extension.lower(), "dacol")
+        if self.format != "dacol" and not has_pyarrow():
+            path = base + FALLBACK_SUFFIX
+            self.format = "dacol"
+            logger.warning(
+                f"pyarrow não instalado: gravando no formato próprio em {path}"
+            )
+        self.path = path
+        self.batch_rows = max(1, batch_rows)
+        self.rows = 0
+        self._mountpoint = _mountpoint_resolver(mountpoints)
+        self._lock = threading.Lock()
+        self._clear()
+
+        self._file = None  # type: Any
+        self._arrow = None  # type: Any
+        if self.format == "parquet":
+            self._arrow = pyarrow.parquet.ParquetWriter(path, _arrow_schema())
+        elif self.format == "arrow":
+            self._file = pyarrow.OSFile(path, "wb")
+            self._arrow = pyarrow.ipc.new_file(self._file, _arrow_schema())
+        else:
+            self._file = open(path, "wb", buffering=1 << 20)
+            header = json.dumps(
+                {"columns": [list(column) for column in COLUMNS]}
+            ).encode("ascii")
+            self._file.write(MAGIC + _COUNT.pack(len(header)) + header)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write(
+        self, size: int, path: str, mtime: float, allocated: Optional[int] = None
+    ) -> None:
+        """Acrescenta um arquivo (grava o lote quando ele enche)."""
+        with self._lock:
+            self._paths.append(path)
+            self._sizes.append(size)
+            self._allocated.append(size if allocated is None else allocated)
+            self._mtimes.append(int(mtime * 1_000_000))
+            if len(self._paths) >= self.batch_rows:
+                self._flush()
+
+    def write_records(self, records: Iterable[FileRecord]) -> None:
+        """Acrescenta registros de resultado (ver ``infos.records``)."""
+        iterator = iter(records)
+        while True:
+            with self._lock:
+                batch = list(islice(iterator, self.batch_rows - len(self._paths)))
+                if not batch:
+                    return
+                self._paths.extend([record.path for record in batch])
+                self._sizes.extend([record.size_bytes for record in batch])
+                self._allocated.extend([record.allocated_bytes for record in batch])
+                self._mtimes.extend(
+                    [int(record.mtime * 1_000_000) for record in batch]
+                )
+                if len(self._paths) >= self.batch_rows:
+                    self._flush()
+
+    def close(self) -> int:
+        """Grava o último lote e fecha o arquivo.
+
+        Returns:
+            Quantidade de linhas gravadas
+        """
+        with self._lock:
+            if self._file is None and self._arrow is None:
+                return self.rows
+            self._flush()
+            if self._arrow is not None:
+                self._arrow.close()
+                self._arrow = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return self.rows
+
+    def _clear(self) -> None:
+        self._paths = []  # type: List[str]
+        self._sizes = []  # type: List[int]
+        self._allocated = []  # type: List[int]
+        self._mtimes = []  # type: List[int]
+
+    def _flush(self) -> None:
+        count = len(self._paths)
+        if not count:
+            return
+        paths = self._paths
+        mountpoints = list(map(self._mountpoint, paths))
+        extensions = _extensions(paths)
+
+        if self._arrow is not None:
+            self._write_arrow(paths, mountpoints, extensions)
+        else:
+            payload = b"".join(
+                (
+                    _encode_strings(paths),
+                    _int_array("q", self._sizes),
+                    _int_array("q", self._allocated),
+                    _int_array("q", self._mtimes),
+                    _encode_dictionary(mountpoints),
+                    _encode_dictionary(extensions),
+                )
+            )
+            compressed = zlib.compress(payload, COMPRESS_LEVEL)
+            self._file.write(_BATCH.pack(count, len(compressed)))
+            self._file.write(compressed)
+
+        self.rows += count
+        self._clear()
+
+    def _write_arrow(
+        self, paths: List[str], mountpoints: List[str], extensions: List[str]
+    ) -> None:
+        schema = _arrow_schema()
+        batch = pyarrow.RecordBatch.from_arrays(
+            [
+                _arrow_strings(paths),
+                pyarrow.array(self._sizes, pyarrow.int64()),
+                pyarrow.array(self._allocated, pyarrow.int64()),
+                pyarrow.array(self._mtimes, pyarrow.int64()).cast(
+                    schema.field("mtime").type
+                ),
+                _arrow_strings(mountpoints).dictionary_encode(),
+                _arrow_strings(extensions).dictionary_encode(),
+            ],
+            schema=schema,
+        )
+        if self.format == "parquet":
+            self._arrow.write_table(pyarrow.Table.from_batches([batch], schema))
+        else:
+            self._arrow.write_batch(batch)
+
+
+def generate_columnar_report(
+    all_large_files: Iterable[FileRecord],
+    output_file: str = "relatorio_arquivos.parquet",
+    mountpoints: Iterable[str] = (),
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> str:
+    """Grava os arquivos encontrados em formato colunar.
+
+    Args:
+        all_large_files: Arquivos encontrados (lista ou iterável)
+        output_file: Arquivo de saída; a extensão escolhe o formato
+            (padrão: 'relatorio_arquivos.parquet')
+        mountpoints: Pontos de montagem escaneados, para a coluna
+            ``mountpoint``
+        batch_rows: Linhas por lote (padrão: 65536)
+
+    Returns:
+        Caminho efetivamente gravado (ver ``ColumnarWriter.path``)
+    """
+    with ColumnarWriter(output_file, mountpoints, batch_rows) as writer:
+        writer.write_records(all_large_files)
+
+    print(f"Relatório colunar salvo em: {writer.path} ({writer.rows} linhas)")
+    return writer.path
+
+
+def read_columnar(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê um arquivo colunar, um lote por vez.
+
+    Arquivos ``.dacol`` são lidos sem dependências; Parquet e Arrow
+    exigem ``pyarrow``.
+
+    Yields:
+        Dicionários coluna -> valores de um lote. No formato próprio as
+        colunas numéricas são ``array('q')`` (``mtime`` em microssegundos
+        desde a época) e as de texto são listas; nos formatos Arrow, os
+        valores de ``RecordBatch.to_pydict()``
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            f.close()
+            yield from _read_arrow(path, magic)
+            return
+
+        (header_size,) = _COUNT.unpack(f.read(_COUNT.size))
+        f.read(header_size)
+        while True:
+            head = f.read(_BATCH.size)
+            if len(head) < _BATCH.size:
+                return
+            count, size = _BATCH.unpack(head)
+            payload = zlib.decompress(f.read(size))
+            paths, offset = _decode_strings(payload, 0, count)
+            sizes = _read_array("q", payload, offset, count)
+            allocated = _read_array("q", payload, offset + 8 * count, count)
+            mtimes = _read_array("q", payload, offset + 16 * count, count)
+            offset += 24 * count
+            mountpoints, offset = _decode_dictionary(payload, offset, count)
+            extensions, _ = _decode_dictionary(payload, offset, count)
+            yield {
+                "path": paths,
+                "size_bytes": sizes,
+                "allocated_bytes": allocated,
+                "mtime": mtimes,
+                "mountpoint": mountpoints,
+                "extension": extensions,
+            }
+
+
+def _read_arrow(path: str, magic: bytes) -> Iterator[Dict[str, Any]]:
+    if not has_pyarrow():
+        raise ValueError(f"{path}: formato desconhecido ou pyarrow não instalado")
+    if magic.startswith(b"PAR1"):
+        batches = pyarrow.parquet.ParquetFile(path).iter_batches()
+    else:
+        reader = pyarrow.ipc.open_file(pyarrow.memory_map(path, "r"))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        yield batch.to_pydict()
@@ -0,0 +1,546 @@
+"""Resultados por host e consolidação de uma frota.
+
+Cada host grava um *bundle* com o resultado do seu escaneamento
+(``write_bundle``); ``merge_bundles`` junta os bundles de uma pasta num
+resultado único da frota, sem carregar todos em memória.
+
+Formato do bundle (JSON Lines comprimido com gzip):
+    - Linha 1: cabeçalho JSON com hostname, data, parâmetros, discos
+      (formato de ``get_all_disks``) e a quantidade de registros de
+      cada seção
+    - Arquivos do maior para o menor, ``[tamanho, caminho, mtime,
+      alocado]`` (o mesmo registro do stream)
+    - Diretórios do maior para o menor, ``[tamanho, caminho, próprio]``
+
+Como cada seção já vem ordenada, o top-N da frota sai de um k-way merge
+(``heapq.merge``) que lê de cada bundle só o começo necessário. Com mais
+bundles do que ``max_open``, eles são intercalados em lotes e o top-N de
+cada lote entra na rodada seguinte, de modo que nunca há mais do que
+``max_open`` arquivos abertos.
+
+Funções:
+    write_bundle(): Grava o bundle de um resultado de ``run_scan``
+    read_bundle_header(): Lê o cabeçalho de um bundle
+    find_bundles(): Lista os bundles de pastas e arquivos
+    merge_bundles(): Consolida vários bundles no resultado da frota
+    generate_fleet_report(): Relatório TXT da frota
+    generate_fleet_csv(): Relatório CSV da frota
+"""
+
+import csv
+import glob
+import gzip
+import heapq
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from infos.topk import file_info
+
+from .main import BUFFER_SIZE, _batches
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_SUFFIX = ".bundle.jsonl.gz"
+BUNDLE_VERSION = 1
+
+# Bundles abertos ao mesmo tempo durante o merge
+DEFAULT_MAX_OPEN = 256
+
+# (tamanho, caminho, mtime, alocado, host)
+_FileRow = Tuple[int, str, float, int, str]
+# (tamanho, caminho, próprio, host)
+_DirectoryRow = Tuple[int, str, int, str]
+
+# Critério de ordenação -> posição no registro de arquivo
+_RANK_KEYS = {"apparent": itemgetter(0), "allocated": itemgetter(3)}
+
+_HEADER_KEYS = ("hostname", "created", "settings", "disks", "files", "directories")
+
+
+def default_bundle_path(hostname: Optional[str] = None) -> str:
+    """Nome padrão do bundle de um host: ``<hostname>.bundle.jsonl.gz``."""
+    return f"{hostname or socket.gethostname()}{BUNDLE_SUFFIX}"
+
+
+def _open_text(path: str, mode: str) -> Any:
+    # surrogateescape: caminhos com bytes inválidos voltam iguais na leitura
+    return gzip.open(path, mode, encoding="utf-8", errors="surrogateescape")
+
+
+def write_bundle(
+    result: Dict[str, Any],
+    output_file: Optional[str] = None,
+    hostname: Optional[str] = None,
+) -> str:
+    """Grava o bundle de um resultado de ``run_scan``.
+
+    O arquivo é escrito num temporário da mesma pasta e renomeado, para
+    que uma coleta (rsync, scp...) nunca leve um bundle pela metade.
+
+    Args:
+        result: Resultado retornado por ``analyzer.disk_analyzer.run_scan``
+        output_file: Caminho do bundle (padrão: ``default_bundle_path()``)
+        hostname: Nome do host no bundle (padrão: ``socket.gethostname()``)
+
+    Returns:
+        Caminho do bundle gravado
+    """
+    hostname = hostname or socket.gethostname()
+    output_file = output_file or default_bundle_path(hostname)
+    files = result["files"]
+    directories = result["directories"]
+    header = {
+        "version": BUNDLE_VERSION,
+        "hostname": hostname,
+        "created": time.time(),
+        "settings": result["settings"],
+        "disks": result["disks"],
+        "files": len(files),
+        "directories": len(directories),
+    }
+
+    directory = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=".bundle_", dir=directory)
+    os.close(fd)
+    try:
+        with _open_text(tmp_path, "wt") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for batch in _batches(files):
+                f.write(
+                    "".join(
+                        json.dumps(
+                            [
+                                file["size_bytes"],
+                                file["path"],
+                                file.mtime,
+                                file["allocated_bytes"],
+                            ],
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                        for file in batch
+                    )
+                )
+            for batch in _batches(directories):
+                f.write(
+                    "".join(
+                        json.dumps(
+                            [entry["size_bytes"], entry["path"], entry["own_bytes"]],
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                        for entry in batch
+                    )
+                )
+        # mkstemp cria com 0600; quem coleta costuma ser outro usuário
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    print(f"Bundle do host salvo em: {output_file}")
+    return output_file
+
+
+def read_bundle_header(path: str) -> Dict[str, Any]:
+    """Lê só o cabeçalho de um bundle.
+
+    Raises:
+        ValueError: Se o arquivo não for um bundle de versão conhecida
+        OSError: Se o arquivo não puder ser lido (inclusive gzip inválido)
+    """
+    with _open_text(path, "rt") as f:
+        line = f.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        raise ValueError(f"{path} não é um bundle (cabeçalho ilegível)") from None
+    if not isinstance(header, dict) or header.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"{path} não é um bundle da versão {BUNDLE_VERSION}")
+    missing = [key for key in _HEADER_KEYS if key not in header]
+    if missing:
+        raise ValueError(f"{path}: cabeçalho sem {', '.join(missing)}")
+    return header
+
+
+def _iter_section(path: str, skip: int, count: int) -> Iterator[List[Any]]:
+    """Registros de uma seção do bundle; um bundle corrompido só encurta a seção."""
+    try:
+        with _open_text(path, "rt") as f:
+            for _ in islice(f, skip):
+                pass
+            for line in islice(f, count):
+                yield json.loads(line)
+    except (OSError, ValueError, EOFError) as e:
+        logger.warning(
+            f"Bundle corrompido ({path}), registros restantes ignorados: {e}"
+        )
+
+
+def _iter_files(path: str, header: Dict[str, Any]) -> Iterator[_FileRow]:
+    host = header["hostname"]
+    for size, file_path, mtime, allocated in _iter_section(path, 1, header["files"]):
+        yield size, file_path, mtime, allocated, host
+
+
+def _iter_directories(path: str, header: Dict[str, Any]) -> Iterator[_DirectoryRow]:
+    host = header["hostname"]
+    # Os diretórios vêm depois dos arquivos: pula o cabeçalho e a seção deles
+    skip = 1 + header["files"]
+    for size, dir_path, own in _iter_section(path, skip, header["directories"]):
+        yield size, dir_path, own, host
+
+
+def find_bundles(paths: Iterable[str]) -> List[str]:
+    """Lista os bundles indicados: pastas são varridas por ``*.bundle.jsonl.gz``.
+
+    Returns:
+        Caminhos dos bundles, em ordem alfabética
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(
+                glob.glob(os.path.join(glob.escape(path), "*" + BUNDLE_SUFFIX))
+            )
+        else:
+            found.append(path)
+    return sorted(set(found))
+
+
+def _merge_top(
+    sources: List[Callable[[], Iterator[Any]]],
+    key: Callable[[Any], Any],
+    limit: int,
+    max_open: int,
+) -> List[Any]:
+    """Top-``limit`` de fontes já ordenadas (maior primeiro), em lotes.
+
+    Cada fonte só é aberta quando o seu lote é intercalado; o top de um
+    lote é suficiente para o top global, então rodadas sucessivas
+    reduzem as fontes até caber num único ``heapq.merge``.
+    """
+    max_open = max(2, max_open)
+    while True:
+        rounds = []
+        for start in range(0, len(sources), max_open):
+            iterators = [source() for source in sources[start : start + max_open]]
+            try:
+                merged = heapq.merge(*iterators, key=key, reverse=True)
+                rounds.append(list(islice(merged, limit)))
+            finally:
+                for iterator in iterators:
+                    iterator.close()
+        if len(rounds) <= 1:
+            return rounds[0] if rounds else []
+        sources = [partial(_replay, top) for top in rounds]
+
+
+def _replay(rows: List[Any]) -> Iterator[Any]:
+    yield from rows
+
+
+def _ranked(
+    rows: Callable[[], Iterator[_FileRow]], key: Callable[[Any], Any]
+) -> Iterator[_FileRow]:
+    """Fonte reordenada em memória (bundle gravado com outro ``rank_by``)."""
+    yield from sorted(rows(), key=key, reverse=True)
+
+
+def merge_bundles(
+    paths: Iterable[str],
+    limit: int = 100,
+    rank_by: str = "apparent",
+    max_open: int = DEFAULT_MAX_OPEN,
+) -> Dict[str, Any]:
+    """Consolida bundles de vários hosts no resultado da frota.
+
+    Os cabeçalhos são lidos primeiro (tabela de hosts e totais); depois
+    arquivos e diretórios são intercalados com k-way merge, lendo de
+    cada bundle só os registros necessários para o top-N. Se houver mais
+    de um bundle do mesmo host, vale o mais recente. Bundles ilegíveis
+    são pulados e listados em 'skipped'.
+
+    Args:
+        paths: Bundles ou pastas com bundles (ver ``find_bundles``)
+        limit: Quantidade de arquivos e de diretórios da frota (padrão: 100)
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent'). Bundles
+            gravados com outro critério são reordenados em memória
+        max_open: Máximo de bundles abertos ao mesmo tempo (padrão: 256)
+
+    Returns:
+        Dicionário com:
+        - hosts: Uma linha por host, do mais ao menos ocupado: hostname,
+          data do bundle, discos, GB totais/usados/livres, percentual
+          de uso (usado / (usado + livre), como no ``psutil``),
+          arquivos e diretórios no bundle e o caminho do bundle
+        - totals: Hosts, discos e GB totais/usados/livres da frota
+        - files: Maiores arquivos da frota (registros com 'host')
+        - directories: Maiores diretórios da frota (com 'host')
+        - skipped: Bundles pulados, com 'path' e 'reason'
+        - settings: limit e rank_by usados
+    """
+    bundles = {}  # type: Dict[str, Tuple[str, Dict[str, Any]]]
+    skipped = []
+    for path in find_bundles(paths):
+        try:
+            header = read_bundle_header(path)
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning(f"Bundle ignorado ({path}): {e}")
+            skipped.append({"path": path, "reason": str(e)})
+            continue
+        host = header["hostname"]
+        current = bundles.get(host)
+        if current is not None:
+            # Coletas repetidas do mesmo host: vale a mais recente
+            if current[1]["created"] > header["created"]:
+                current, (path, header) = (path, header), current
+            skipped.append({"path": current[0], "reason": "bundle mais antigo do host"})
+            logger.info(f"Host {host} com mais de um bundle: vale {path}")
+        bundles[host] = (path, header)
+
+    hosts = [_host_row(path, header) for path, header in bundles.values()]
+    hosts.sort(key=lambda row: (-row["used_gb"], row["hostname"]))
+    logger.info(f"Consolidando {len(hosts)} host(s)...")
+
+    file_key = _RANK_KEYS[rank_by]
+    file_sources = []
+    directory_sources = []
+    for path, header in bundles.values():
+        files = partial(_iter_files, path, header)
+        if header["settings"].get("rank_by", "apparent") != rank_by:
+            files = partial(_ranked, files, file_key)
+        file_sources.append(files)
+        directory_sources.append(partial(_iter_directories, path, header))
+
+    top_files = _merge_top(file_sources, file_key, limit, max_open)
+    top_directories = _merge_top(directory_sources, itemgetter(0), limit, max_open)
+
+    return {
+        "settings": {"limit": limit, "rank_by": rank_by},
+        "hosts": hosts,
+        "totals": _totals(hosts),
+        "files": [
+            dict(file_info(size, path, mtime, allocated), host=host)
+            for size, path, mtime, allocated, host in top_files
+        ],
+        "directories": [
+            {
+                "host": host,
+                "path": path,
+                "size_gb": size / (1024**3),
+                "size_bytes": size,
+                "own_bytes": own,
+            }
+            for size, path, own, host in top_directories
+        ],
+        "skipped": skipped,
+    }
+
+
+def _percent(used: float, free: float) -> float:
+    # Como o psutil: sobre o espaço disponível para usuários, sem o
+    # reservado ao root (used + free < total)
+    available = used + free
+    return 100.0 * used / available if available else 0.0
+
+
+def _host_row(path: str, header: Dict[str, Any]) -> Dict[str, Any]:
+    disks = header["disks"]
+    used = sum(disk["used_gb"] for disk in disks)
+    free = sum(disk["free_gb"] for disk in disks)
+    return {
+        "hostname": header["hostname"],
+        "created": header["created"],
+        "disks": len(disks),
+        "total_gb": sum(disk["total_gb"] for disk in disks),
+        "used_gb": used,
+        "free_gb": free,
+        "percent": _percent(used, free),
+        "files": header["files"],
+        "directories": header["directories"],
+        "bundle": path,
+    }
+
+
+def _totals(hosts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    used = sum(row["used_gb"] for row in hosts)
+    free = sum(row["free_gb"] for row in hosts)
+    return {
+        "hosts": len(hosts),
+        "disks": sum(row["disks"] for row in hosts),
+        "total_gb": sum(row["total_gb"] for row in hosts),
+        "used_gb": used,
+        "free_gb": free,
+        "percent": _percent(used, free),
+    }
+
+
+def _format_created(created: float) -> str:
+    return datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generate_fleet_report(
+    fleet: Dict[str, Any], output_file: str = "relatorio_frota.txt"
+) -> None:
+    """Gera o relatório TXT da frota.
+
+    Args:
+        fleet: Resultado de ``merge_bundles``
+        output_file: Nome do arquivo de saída (padrão: 'relatorio_frota.txt')
+
+    Note:
+        O relatório inclui os totais da frota, a tabela de hosts (do mais
+        ao menos ocupado), os maiores arquivos e diretórios da frota e os
+        bundles pulados
+    """
+    totals = fleet["totals"]
+    with open(output_file, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        f.write("=" * 80 + "\n")
+        f.write("RELATÓRIO DA FROTA\n")
+        f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("=" * 80 + "\n\n")
+
+        f.write(f"Hosts: {totals['hosts']} | Discos: {totals['disks']}\n")
+        f.write(f"Tamanho total: {totals['total_gb']:.2f} GB\n")
+        f.write(
+            f"Espaço usado: {totals['used_gb']:.2f} GB ({totals['percent']:.1f}%)\n"
+        )
+        f.write(f"Espaço livre: {totals['free_gb']:.2f} GB\n")
+
+        f.write("\n\n" + "=" * 80 + "\n")
+        f.write("USO POR HOST\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(
+            f"{'Host':<30} {'Discos':>6} {'Usado (GB)':>12} {'Total (GB)':>12} "
+            f"{'Uso':>6}  Coleta\n"
+        )
+        for row in fleet["hosts"]:
+            f.write(
+                f"{row['hostname']:<30} {row['disks']:>6} {row['used_gb']:>12.2f} "
+                f"{row['total_gb']:>12.2f} {row['percent']:>5.1f}%  "
+                f"{_format_created(row['created'])}\n"
+            )
+
+        f.write("\n\n" + "=" * 80 + "\n")
+        f.write("ARQUIVOS MAIS PESADOS DA FROTA\n")
+        f.write("=" * 80 + "\n\n")
+        if fleet["files"]:
+            for i, file in enumerate(fleet["files"], 1):
+                f.write(
+                    f"{i}. [{file['size_gb']:.2f} GB] {file['host']}:{file['path']}\n"
+                )
+                f.write(
+                    f"   Modificado: {file['modified']} | "
+                    f"Em disco: {file['allocated_gb']:.2f} GB\n\n"
+                )
+        else:
+            f.write("Nenhum arquivo grande encontrado.\n")
+
+        f.write("\n" + "=" * 80 + "\n")
+        f.write("DIRETÓRIOS MAIS PESADOS DA FROTA\n")
+        f.write("=" * 80 + "\n\n")
+        if fleet["directories"]:
+            for i, directory in enumerate(fleet["directories"], 1):
+                f.write(
+                    f"{i}. [{directory['size_gb']:.2f} GB] "
+                    f"{directory['host']}:{directory['path']}\n"
+                )
+        else:
+            f.write("Nenhum diretório analisado.\n")
+
+        if fleet["skipped"]:
+            f.write("\n\n" + "=" * 80 + "\n")
+            f.write("BUNDLES IGNORADOS\n")
+            f.write("=" * 80 + "\n\n")
+            for entry in fleet["skipped"]:
+                f.write(f"{entry['path']}: {entry['reason']}\n")
+
+        f.write("\n" + "=" * 80 + "\n")
+        f.write("FIM DO RELATÓRIO\n")
+        f.write("=" * 80 + "\n")
+
+    print(f"Relatório da frota salvo em: {output_file}")
+
+
+def generate_fleet_csv(
+    fleet: Dict[str, Any], output_file: str = "relatorio_frota.csv"
+) -> None:
+    """Gera o relatório CSV da frota.
+
+    Args:
+        fleet: Resultado de ``merge_bundles``
+        output_file: Nome do arquivo CSV (padrão: 'relatorio_frota.csv')
+
+    Note:
+        - Colunas: Tamanho (GB), Host, Caminho, Data de Modificação,
+          Em Disco (GB)
+        - Seção de hosts: Host, Discos, Usado (GB), Total (GB), Uso (%),
+          Coleta
+        - Seção de diretórios: Tamanho (GB), Host, Diretório,
+          Tamanho Próprio (GB)
+        - As seções são separadas por uma linha em branco
+    """
+    with open(
+        output_file, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["Tamanho (GB)", "Host", "Caminho", "Data de Modificação", "Em Disco (GB)"]
+        )
+        writer.writerows(
+            [
+                f"{file['size_gb']:.2f}",
+                file["host"],
+                file["path"],
+                file["modified"],
+                f"{file['allocated_gb']:.2f}",
+            ]
+            for file in fleet["files"]
+        )
+
+        writer.writerow([])
+        writer.writerow(
+            ["Host", "Discos", "Usado (GB)", "Total (GB)", "Uso (%)", "Coleta"]
+        )
+        writer.writerows(
+            [
+                row["hostname"],
+                row["disks"],
+                f"{row['used_gb']:.2f}",
+                f"{row['total_gb']:.2f}",
+                f"{row['percent']:.1f}",
+                _format_created(row["created"]),
+            ]
+            for row in fleet["hosts"]
+        )
+
+        if fleet["directories"]:
+            writer.writerow([])
+            writer.writerow(
+                ["Tamanho (GB)", "Host", "Diretório", "Tamanho Próprio (GB)"]
+            )
+            writer.writerows(
+                [
+                    f"{directory['size_gb']:.2f}",
+                    directory["host"],
+                    directory["path"],
+                    f"{directory['own_bytes'] / (1024**3):.2f}",
+                ]
+                for directory in fleet["directories"]
+            )
+
+    print(f"Relatório CSV da frota salvo em: {output_file}")
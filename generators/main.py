@@ -6,17 +6,86 @@ em diferentes formatos (TXT e CSV).
 Funções:
     generate_report(): Gera relatório detalhado em formato texto
     generate_csv_report(): Gera relatório em formato CSV para Excel
+    generate_json_report(): Gera relatório JSON para integração com outras ferramentas
+    generate_diff_csv(): Gera o CSV da diferença entre duas execuções
 """
 
 import csv
+import json
+import sys
+from collections.abc import Mapping
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+from infos.records import FileRecord, format_mtime
+
+# Buffer dos arquivos de relatório e linhas formatadas por escrita: com
+# milhões de linhas, uma chamada de escrita por campo domina o tempo
+BUFFER_SIZE = 1 << 20
+WRITE_BATCH_ROWS = 10_000
+
+# Rótulos das seções de diferença, na ordem em que aparecem no TXT
+_DIFF_KINDS = (
+    ("files", "Arquivos", "arquivo"),
+    ("directories", "Diretórios", "diretório"),
+)
+_DIFF_STATUSES = (
+    ("grown", "que cresceram", "cresceu"),
+    ("new", "novos", "novo"),
+    ("shrunk", "que diminuíram", "diminuiu"),
+    ("deleted", "removidos", "removido"),
+)
+
+# Grupos dos histogramas: (chave, título no TXT, rótulo no CSV)
+_HISTOGRAM_GROUPS = (
+    ("sizes", "Por tamanho", "tamanho"),
+    ("modified", "Por idade da modificação", "modificação"),
+    ("accessed", "Por idade do último acesso", "acesso"),
+    ("extensions_by_bytes", "Extensões que mais ocupam", "extensão (espaço)"),
+    ("extensions_by_count", "Extensões mais frequentes", "extensão (quantidade)"),
+)
+
+
+def _batches(
+    items: Iterable[Any], size: int = WRITE_BATCH_ROWS
+) -> Iterator[List[Any]]:
+    """Divide um iterável em listas de até ``size`` itens."""
+    iterator = iter(items)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def _file_values(file: Any) -> Tuple[float, str, str, float]:
+    """(tamanho GB, caminho, data, em disco GB) de um arquivo encontrado.
+
+    Registros ``FileRecord`` são lidos pelos atributos, sem passar pela
+    visão de dicionário (quatro buscas por linha pesam em milhões de
+    linhas); dicionários comuns continuam aceitos.
+    """
+    if type(file) is FileRecord:
+        return (
+            file.size_bytes / (1024**3),
+            file.path,
+            format_mtime(file.mtime),
+            file.allocated_bytes / (1024**3),
+        )
+    size_gb = file["size_gb"]
+    return size_gb, file["path"], file["modified"], file.get("allocated_gb", size_gb)
 
 
 def generate_report(
     disks: List[Dict[str, Any]], 
-    all_large_files: List[Dict[str, Any]], 
-    output_file: str = "relatorio_discos.txt"
+    all_large_files: Iterable[Dict[str, Any]], 
+    output_file: str = "relatorio_discos.txt",
+    directories: Optional[List[Dict[str, Any]]] = None,
+    duplicates: Optional[List[Dict[str, Any]]] = None,
+    diff: Optional[Dict[str, Any]] = None,
+    coverage: Optional[Dict[str, Any]] = None,
+    filters: Optional[List[str]] = None,
+    histograms: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Gera relatório detalhado de análise em formato texto.
     
@@ -25,8 +94,23 @@ def generate_report(
     
     Args:
         disks: Lista de discos analisados
-        all_large_files: Lista de arquivos grandes encontrados
+        all_large_files: Arquivos grandes encontrados (lista ou iterável)
         output_file: Nome do arquivo de saída (padrão: 'relatorio_discos.txt')
+        directories: Diretórios mais pesados (ver DirectoryTree.top_directories);
+            se informado, o relatório ganha a seção correspondente
+        duplicates: Grupos de duplicados (ver infos.dedupe.find_duplicates);
+            se informado, o relatório ganha a seção de espaço recuperável
+        diff: Diferença para a execução anterior (ver
+            infos.snapshot.summarize_diff); se informada, o relatório ganha
+            a seção do que mudou desde ela
+        coverage: Cobertura de um escaneamento com prazo (ver
+            run_scan(time_budget=...)); se o prazo tiver acabado, o
+            relatório avisa que a lista é aproximada
+        filters: Expressões do filtro de arquivos usado no escaneamento
+            (ver infos.filters); se houver, aparecem no cabeçalho
+        histograms: Distribuição dos arquivos (ver
+            infos.histogram.FileHistogram.summarize); se informada, o
+            relatório ganha as seções por tamanho, idade e extensão
         
     Returns:
         None
@@ -35,16 +119,38 @@ def generate_report(
         O arquivo é salvo com codificação UTF-8 no diretório atual.
         O relatório inclui:
         - Data e hora da análise
+        - Filtro de arquivos aplicado (quando houver)
+        - Aviso de resultado aproximado (quando o prazo acabou)
         - Informações detalhadas de cada disco
         - Lista ordenada dos arquivos mais pesados
+        - Lista dos diretórios mais pesados (quando informada)
+        - Duplicados e espaço recuperável (quando informados)
+        - Distribuição por tamanho, idade e extensão (quando informada)
+        - Diferenças desde a execução anterior (quando informadas)
     """
 
-    with open(output_file, "w", encoding="utf-8") as f:
+    with open(output_file, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
         f.write("=" * 80 + "\n")
         f.write("RELATÓRIO DE ANÁLISE DE DISCOS\n")
         f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if filters:
+            f.write(f"Filtro: {' E '.join(filters)}\n")
         f.write("=" * 80 + "\n\n")
 
+        if coverage is not None and coverage["exhausted"]:
+            f.write("RESULTADO APROXIMADO: o prazo do escaneamento acabou\n")
+            f.write(
+                f"  Pastas visitadas: {coverage['directories_visited']} de "
+                f"{coverage['directories_visited'] + coverage['directories_pending']}"
+                f" conhecidas ({coverage['directory_fraction']:.0%})\n"
+            )
+            if coverage["unscanned_bytes_estimate"] is not None:
+                f.write(
+                    f"  Estimativa não escaneada: "
+                    f"{coverage['unscanned_bytes_estimate'] / (1024**3):.2f} GB\n"
+                )
+            f.write("\n")
+
         # Informações dos discos
         f.write(f"TOTAL DE DISCOS ENCONTRADOS: {len(disks)}\n\n")
 
@@ -64,14 +170,68 @@ def generate_report(
         f.write("ARQUIVOS MAIS PESADOS ENCONTRADOS\n")
         f.write("=" * 80 + "\n\n")
 
-        if all_large_files:
-            for i, file in enumerate(all_large_files, 1):
-                f.write(f"\n{i}. Tamanho: {file['size_gb']:.2f} GB\n")
-                f.write(f"   Caminho: {file['path']}\n")
-                f.write(f"   Modificado: {file['modified']}\n")
-        else:
+        # Aceita qualquer iterável (ex: leitura em streaming de um arquivo);
+        # cada lote de entradas é formatado e gravado com uma só escrita
+        written = 0
+        for batch in _batches(all_large_files):
+            lines = []
+            for i, file in enumerate(batch, written + 1):
+                size_gb, path, modified, allocated_gb = _file_values(file)
+                lines.append(
+                    f"\n{i}. Tamanho: {size_gb:.2f} GB "
+                    f"(em disco: {allocated_gb:.2f} GB)\n"
+                    f"   Caminho: {path}\n"
+                    f"   Modificado: {modified}\n"
+                )
+            f.write("".join(lines))
+            written += len(batch)
+
+        if not written:
             f.write("Nenhum arquivo grande encontrado.\n")
 
+        if directories is not None:
+            f.write("\n\n")
+            f.write("=" * 80 + "\n")
+            f.write("DIRETÓRIOS MAIS PESADOS\n")
+            f.write("=" * 80 + "\n\n")
+
+            if directories:
+                for i, directory in enumerate(directories, 1):
+                    f.write(f"\n{i}. Tamanho: {directory['size_gb']:.2f} GB\n")
+                    f.write(f"   Caminho: {directory['path']}\n")
+                    f.write(
+                        f"   Arquivos diretamente na pasta: "
+                        f"{directory['own_bytes'] / (1024**3):.2f} GB\n"
+                    )
+            else:
+                f.write("Nenhum diretório analisado.\n")
+
+        if duplicates is not None:
+            f.write("\n\n")
+            f.write("=" * 80 + "\n")
+            f.write("ARQUIVOS DUPLICADOS / ESPAÇO RECUPERÁVEL\n")
+            f.write("=" * 80 + "\n\n")
+
+            if duplicates:
+                total = sum(group["reclaimable_gb"] for group in duplicates)
+                f.write(f"Espaço recuperável total: {total:.2f} GB\n")
+                for i, group in enumerate(duplicates, 1):
+                    f.write(
+                        f"\n{i}. {len(group['paths'])} cópias de "
+                        f"{group['size_gb']:.2f} GB "
+                        f"(recuperável: {group['reclaimable_gb']:.2f} GB)\n"
+                    )
+                    for path in group["paths"]:
+                        f.write(f"   - {path}\n")
+            else:
+                f.write("Nenhum arquivo duplicado encontrado.\n")
+
+        if histograms is not None:
+            _write_histogram_section(f, histograms)
+
+        if diff is not None:
+            _write_diff_section(f, diff)
+
         f.write("\n" + "=" * 80 + "\n")
         f.write("FIM DO RELATÓRIO\n")
         f.write("=" * 80 + "\n")
@@ -79,9 +239,65 @@ def generate_report(
     print(f"\nRelatório salvo em: {output_file}")
 
 
+def _write_histogram_section(f: TextIO, histograms: Dict[str, Any]) -> None:
+    """Escreve a seção de distribuição dos arquivos do relatório TXT."""
+    f.write("\n\n")
+    f.write("=" * 80 + "\n")
+    f.write("DISTRIBUIÇÃO DOS ARQUIVOS\n")
+    f.write("=" * 80 + "\n\n")
+    f.write(
+        f"Arquivos contados: {histograms['files']} "
+        f"({histograms['bytes'] / (1024**3):.2f} GB)\n"
+    )
+
+    for key, title, _ in _HISTOGRAM_GROUPS:
+        f.write(f"\n{'─' * 80}\n")
+        f.write(f"{title}\n")
+        f.write(f"{'─' * 80}\n")
+        f.write(f"  {'':<28}{'Arquivos':>14}{'Tamanho (GB)':>16}{'%':>8}\n")
+        for row in histograms[key]:
+            f.write(
+                f"  {row['label']:<28}{row['files']:>14}"
+                f"{row['bytes'] / (1024**3):>16.2f}{row['percent']:>7.1f}%\n"
+            )
+
+
+def _write_diff_section(f: TextIO, diff: Dict[str, Any]) -> None:
+    """Escreve a seção de diferenças do relatório TXT."""
+    f.write("\n\n")
+    f.write("=" * 80 + "\n")
+    f.write("DIFERENÇAS DESDE A EXECUÇÃO ANTERIOR\n")
+    f.write("=" * 80 + "\n\n")
+    f.write(f"Execução anterior: {diff['old']['created_at']}\n")
+    f.write(f"Execução atual: {diff['new']['created_at']}\n")
+
+    for kind, title, _ in _DIFF_KINDS:
+        for status, label, _ in _DIFF_STATUSES:
+            total = diff["totals"][kind][status]
+            f.write(f"\n{'─' * 80}\n")
+            if total["count"] and "bytes" in total:
+                f.write(
+                    f"{title} {label}: {total['count']} "
+                    f"({total['bytes'] / (1024**3):+.2f} GB)\n"
+                )
+            else:
+                f.write(f"{title} {label}: {total['count']}\n")
+            f.write(f"{'─' * 80}\n")
+            for i, entry in enumerate(diff[kind][status], 1):
+                f.write(
+                    f"\n{i}. Variação: {entry['delta_gb']:+.2f} GB "
+                    f"({entry['old_bytes'] / (1024**3):.2f} → "
+                    f"{entry['new_bytes'] / (1024**3):.2f} GB)\n"
+                )
+                f.write(f"   Caminho: {entry['path']}\n")
+
+
 def generate_csv_report(
-    all_large_files: List[Dict[str, Any]], 
-    output_file: str = "relatorio_arquivos.csv"
+    all_large_files: Iterable[Dict[str, Any]], 
+    output_file: str = "relatorio_arquivos.csv",
+    directories: Optional[List[Dict[str, Any]]] = None,
+    duplicates: Optional[List[Dict[str, Any]]] = None,
+    histograms: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Gera relatório em formato CSV para análise em planilhas.
     
@@ -89,24 +305,187 @@ def generate_csv_report(
     contendo lista de arquivos grandes com tamanho e informações.
     
     Args:
-        all_large_files: Lista de arquivos grandes encontrados
+        all_large_files: Arquivos grandes encontrados (lista ou iterável)
         output_file: Nome do arquivo CSV (padrão: 'relatorio_arquivos.csv')
+        directories: Diretórios mais pesados; se informado, são listados
+            após uma linha em branco, com cabeçalho próprio
+        duplicates: Grupos de duplicados; se informado, cada cópia é
+            listada numa seção própria, também após uma linha em branco
+        histograms: Distribuição dos arquivos; se informada, cada faixa
+            vira uma linha de uma seção própria, após uma linha em branco
         
     Returns:
         None
         
     Note:
         - O arquivo é salvo com codificação UTF-8
-        - Colunas: Tamanho (GB), Caminho, Data de Modificação
+        - Colunas: Tamanho (GB), Caminho, Data de Modificação, Em Disco (GB)
+        - Seção de diretórios: Tamanho (GB), Diretório, Tamanho Próprio (GB)
+        - Seção de duplicados: Grupo, Tamanho (GB), Caminho, Recuperável (GB)
+        - Seção de histogramas: Histograma, Faixa, Arquivos, Tamanho (GB),
+          Bytes, % do espaço
         - Formato CSV padrão compatível com Excel
         - Pode ser aberto em Excel, Google Sheets, LibreOffice, etc
     """
 
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
+    with open(
+        output_file, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE
+    ) as f:
         writer = csv.writer(f)
-        writer.writerow(["Tamanho (GB)", "Caminho", "Data de Modificação"])
+        writer.writerow(
+            ["Tamanho (GB)", "Caminho", "Data de Modificação", "Em Disco (GB)"]
+        )
+
+        for batch in _batches(all_large_files):
+            rows = []
+            for file in batch:
+                size_gb, path, modified, allocated_gb = _file_values(file)
+                rows.append([f"{size_gb:.2f}", path, modified, f"{allocated_gb:.2f}"])
+            writer.writerows(rows)
 
-        for file in all_large_files:
-            writer.writerow([f"{file['size_gb']:.2f}", file["path"], file["modified"]])
+        if directories:
+            writer.writerow([])
+            writer.writerow(["Tamanho (GB)", "Diretório", "Tamanho Próprio (GB)"])
+            for directory in directories:
+                writer.writerow(
+                    [
+                        f"{directory['size_gb']:.2f}",
+                        directory["path"],
+                        f"{directory['own_bytes'] / (1024**3):.2f}",
+                    ]
+                )
+
+        if duplicates:
+            writer.writerow([])
+            writer.writerow(["Grupo", "Tamanho (GB)", "Caminho", "Recuperável (GB)"])
+            for i, group in enumerate(duplicates, 1):
+                for path in group["paths"]:
+                    writer.writerow(
+                        [
+                            i,
+                            f"{group['size_gb']:.2f}",
+                            path,
+                            f"{group['reclaimable_gb']:.2f}",
+                        ]
+                    )
+
+        if histograms is not None:
+            writer.writerow([])
+            writer.writerow(
+                ["Histograma", "Faixa", "Arquivos", "Tamanho (GB)", "Bytes", "%"]
+            )
+            for key, _, label in _HISTOGRAM_GROUPS:
+                writer.writerows(
+                    [
+                        label,
+                        row["label"],
+                        row["files"],
+                        f"{row['bytes'] / (1024**3):.2f}",
+                        row["bytes"],
+                        f"{row['percent']:.1f}",
+                    ]
+                    for row in histograms[key]
+                )
 
     print(f"Relatório CSV salvo em: {output_file}")
+
+
+def generate_diff_csv(
+    diff: Dict[str, Any],
+    output_file: str = "relatorio_diferencas.csv",
+) -> None:
+    """Gera o CSV da diferença entre duas execuções.
+
+    Args:
+        diff: Diferença retornada em ``run_scan(...)['diff']`` (ver
+            infos.snapshot.summarize_diff)
+        output_file: Nome do arquivo CSV (padrão: 'relatorio_diferencas.csv')
+
+    Returns:
+        None
+
+    Note:
+        - O arquivo é salvo com codificação UTF-8
+        - Colunas: Tipo, Mudança, Variação (GB), Antes (GB), Depois (GB),
+          Variação (bytes), Caminho
+        - Arquivos primeiro e depois diretórios, cada grupo da maior
+          variação positiva para a mais negativa
+    """
+
+    with open(
+        output_file, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "Tipo",
+                "Mudança",
+                "Variação (GB)",
+                "Antes (GB)",
+                "Depois (GB)",
+                "Variação (bytes)",
+                "Caminho",
+            ]
+        )
+
+        for kind, _, kind_label in _DIFF_KINDS:
+            rows = [
+                (entry, status_label)
+                for status, _, status_label in _DIFF_STATUSES
+                for entry in diff[kind][status]
+            ]
+            rows.sort(key=lambda row: row[0]["delta_bytes"], reverse=True)
+            writer.writerows(
+                [
+                    kind_label,
+                    status_label,
+                    f"{entry['delta_gb']:+.2f}",
+                    f"{entry['old_bytes'] / (1024**3):.2f}",
+                    f"{entry['new_bytes'] / (1024**3):.2f}",
+                    entry["delta_bytes"],
+                    entry["path"],
+                ]
+                for entry, status_label in rows
+            )
+
+    print(f"Relatório de diferenças salvo em: {output_file}")
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa registros de arquivo (``FileRecord``) como objetos JSON."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Objeto não serializável em JSON: {type(value).__name__}")
+
+
+def generate_json_report(
+    result: Dict[str, Any],
+    output_file: str = "relatorio.json",
+) -> None:
+    """Gera relatório JSON com o resultado completo de um escaneamento.
+
+    Args:
+        result: Resultado retornado por ``analyzer.disk_analyzer.run_scan``
+        output_file: Nome do arquivo JSON, ou '-' para a saída padrão
+            (padrão: 'relatorio.json')
+
+    Returns:
+        None
+
+    Note:
+        - O arquivo é salvo com codificação UTF-8
+        - Inclui a data da análise no campo 'generated_at'
+    """
+    document = dict(result, generated_at=datetime.now().isoformat(timespec="seconds"))
+
+    if output_file == "-":
+        json.dump(
+            document, sys.stdout, ensure_ascii=False, indent=2, default=_json_default
+        )
+        sys.stdout.write("\n")
+        return
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2, default=_json_default)
+
+    print(f"Relatório JSON salvo em: {output_file}")
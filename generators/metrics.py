@@ -0,0 +1,193 @@
+"""Exportação das métricas de escaneamento.
+
+Grava as métricas consolidadas por ``run_scan(collect_metrics=True)``
+(ver ``infos.metrics``) em JSON ou no formato texto do Prometheus, para
+o textfile collector do node_exporter.
+
+Funções:
+    write_metrics_json(): Grava as métricas em JSON
+    write_prometheus_textfile(): Grava as métricas no formato do Prometheus
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+# Prefixo de todas as métricas exportadas
+PREFIX = "disk_analyzer"
+
+
+def write_metrics_json(metrics: Dict[str, Any], path: str) -> None:
+    """Grava as métricas de uma execução em JSON.
+
+    Args:
+        metrics: Valor de ``result['metrics']`` retornado por ``run_scan``
+        path: Arquivo de saída, ou '-' para a saída padrão
+    """
+    text = json.dumps(metrics, ensure_ascii=False, indent=2) + "\n"
+    if path == "-":
+        print(text, end="")
+        return
+    _atomic_write(path, text)
+
+
+def _escape(value: str) -> str:
+    """Escapa o valor de um rótulo no formato texto do Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + body + "}"
+
+
+class _Exposition:
+    """Acumula amostras agrupadas por métrica (HELP/TYPE uma vez cada)."""
+
+    def __init__(self) -> None:
+        # Dicts preservam a ordem de inserção: as métricas saem na ordem
+        # em que foram registradas
+        self._meta = {}  # type: Dict[str, str]
+        self._samples = {}  # type: Dict[str, Any]
+
+    def add(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> None:
+        name = f"{PREFIX}_{name}"
+        if name not in self._meta:
+            self._meta[name] = f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n"
+            self._samples[name] = []
+        self._samples[name].append(f"{name}{_labels(labels or {})} {value!r}\n")
+
+    def render(self) -> str:
+        return "".join(
+            self._meta[name] + "".join(self._samples[name]) for name in self._meta
+        )
+
+
+# Contadores por disco: chave em ScanMetrics.to_dict() -> (nome, ajuda)
+_COUNTERS = (
+    ("directories", "directories_total", "Pastas listadas."),
+    ("entries", "entries_total", "Entradas examinadas."),
+    ("stat_calls", "stat_calls_total", "Chamadas stat realizadas."),
+)
+
+
+def _disk_samples(out: _Exposition, disk: str, metrics: Dict[str, Any]) -> None:
+    labels = {"disk": disk}
+
+    for key, name, help_text in _COUNTERS:
+        out.add(name, "counter", help_text, metrics[key], labels)
+    for errno_name, count in sorted(metrics["errors"].items()):
+        out.add(
+            "errors_total",
+            "counter",
+            "Erros de acesso por errno.",
+            count,
+            dict(labels, errno=errno_name),
+        )
+    for part, seconds in sorted(metrics["time_breakdown"].items()):
+        out.add(
+            "time_seconds",
+            "gauge",
+            "Tempo gasto por etapa (listing, stat, filter).",
+            seconds,
+            dict(labels, part=part),
+        )
+    out.add(
+        "directories_per_second",
+        "gauge",
+        "Pastas listadas por segundo.",
+        metrics["directories_per_second"],
+        labels,
+    )
+    for rank, slow in enumerate(metrics["slowest_directories"], 1):
+        out.add(
+            "slow_directory_seconds",
+            "gauge",
+            "Pastas mais lentas de listar.",
+            slow["seconds"],
+            dict(labels, rank=str(rank), path=slow["path"]),
+        )
+
+
+def write_prometheus_textfile(
+    metrics: Dict[str, Any], path: str, timestamp: Optional[float] = None
+) -> None:
+    """Grava as métricas no formato texto do Prometheus.
+
+    O arquivo é escrito em um temporário na mesma pasta e renomeado,
+    para que o textfile collector nunca leia um arquivo pela metade.
+
+    Args:
+        metrics: Valor de ``result['metrics']`` retornado por ``run_scan``
+        path: Arquivo de saída (normalmente ``*.prom`` na pasta do collector)
+        timestamp: Momento da execução (padrão: agora)
+    """
+    out = _Exposition()
+
+    for disk, disk_metrics in sorted(metrics["disks"].items()):
+        _disk_samples(out, disk, disk_metrics)
+    for phase, seconds in sorted(metrics["phases"].items()):
+        out.add(
+            "phase_seconds",
+            "gauge",
+            "Duração de cada fase da execução.",
+            seconds,
+            {"phase": phase},
+        )
+    throttle = metrics.get("throttle")
+    if throttle is not None:
+        out.add(
+            "throttled_seconds",
+            "gauge",
+            "Espera somada das threads pelos limites de ritmo.",
+            throttle["throttled_seconds"],
+        )
+        out.add(
+            "paused_seconds",
+            "gauge",
+            "Tempo em pausa por carga do sistema ou dos discos.",
+            throttle["paused_seconds"],
+        )
+        out.add(
+            "pauses",
+            "gauge",
+            "Pausas por carga do sistema ou dos discos.",
+            throttle["pauses"],
+        )
+    out.add(
+        "last_run_timestamp_seconds",
+        "gauge",
+        "Momento da última execução (epoch).",
+        time.time() if timestamp is None else timestamp,
+    )
+
+    _atomic_write(path, out.render())
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Grava ``text`` em ``path`` via arquivo temporário + ``os.replace``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".metrics_", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # mkstemp cria com 0600; o collector costuma rodar com outro usuário
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
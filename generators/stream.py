@@ -0,0 +1,365 @@
+"""Gravação incremental (streaming) de resultados.
+
+Este módulo grava cada arquivo grande assim que ``scan_large_files`` o
+encontra, num arquivo só de acréscimo (JSON Lines ou CSV) com flush e
+fsync periódicos. Se o escaneamento for interrompido, o que já foi
+gravado continua disponível e pode ser transformado nos relatórios
+finais com ``finalize_stream``, sem carregar tudo em memória.
+
+Classes:
+    StreamSink: Arquivo de acréscimo com flush/fsync periódicos
+
+Funções:
+    read_stream(): Lê os registros de um arquivo de stream
+    sorted_stream(): Ordena um stream por tamanho com ordenação externa
+    finalize_stream(): Gera os relatórios TXT/CSV/colunar a partir de um stream
+"""
+
+import csv
+import heapq
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from infos.topk import file_info
+
+from .main import BUFFER_SIZE, _batches, generate_csv_report, generate_report
+
+
+# Registros ordenados em memória por vez durante a ordenação externa
+DEFAULT_CHUNK_RECORDS = 200_000
+
+# (tamanho aparente, caminho, mtime, bytes alocados)
+_Record = Tuple[int, str, float, int]
+
+# Critério de ordenação -> posição no registro
+_RANK_KEYS = {"apparent": itemgetter(0), "allocated": itemgetter(3)}
+
+
+def _stream_format(path: str) -> str:
+    """Deduz o formato pelo nome do arquivo ('.csv' ou JSON Lines)."""
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+class StreamSink:
+    """Arquivo de acréscimo com os arquivos grandes encontrados.
+
+    O formato é escolhido pela extensão: ``.csv`` grava ``tamanho,mtime,
+    caminho,alocado``; qualquer outra grava JSON Lines. A cada ``flush_every``
+    registros ou ``flush_interval`` segundos (o que vier primeiro) os
+    dados são enviados ao disco com ``flush`` + ``os.fsync``.
+
+    ``write`` tem a assinatura esperada por ``scan_large_files(on_match=)``
+    e é segura para uso com várias threads.
+
+    Args:
+        path: Caminho do arquivo de stream
+        flush_every: Registros entre flushes (padrão: 1000)
+        flush_interval: Segundos entre flushes (padrão: 5.0)
+        append: Se True, continua um stream existente em vez de
+            recomeçá-lo (padrão: False)
+
+    Example:
+        >>> with StreamSink('achados.jsonl') as sink:
+        ...     scan_large_files('/dados', 1.0, on_match=sink.write)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_every: int = 1000,
+        flush_interval: float = 5.0,
+        append: bool = False,
+    ) -> None:
+        self.path = path
+        self.format = _stream_format(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._file) if self.format == "csv" else None
+
+    def __enter__(self) -> "StreamSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write(
+        self, size: int, path: str, mtime: float, allocated: Optional[int] = None
+    ) -> None:
+        """Acrescenta um arquivo ao stream."""
+        if allocated is None:
+            allocated = size
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerow([size, mtime, path, allocated])
+            else:
+                self._file.write(
+                    json.dumps(
+                        {
+                            "size_bytes": size,
+                            "allocated_bytes": allocated,
+                            "mtime": mtime,
+                            "path": path,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+            self.records += 1
+            self._unflushed += 1
+
+            if self._unflushed >= self.flush_every or (
+                time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._sync()
+
+    def close(self) -> None:
+        """Envia os dados pendentes ao disco e fecha o arquivo."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+
+def read_stream(path: str) -> Iterator[_Record]:
+    """Lê os registros ``(tamanho, caminho, mtime, alocado)`` de um stream.
+
+    Linhas incompletas (por exemplo, a última linha após uma queda) são
+    ignoradas. Streams sem o espaço alocado usam o tamanho aparente.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if _stream_format(path) == "csv":
+            for row in csv.reader(f):
+                try:
+                    size = int(row[0])
+                    allocated = int(row[3]) if len(row) > 3 else size
+                    yield size, row[2], float(row[1]), allocated
+                except (IndexError, ValueError):
+                    continue
+        else:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                    size = int(item["size_bytes"])
+                    allocated = int(item.get("allocated_bytes", size))
+                    yield size, item["path"], float(item["mtime"]), allocated
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+
+
+def _write_run(records: List[_Record], directory: str) -> str:
+    """Grava um bloco já ordenado num arquivo temporário."""
+    fd, run_path = tempfile.mkstemp(prefix="run_", suffix=".jsonl", dir=directory)
+    with io.open(fd, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        _write_records(f, records)
+    return run_path
+
+
+def _write_records(f: Any, records: Iterable[_Record]) -> int:
+    """Grava registros em JSON Lines, um lote por escrita; retorna quantos."""
+    count = 0
+    for batch in _batches(records):
+        f.write(
+            "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+        )
+        count += len(batch)
+    return count
+
+
+def _read_run(run_path: str) -> Iterator[_Record]:
+    with open(run_path, encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        for line in f:
+            size, path, mtime, allocated = json.loads(line)
+            yield size, path, mtime, allocated
+
+
+def sorted_stream(
+    path: str, chunk_records: int = DEFAULT_CHUNK_RECORDS, rank_by: str = "apparent"
+) -> Iterator[_Record]:
+    """Percorre um stream do maior para o menor arquivo.
+
+    Ordenação externa: o stream é lido em blocos de ``chunk_records``
+    registros, cada bloco é ordenado e gravado num arquivo temporário e
+    os blocos são intercalados com ``heapq.merge``. A memória fica
+    limitada a um bloco, independentemente do tamanho do stream.
+
+    Args:
+        path: Arquivo de stream
+        chunk_records: Registros ordenados em memória por vez
+        rank_by: Ordena pelo tamanho aparente ('apparent') ou pelo
+            espaço alocado ('allocated') (padrão: 'apparent')
+
+    Yields:
+        Tuplas ``(tamanho, caminho, mtime, alocado)`` em ordem decrescente
+    """
+    key = _RANK_KEYS[rank_by]
+    records = read_stream(path)
+    first = list(islice(records, chunk_records))
+    rest = list(islice(records, chunk_records))
+
+    if not rest:
+        # Cabe em um único bloco: dispensa arquivos temporários
+        first.sort(key=key, reverse=True)
+        yield from first
+        return
+
+    with tempfile.TemporaryDirectory(prefix="disk_analyzer_sort_") as tmp:
+        runs = []
+        chunk = first
+        while chunk:
+            chunk.sort(key=key, reverse=True)
+            runs.append(_write_run(chunk, tmp))
+            chunk, rest = rest, list(islice(records, chunk_records))
+
+        yield from heapq.merge(
+            *(_read_run(run) for run in runs), key=key, reverse=True
+        )
+
+
+def _unique(
+    records: Iterator[_Record], key: Callable[[_Record], int]
+) -> Iterator[_Record]:
+    """Descarta caminhos repetidos de um stream já ordenado.
+
+    Um escaneamento retomado de um checkpoint grava de novo os achados
+    posteriores ao checkpoint; as repetições têm a mesma chave, então
+    ficam vizinhas na ordem e basta lembrar os caminhos da chave atual.
+    """
+    current = None
+    seen = set()
+    for record in records:
+        if key(record) != current:
+            current = key(record)
+            seen.clear()
+        if record[1] in seen:
+            continue
+        seen.add(record[1])
+        yield record
+
+
+def _top_per_root(
+    records: Iterable[_Record], roots: Iterable[str], limit: int
+) -> Iterator[_Record]:
+    """Mantém, na ordem recebida, só os ``limit`` primeiros de cada raiz.
+
+    Cada caminho pertence à raiz mais longa que o contém, como os discos
+    de ``run_scan``; caminhos fora de todas formam um grupo à parte.
+    """
+    prefixes = sorted(
+        {root.rstrip(os.sep) + os.sep for root in roots}, key=len, reverse=True
+    )
+    counts = {}  # type: Dict[str, int]
+    for record in records:
+        path = record[1]
+        root = next((prefix for prefix in prefixes if path.startswith(prefix)), "")
+        seen = counts.get(root, 0)
+        if seen < limit:
+            counts[root] = seen + 1
+            yield record
+
+
+def finalize_stream(
+    stream_path: str,
+    disks: List[Dict[str, Any]],
+    txt_file: Optional[str] = "relatorio_discos.txt",
+    csv_file: Optional[str] = "relatorio_arquivos.csv",
+    limit: Optional[int] = None,
+    directories: Optional[List[Dict[str, Any]]] = None,
+    duplicates: Optional[List[Dict[str, Any]]] = None,
+    rank_by: str = "apparent",
+    diff: Optional[Dict[str, Any]] = None,
+    coverage: Optional[Dict[str, Any]] = None,
+    columnar_file: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    histograms: Optional[Dict[str, Any]] = None,
+    limit_per_disk: Optional[int] = None,
+) -> int:
+    """Gera os relatórios ordenados a partir de um arquivo de stream.
+
+    Args:
+        stream_path: Arquivo gravado por ``StreamSink``
+        disks: Discos analisados (para o cabeçalho do TXT)
+        txt_file: Relatório TXT; None para não gerar
+        csv_file: Relatório CSV; None para não gerar
+        limit: Máximo de arquivos nos relatórios (padrão: None, todos)
+        directories: Seção opcional de diretórios mais pesados
+        duplicates: Seção opcional de duplicados
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent')
+        diff: Seção opcional de diferenças desde a execução anterior
+        coverage: Cobertura de um escaneamento com prazo, para o aviso de
+            resultado aproximado
+        columnar_file: Exportação colunar (ver ``generators.columnar``);
+            None para não gerar
+        filters: Expressões do filtro de arquivos, para o cabeçalho do TXT
+        histograms: Seção opcional de distribuição dos arquivos
+        limit_per_disk: Máximo de arquivos de cada disco de ``disks``,
+            como o ``max_files`` de ``run_scan``: com ele os relatórios
+            trazem os mesmos arquivos de uma execução sem stream
+            (padrão: None, todos)
+
+    Returns:
+        Quantidade de arquivos listados
+    """
+    with tempfile.TemporaryDirectory(prefix="disk_analyzer_final_") as tmp:
+        # Ordena uma única vez; cada relatório relê o resultado do disco
+        sorted_path = os.path.join(tmp, "sorted.jsonl")
+        with open(sorted_path, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+            records = _unique(
+                sorted_stream(stream_path, rank_by=rank_by), _RANK_KEYS[rank_by]
+            )
+            if limit_per_disk is not None:
+                records = _top_per_root(
+                    records, [disk["mountpoint"] for disk in disks], limit_per_disk
+                )
+            count = _write_records(f, islice(records, limit))
+
+        def files() -> Iterator[Dict[str, Any]]:
+            for size, path, mtime, allocated in _read_run(sorted_path):
+                yield file_info(size, path, mtime, allocated)
+
+        if txt_file is not None:
+            generate_report(
+                disks,
+                files(),
+                txt_file,
+                directories=directories,
+                duplicates=duplicates,
+                diff=diff,
+                coverage=coverage,
+                filters=filters,
+                histograms=histograms,
+            )
+        if csv_file is not None:
+            generate_csv_report(
+                files(),
+                csv_file,
+                directories=directories,
+                duplicates=duplicates,
+                histograms=histograms,
+            )
+        if columnar_file is not None:
+            # Sob demanda: com pyarrow instalado, a importação custa caro
+            from .columnar import generate_columnar_report
+
+            generate_columnar_report(
+                files(), columnar_file, [disk["mountpoint"] for disk in disks]
+            )
+
+    return count
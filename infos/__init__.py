@@ -2,8 +2,55 @@
 
 Este pacote fornece funcionalidades para obter informações sobre
 discos e escanear arquivos no sistema.
+
+Os nomes exportados são importados no primeiro acesso (PEP 562): ``import
+infos`` não carrega o escaneamento, e quem usa só ``infos.get_all_disks``
+não paga pelo resto.
 """
 
-from .main import get_all_disks, scan_large_files, select_disks, get_size_in_gb
+import sys
+from importlib import import_module
+from typing import Any
+
+# Nome exportado -> módulo que o define
+_EXPORTS = {
+    'get_all_disks': '.disks',
+    'get_disk_for_path': '.disks',
+    'scan_large_files': '.main',
+    'select_disks': '.main',
+    'get_size_in_gb': '.disks',
+    'TopFiles': '.topk',
+    'merge_top_files': '.topk',
+    'ScanIndex': '.index',
+    'DirectoryTree': '.tree',
+    'find_duplicates': '.dedupe',
+    'HashCache': '.dedupe',
+    'IgnoreRules': '.rules',
+    'InodeSet': '.inodes',
+    'FileRecord': '.records',
+    'ScanMetrics': '.metrics',
+    'ScanCheckpoint': '.checkpoint',
+    'Throttle': '.throttle',
+    'SnapshotWriter': '.snapshot',
+    'diff_snapshots': '.snapshot',
+    'ScanBudget': '.budget',
+    'FileFilter': '.filters',
+    'FileHistogram': '.histogram',
+    'LiveIndex': '.watch',
+    'WatchDaemon': '.watch',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['get_all_disks', 'scan_large_files', 'select_disks', 'get_size_in_gb']
+if sys.version_info < (3, 7):  # sem __getattr__ de módulo: importa tudo
+    for _name in __all__:
+        __getattr__(_name)
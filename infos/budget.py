@@ -0,0 +1,166 @@
+"""Escaneamento com prazo (modo aproximado).
+
+Com um prazo em segundos, ``scan_large_files`` deixa de percorrer a
+árvore em profundidade e passa a visitar primeiro as pastas que mais
+provavelmente guardam os arquivos grandes. Quando o prazo acaba, a
+travessia para e devolve o melhor top-N encontrado até ali, junto com
+uma estimativa de cobertura.
+
+A prioridade de cada pasta é o tamanho estimado da sua subárvore:
+    - O tamanho da pasta no snapshot anterior (``directory_hints``),
+      quando houver
+    - Senão, a parte não explicada do tamanho estimado do pai dividida
+      igualmente entre as subpastas sem estimativa; a raiz começa com o
+      espaço usado do disco
+Empates (ex: sem estimativa nenhuma) são desfeitos pela profundidade e
+depois ao acaso, o que vira uma busca em largura com amostragem
+aleatória das pastas de cada nível.
+
+Classes:
+    ScanBudget: Prazo, ordem de visita e cobertura de um escaneamento
+"""
+
+import os
+import random
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Chave de prioridade: (-bytes estimados, profundidade, desempate aleatório)
+PriorityKey = Tuple[float, int, float]
+
+
+class ScanBudget:
+    """Prazo, ordem de visita e cobertura de um escaneamento aproximado.
+
+    Passe como ``budget=`` para ``scan_large_files``. O prazo começa a
+    contar no início do escaneamento e é verificado antes de cada pasta.
+
+    Args:
+        seconds: Tempo máximo do escaneamento
+        hints: Bytes da subárvore de cada pasta numa execução anterior
+            (ver ``infos.snapshot.directory_hints``) (padrão: None)
+        used_bytes: Bytes ocupados sob a raiz, base da estimativa do que
+            faltou escanear. Padrão: ``shutil.disk_usage(raiz).used`` se a
+            raiz for um ponto de montagem, senão o tamanho da raiz em
+            ``hints``
+
+    Attributes:
+        exhausted: True se o prazo acabou antes do fim da travessia
+        directories: Pastas visitadas
+        bytes_seen: Soma dos arquivos das pastas visitadas
+
+    Example:
+        >>> budget = ScanBudget(30)
+        >>> files = scan_large_files('/dados', 1.0, budget=budget)
+        >>> budget.coverage()['directory_fraction']
+        0.42
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        hints: Optional[Dict[str, int]] = None,
+        used_bytes: Optional[int] = None,
+    ) -> None:
+        self.seconds = seconds
+        self.hints = hints or {}
+        self.used_bytes = used_bytes
+        self.exhausted = False
+        self.directories = 0
+        self.bytes_seen = 0
+        self._deadline = time.monotonic() + seconds
+        self._started = time.monotonic()
+        # Pasta na fila -> (bytes estimados, profundidade)
+        self._pending = {}  # type: Dict[str, Tuple[float, int]]
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def start(self, root: str) -> None:
+        """Começa a contar o prazo para o escaneamento de ``root``."""
+        self._started = time.monotonic()
+        self._deadline = self._started + self.seconds
+        if self.used_bytes is None:
+            if os.path.ismount(root):
+                self.used_bytes = shutil.disk_usage(root).used
+            else:
+                self.used_bytes = self.hints.get(root)
+
+    def expired(self) -> bool:
+        """Diz se o prazo acabou (e marca ``exhausted``)."""
+        if not self.exhausted and time.monotonic() >= self._deadline:
+            self.exhausted = True
+        return self.exhausted
+
+    def order(self, parent: Optional[str], subdirs: List[str]) -> List[PriorityKey]:
+        """Calcula a prioridade das subpastas de ``parent`` (menor = antes).
+
+        Args:
+            parent: Pasta recém-visitada, ou None para as pastas iniciais
+            subdirs: Subpastas a enfileirar
+
+        Returns:
+            Uma chave por subpasta, na mesma ordem
+        """
+        with self._lock:
+            if parent is None:
+                estimate, depth = float(self.used_bytes or 0), -1
+            else:
+                estimate, depth = self._pending.pop(parent, (0.0, 0))
+
+            hints = self.hints
+            known = sum(hints[subdir] for subdir in subdirs if subdir in hints)
+            unknown = sum(1 for subdir in subdirs if subdir not in hints)
+            share = max(estimate - known, 0.0) / unknown if unknown else 0.0
+
+            keys = []
+            for subdir in subdirs:
+                size = hints.get(subdir, share)
+                self._pending[subdir] = (size, depth + 1)
+                keys.append((-size, depth + 1, self._random.random()))
+        return keys
+
+    def add_directory(self, total_bytes: int) -> None:
+        """Contabiliza uma pasta visitada e a soma dos seus arquivos."""
+        with self._lock:
+            self.directories += 1
+            self.bytes_seen += total_bytes
+
+    def coverage(self) -> Dict[str, Any]:
+        """Estimativa da cobertura do escaneamento.
+
+        Returns:
+            Dicionário com:
+            - seconds: Prazo configurado
+            - elapsed: Tempo gasto
+            - exhausted: Se o prazo acabou antes do fim
+            - directories_visited, directories_pending: Pastas visitadas e
+              descobertas mas não visitadas
+            - directory_fraction: Fração das pastas conhecidas que foram
+              visitadas; as subpastas das não visitadas são desconhecidas,
+              então é um limite superior
+            - bytes_seen: Bytes dos arquivos das pastas visitadas
+            - used_bytes: Bytes ocupados sob a raiz (ou None)
+            - unscanned_bytes_estimate: ``used_bytes - bytes_seen`` (ou
+              None); inclui pastas ignoradas e metadados do sistema de
+              arquivos, então não chega a zero mesmo numa travessia completa
+        """
+        with self._lock:
+            pending = len(self._pending)
+            known = self.directories + pending
+            unscanned = None
+            if self.used_bytes is not None:
+                unscanned = max(0, self.used_bytes - self.bytes_seen)
+            return {
+                "seconds": self.seconds,
+                "elapsed": time.monotonic() - self._started,
+                "exhausted": self.exhausted,
+                "directories_visited": self.directories,
+                "directories_pending": pending,
+                "directory_fraction": self.directories / known if known else 1.0,
+                "bytes_seen": self.bytes_seen,
+                "used_bytes": self.used_bytes,
+                "unscanned_bytes_estimate": unscanned,
+            }
@@ -0,0 +1,296 @@
+"""Checkpoints de escaneamentos longos.
+
+Este módulo grava periodicamente o progresso de um escaneamento em
+andamento para que uma execução interrompida por Ctrl+C ou por um reboot
+possa continuar de onde parou, sem percorrer de novo as subárvores já
+concluídas.
+
+O arquivo é um diário: o primeiro registro identifica a raiz e os
+parâmetros, e cada checkpoint acrescenta só o que mudou desde o
+anterior (pastas concluídas com suas subpastas e bytes, inodes novos),
+além dos contadores e do top-N, que são pequenos. Reaplicados em ordem,
+os registros reconstroem pastas pendentes, árvore e inodes vistos.
+Assim cada checkpoint custa o proporcional ao que mudou, tanto sob o
+lock do escaneamento quanto na thread que grava, e não ao tamanho de
+tudo o que já foi escaneado.
+
+Cada registro é um JSON comprimido com zlib e prefixado pelo tamanho;
+um registro incompleto no fim (queda no meio de uma gravação) é
+descartado na leitura e sobrescrito na próxima gravação.
+
+Classes:
+    ScanCheckpoint: Checkpoint de um ponto de montagem
+    ScanInterrupted: Escaneamento parado antes do fim
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = "checkpoints_escaneamento"
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+
+# Incrementado a cada mudança de formato; checkpoints antigos são ignorados
+_FORMAT_VERSION = 2
+
+# Tamanho (uint32) que precede cada registro comprimido
+_FRAME = struct.Struct("<I")
+
+# Registro do diário, montado por ``scan_large_files``
+Record = Dict[str, Any]
+
+
+class ScanInterrupted(Exception):
+    """Escaneamento parado antes do fim.
+
+    Levantada por ``scan_large_files`` quando o evento ``stop`` é marcado
+    ou ``ScanCheckpoint.interrupt`` é chamado; neste caso o estado já foi
+    gravado no checkpoint e pode ser retomado.
+    """
+
+
+def checkpoint_path(directory: str, root: str) -> str:
+    """Arquivo de checkpoint de uma raiz dentro de ``directory``."""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8", "surrogateescape"))
+    return os.path.join(directory, f"{digest.hexdigest()[:16]}.ckpt")
+
+
+class ScanCheckpoint:
+    """Checkpoint periódico do escaneamento de uma raiz.
+
+    Passe como ``checkpoint=`` para ``scan_large_files``. Um registro é
+    acrescentado ao diário a cada ``interval_seconds`` segundos ou
+    ``interval_dirs`` pastas (o que vier primeiro; 0 desativa o critério)
+    e o arquivo é apagado quando o escaneamento termina normalmente.
+
+    Args:
+        path: Arquivo do checkpoint (ver ``checkpoint_path``)
+        interval_seconds: Segundos entre checkpoints (padrão: 60)
+        interval_dirs: Pastas entre checkpoints (padrão: 0, desativado)
+        resume: Se True, o escaneamento continua do checkpoint existente,
+            desde que ele seja da mesma raiz e com os mesmos parâmetros
+
+    Attributes:
+        saves: Checkpoints gravados nesta execução
+
+    Example:
+        >>> checkpoint = ScanCheckpoint('dados.ckpt', resume=True)
+        >>> files = scan_large_files('/dados', 1.0, checkpoint=checkpoint)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval_seconds: float = DEFAULT_CHECKPOINT_INTERVAL,
+        interval_dirs: int = 0,
+        resume: bool = False,
+    ) -> None:
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.interval_dirs = interval_dirs
+        self.resume = resume
+        self.saves = 0
+        self.stop_event = threading.Event()
+        self._snapshot = None  # type: Optional[Callable[[], Optional[Record]]]
+        self._dirs = 0
+        self._last_save = time.monotonic()
+        self._cond = threading.Condition()
+        self._queued = []  # type: List[Record]
+        self._writing = False
+        self._writer = None  # type: Optional[threading.Thread]
+        # Cabeçalho a gravar antes do primeiro registro (diário novo)
+        self._header = None  # type: Optional[Record]
+        # Fim do último registro completo, onde a próxima gravação continua
+        self._valid_size = None  # type: Optional[int]
+
+    def load(self) -> Optional[Record]:
+        """Lê o diário gravado, ou None se não houver um válido.
+
+        Returns:
+            O cabeçalho (``root``, ``signature``...) com os registros
+            seguintes, em ordem, em ``records``
+        """
+        records = []
+        try:
+            with open(self.path, "rb") as f:
+                valid = 0
+                while True:
+                    head = f.read(_FRAME.size)
+                    if len(head) < _FRAME.size:
+                        break
+                    data = f.read(_FRAME.unpack(head)[0])
+                    try:
+                        records.append(json.loads(zlib.decompress(data)))
+                    except (zlib.error, ValueError):
+                        break
+                    valid = f.tell()
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Checkpoint ilegível em {self.path}: {e}")
+            return None
+
+        if not records or records[0].get("version") != _FORMAT_VERSION:
+            logger.warning(f"Checkpoint em formato antigo ignorado: {self.path}")
+            return None
+        if valid < size:
+            logger.warning(
+                f"Checkpoint {self.path} termina numa gravação interrompida: "
+                f"usando os {len(records) - 1} registro(s) completos"
+            )
+        self._valid_size = valid
+        return dict(records[0], records=records[1:])
+
+    def begin(self, header: Record, resumed: bool) -> None:
+        """Define onde os registros desta execução serão gravados.
+
+        Args:
+            header: Identificação do escaneamento (raiz e parâmetros)
+            resumed: Se True, os registros continuam o diário lido por
+                ``load``; senão o arquivo é recriado com ``header``
+        """
+        if resumed:
+            self._header = None
+        else:
+            self._header = dict(header, version=_FORMAT_VERSION)
+            self._valid_size = None
+
+    def attach(self, snapshot: Callable[[], Optional[Record]]) -> None:
+        """Registra a função que retira as mudanças do escaneamento.
+
+        A função deve adquirir o lock do escaneamento, retornar o que
+        mudou desde a chamada anterior e retornar None se o estado não
+        estiver consistente naquele instante.
+        """
+        self._snapshot = snapshot
+
+    def tick(self) -> bool:
+        """Conta uma pasta concluída e diz se já é hora de um checkpoint.
+
+        Chamado pelo escaneamento sob o seu lock.
+        """
+        self._dirs += 1
+        if self.interval_dirs and self._dirs >= self.interval_dirs:
+            return True
+        return (
+            self.interval_seconds > 0
+            and time.monotonic() - self._last_save >= self.interval_seconds
+        )
+
+    def save(self, record: Record) -> None:
+        """Agenda a gravação de um registro sem bloquear o escaneamento.
+
+        Se a gravação anterior ainda estiver em andamento, o registro
+        espera na fila e vai junto com a próxima.
+        """
+        self._dirs = 0
+        self._last_save = time.monotonic()
+        with self._cond:
+            self._queued.append(record)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="scan-checkpoint", daemon=True
+                )
+                self._writer.start()
+            self._cond.notify_all()
+
+    def interrupt(self) -> None:
+        """Grava o estado atual e pede que o escaneamento pare.
+
+        Pode ser chamado de qualquer thread (ex: ao receber Ctrl+C). O
+        escaneamento termina a pasta em andamento e levanta
+        ``ScanInterrupted``. Se o estado não puder ser copiado de forma
+        consistente, vale o último checkpoint periódico.
+        """
+        self.stop_event.set()
+        if self._snapshot is not None:
+            record = self._snapshot()
+            if record is not None:
+                self.save(record)
+        self.flush()
+        logger.warning(
+            f"Checkpoint salvo em {self.path}: use --resume para continuar"
+        )
+
+    def flush(self) -> None:
+        """Espera a gravação pendente terminar."""
+        with self._cond:
+            while self._queued or self._writing:
+                self._cond.wait()
+
+    def close(self, completed: bool) -> None:
+        """Conclui o uso do checkpoint.
+
+        Args:
+            completed: Se True, o escaneamento terminou e o arquivo é
+                apagado; caso contrário ele é mantido para ``resume``
+        """
+        self.flush()
+        with self._cond:
+            writer, self._writer = self._writer, None
+            self._cond.notify_all()
+        if writer is not None:
+            writer.join()
+
+        if completed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _write_loop(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while not self._queued and self._writer is me:
+                    self._cond.wait()
+                if not self._queued:
+                    return
+                records, self._queued = self._queued, []
+                self._writing = True
+
+            try:
+                self._write(records)
+                self.saves += 1
+            except OSError as e:
+                logger.error(f"Falha ao gravar checkpoint {self.path}: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, records: List[Record]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self._header is not None:
+            records = [self._header] + records
+            mode = "wb"
+        else:
+            mode = "ab"
+            if self._valid_size is not None:
+                # Descarta o final incompleto de uma gravação interrompida
+                os.truncate(self.path, self._valid_size)
+
+        with open(self.path, mode) as f:
+            # Se esta gravação falhar no meio, a próxima volta a este ponto
+            self._valid_size = f.tell()
+            for record in records:
+                # Nível 1: caminhos comprimem bem mesmo assim e a thread do
+                # checkpoint disputa o GIL com a travessia o mínimo possível
+                data = zlib.compress(
+                    json.dumps(record, separators=(",", ":")).encode("ascii"), 1
+                )
+                f.write(_FRAME.pack(len(data)) + data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._header = None
+        self._valid_size = None
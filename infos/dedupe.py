@@ -0,0 +1,272 @@
+"""Detecção de arquivos duplicados.
+
+Este módulo encontra duplicados entre os arquivos grandes retornados por
+``scan_large_files`` com um pipeline em estágios, em que cada estágio
+descarta candidatos antes do próximo (e mais caro):
+
+    1. Agrupamento por tamanho exato (sem leitura)
+    2. Hash das pontas: primeiros e últimos 64 KiB de cada arquivo
+    3. Hash completo, em paralelo, só para grupos que ainda colidem
+
+Classes:
+    HashCache: Cache SQLite de hashes por (dev, inode, tamanho, mtime)
+
+Funções:
+    find_duplicates(): Executa o pipeline e retorna os grupos duplicados
+    default_hash_cache_path(): Local padrão do cache de hashes
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .inodes import allocated_bytes
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_CACHE_FILE = "cache_hashes.db"
+
+EDGE_BYTES = 64 * 1024
+_CHUNK_BYTES = 1024 * 1024
+
+# (dev, inode, tamanho, mtime_ns)
+_FileKey = Tuple[int, int, int, int]
+
+
+def default_hash_cache_path() -> str:
+    """Cache de hashes do usuário, independente da pasta atual.
+
+    ``%LOCALAPPDATA%\\disk-analyzer`` no Windows e
+    ``$XDG_CACHE_HOME/disk-analyzer`` (ou ``~/.cache/disk-analyzer``) nos
+    demais sistemas.
+    """
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "disk-analyzer", DEFAULT_HASH_CACHE_FILE)
+
+
+class HashCache:
+    """Cache persistente de hashes de arquivos.
+
+    A chave é ``(st_dev, st_ino, tamanho, st_mtime_ns)``: se qualquer um
+    mudar, o arquivo é lido de novo. Assim uma segunda execução sobre os
+    mesmos arquivos não lê nenhum byte.
+
+    Args:
+        path: Caminho do arquivo SQLite; a pasta é criada se preciso
+            (padrão: None, ``default_hash_cache_path()``)
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        if path is None:
+            path = default_hash_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "dev INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+            "kind TEXT, digest TEXT, "
+            "PRIMARY KEY (dev, inode, size, mtime_ns, kind)) WITHOUT ROWID"
+        )
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def get(self, key: _FileKey, kind: str) -> Optional[str]:
+        """Retorna o hash gravado (``kind`` é 'edge' ou 'full')."""
+        row = self._conn.execute(
+            "SELECT digest FROM hashes WHERE dev = ? AND inode = ? AND size = ? "
+            "AND mtime_ns = ? AND kind = ?",
+            key + (kind,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items: List[Tuple[_FileKey, str, str]]) -> None:
+        """Grava vários hashes de uma vez: tuplas (chave, kind, hash)."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                [key + (kind, digest) for key, kind, digest in items],
+            )
+
+    def close(self) -> None:
+        """Fecha o banco."""
+        self._conn.close()
+
+
+def _edge_hash(path: str, size: int) -> str:
+    """Hash dos primeiros e últimos ``EDGE_BYTES`` do arquivo."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * EDGE_BYTES:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(EDGE_BYTES))
+            f.seek(-EDGE_BYTES, os.SEEK_END)
+            digest.update(f.read(EDGE_BYTES))
+    return digest.hexdigest()
+
+
+def _full_hash(path: str) -> str:
+    """Hash do conteúdo completo, lido em blocos de 1 MiB."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_stage(
+    groups: List[List[Tuple[str, _FileKey]]],
+    kind: str,
+    workers: int,
+    cache: Optional[HashCache],
+) -> List[List[Tuple[str, _FileKey]]]:
+    """Subdivide cada grupo pelo hash ``kind`` e mantém os que colidem.
+
+    Hashes em cache são reaproveitados; os demais são calculados em um
+    pool de threads (hashlib libera o GIL para blocos grandes).
+    """
+    hash_func = _edge_hash if kind == "edge" else _full_hash
+    digests = {}  # type: Dict[str, str]
+    to_hash = []
+
+    for group in groups:
+        for path, key in group:
+            cached = cache.get(key, kind) if cache is not None else None
+            if cached is not None:
+                digests[path] = cached
+            else:
+                to_hash.append((path, key))
+
+    def compute(item: Tuple[str, _FileKey]) -> Tuple[str, _FileKey, Optional[str]]:
+        path, key = item
+        try:
+            if kind == "edge":
+                return path, key, hash_func(path, key[2])
+            return path, key, hash_func(path)
+        except OSError as e:
+            logger.debug(f"Erro ao ler {path}: {e}")
+            return path, key, None
+
+    computed = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for path, key, digest in executor.map(compute, to_hash):
+            if digest is not None:
+                digests[path] = digest
+                computed.append((key, kind, digest))
+
+    if cache is not None and computed:
+        cache.put_many(computed)
+
+    result = []
+    for group in groups:
+        by_digest = defaultdict(list)  # type: Dict[str, List[Tuple[str, _FileKey]]]
+        for path, key in group:
+            if path in digests:
+                by_digest[digests[path]].append((path, key))
+        result.extend(g for g in by_digest.values() if len(g) > 1)
+    return result
+
+
+def find_duplicates(
+    files: List[Dict[str, Any]],
+    workers: int = 4,
+    cache: Optional[HashCache] = None,
+) -> List[Dict[str, Any]]:
+    """Encontra arquivos com conteúdo idêntico.
+
+    Args:
+        files: Arquivos no formato retornado por ``scan_large_files``
+        workers: Threads usadas para calcular hashes (padrão: 4)
+        cache: Cache persistente de hashes (padrão: None)
+
+    Returns:
+        Lista de grupos, do maior espaço recuperável para o menor, com:
+        - size_bytes: Tamanho de cada cópia
+        - size_gb: Tamanho de cada cópia em GB
+        - paths: Caminhos das cópias
+        - reclaimable_bytes: Bytes alocados liberados mantendo uma única cópia
+        - reclaimable_gb: Idem, em GB
+
+    Note:
+        - Hardlinks para o mesmo inode não são duplicados (não liberam
+          espaço) e contam como um único arquivo
+        - O hash completo só é calculado para arquivos de mesmo tamanho
+          cujas pontas também coincidem
+
+    Example:
+        >>> groups = find_duplicates(scan_large_files('/dados', 1.0))
+        >>> sum(g['reclaimable_bytes'] for g in groups)
+    """
+    by_size = defaultdict(list)  # type: Dict[int, List[Dict[str, Any]]]
+    for file in files:
+        by_size[file["size_bytes"]].append(file)
+
+    # Estágio 1: só tamanhos repetidos seguem; um stat por candidato
+    groups = []
+    allocated = {}  # type: Dict[str, int]
+    for size, same_size in by_size.items():
+        if len(same_size) < 2:
+            continue
+        seen_inodes = set()
+        group = []
+        for file in same_size:
+            try:
+                stat = os.stat(file["path"], follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.st_size != size or (stat.st_dev, stat.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((stat.st_dev, stat.st_ino))
+            allocated[file["path"]] = allocated_bytes(stat)
+            group.append(
+                (file["path"], (stat.st_dev, stat.st_ino, size, stat.st_mtime_ns))
+            )
+        if len(group) > 1:
+            groups.append(group)
+
+    candidates = sum(len(g) for g in groups)
+    logger.info(f"Duplicados: {candidates} candidato(s) com tamanho repetido")
+
+    # Estágio 2: pontas do arquivo
+    groups = _hash_stage(groups, "edge", workers, cache)
+    candidates = sum(len(g) for g in groups)
+    logger.info(f"Duplicados: {candidates} candidato(s) após hash das pontas")
+
+    # Estágio 3: conteúdo completo
+    groups = _hash_stage(groups, "full", workers, cache)
+
+    duplicates = []
+    for group in groups:
+        size = group[0][1][2]
+        # Apagar as cópias libera o espaço alocado delas (arquivos
+        # esparsos ocupam menos); supõe-se mantida a cópia que ocupa mais
+        copies = [allocated[path] for path, _ in group]
+        reclaimable = sum(copies) - max(copies)
+        duplicates.append(
+            {
+                "size_bytes": size,
+                "size_gb": size / (1024**3),
+                "paths": sorted(path for path, _ in group),
+                "reclaimable_bytes": reclaimable,
+                "reclaimable_gb": reclaimable / (1024**3),
+            }
+        )
+
+    duplicates.sort(key=lambda x: x["reclaimable_bytes"], reverse=True)
+    logger.info(f"Duplicados: {len(duplicates)} grupo(s) confirmado(s)")
+    return duplicates
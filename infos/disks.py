@@ -0,0 +1,141 @@
+"""Tabela de discos do sistema.
+
+Módulo leve, só com a biblioteca padrão no Linux, para que quem precisa
+apenas da tabela de discos (``disk-analyzer disks``, monitoramento) não
+pague a importação do escaneamento nem do ``psutil``. As partições vêm
+de ``infos.mounts.disk_partitions`` e o espaço de ``shutil.disk_usage``,
+com os mesmos valores do ``psutil.disk_usage``.
+
+Funções:
+    get_all_disks(): Obtém lista de todos os discos disponíveis
+    get_disk_for_path(): Informações de disco para um caminho qualquer
+    get_size_in_gb(): Converte bytes para gigabytes
+"""
+
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Sequence
+
+from .mounts import disk_partitions, filter_partitions
+
+
+def get_size_in_gb(size_bytes: int) -> float:
+    """Converte bytes para gigabytes.
+
+    Args:
+        size_bytes: Tamanho em bytes
+
+    Returns:
+        Tamanho em gigabytes (GB)
+
+    Example:
+        >>> get_size_in_gb(1073741824)
+        1.0
+    """
+    return size_bytes / (1024**3)
+
+
+def _usage(path: str) -> Dict[str, Any]:
+    """Espaço total, usado e livre de ``path`` em GB, como no ``psutil``.
+
+    O percentual é calculado sobre o espaço disponível para usuários
+    comuns (usado + livre), sem a reserva do root.
+    """
+    usage = shutil.disk_usage(path)
+    available = usage.used + usage.free
+    return {
+        "total_gb": get_size_in_gb(usage.total),
+        "used_gb": get_size_in_gb(usage.used),
+        "free_gb": get_size_in_gb(usage.free),
+        "percent": round(usage.used / available * 100, 1) if available else 0.0,
+    }
+
+
+def get_all_disks(
+    include_fstypes: Optional[Sequence[str]] = None, dedupe: bool = True
+) -> List[Dict[str, Any]]:
+    """Identifica todos os discos montados no sistema.
+
+    Obtém informações detalhadas sobre cada disco/partição disponível,
+    incluindo espaço total, usado, livre e percentual de utilização.
+
+    Sistemas de arquivos virtuais (proc, tmpfs, overlay...) e remotos
+    (nfs, cifs...) ficam de fora, assim como bind mounts e montagens
+    repetidas de um mesmo dispositivo, para que nada seja escaneado
+    duas vezes.
+
+    Args:
+        include_fstypes: Tipos virtuais/remotos a incluir mesmo assim,
+            ex: ``['nfs4']`` (padrão: None)
+        dedupe: Se False, mantém montagens repetidas (padrão: True)
+
+    Returns:
+        Lista de dicionários contendo informações dos discos:
+        - drive: Letra/identificador do disco (ex: 'C:\\')
+        - mountpoint: Ponto de montagem
+        - fstype: Sistema de arquivos (NTFS, FAT32, etc)
+        - total_gb: Tamanho total em GB
+        - used_gb: Espaço usado em GB
+        - free_gb: Espaço livre em GB
+        - percent: Percentual de uso
+
+    Note:
+        Discos sem permissão de acesso são ignorados silenciosamente.
+    """
+    disks = []
+    partitions = filter_partitions(disk_partitions(), include_fstypes, dedupe)
+
+    for partition in partitions:
+        try:
+            disk = {
+                "drive": partition.device,
+                "mountpoint": partition.mountpoint,
+                "fstype": partition.fstype,
+            }
+            disk.update(_usage(partition.mountpoint))
+            disks.append(disk)
+        except OSError:
+            # Sem permissão ou unidade indisponível (ex: leitor de CD vazio)
+            continue
+
+    return disks
+
+
+def get_disk_for_path(path: str) -> Dict[str, Any]:
+    """Monta as informações de disco para um caminho qualquer.
+
+    Usa a partição com o ponto de montagem mais específico que contém o
+    caminho. O campo ``mountpoint`` é o próprio caminho (raiz do
+    escaneamento), no mesmo formato de ``get_all_disks``.
+
+    Args:
+        path: Ponto de montagem ou diretório a escanear
+
+    Returns:
+        Dicionário com as mesmas chaves de ``get_all_disks``
+
+    Raises:
+        OSError: Se o caminho não existir ou não puder ser acessado
+    """
+    path = os.path.abspath(path)
+    usage = _usage(path)
+
+    partition = None
+    for candidate in disk_partitions():
+        mountpoint = candidate.mountpoint
+        inside = path == mountpoint or path.startswith(
+            mountpoint.rstrip(os.sep) + os.sep
+        )
+        if inside and (
+            partition is None or len(mountpoint) > len(partition.mountpoint)
+        ):
+            partition = candidate
+
+    is_mountpoint = partition is not None and partition.mountpoint == path
+    disk = {
+        "drive": partition.device if is_mountpoint else path,
+        "mountpoint": path,
+        "fstype": partition.fstype if partition is not None else "",
+    }
+    disk.update(usage)
+    return disk
@@ -0,0 +1,277 @@
+"""Filtros de arquivos avaliados durante a travessia.
+
+Um filtro é uma lista de expressões ``campo operador valor``; um arquivo
+entra no resultado só se satisfizer todas. As expressões são compiladas
+uma única vez e avaliadas em ordem de custo:
+
+    - Nome, extensão e caminho: testados sobre o ``DirEntry`` da
+      listagem, sem nenhuma chamada de sistema. Arquivos reprovados aqui
+      nunca recebem um stat
+    - Tamanho, mtime, atime e dono: testados sobre o único stat que o
+      escaneamento já faz por arquivo
+
+Campos aceitos:
+
+    - ``ext=log,dump``: extensão (sem diferenciar maiúsculas/minúsculas;
+      ``tar.gz`` também vale)
+    - ``name=core.*,*.qcow2``: glob aplicado ao nome do arquivo
+    - ``path=/var/log``: glob aplicado ao caminho completo; um caminho
+      sem curingas vale para tudo abaixo dele (``**`` atravessa níveis)
+    - ``size>10G``, ``size<=500M``: tamanho aparente (sufixos K, M, G, T,
+      base 1024; sem sufixo, bytes)
+    - ``mtime>90d``, ``atime<7d``: idade da modificação ou do último
+      acesso (sufixos s, m, h, d, w; sem sufixo, dias). ``>`` é "mais
+      antigo que" e ``<`` é "mais recente que"
+    - ``uid=1000``, ``owner=root``: dono do arquivo
+
+Campos de lista aceitam vários valores separados por vírgula (basta
+casar com um) e ``!=`` para negar.
+
+Classes:
+    FileFilter: Conjunto compilado de expressões de filtro
+
+Funções:
+    parse_size(): Converte "10G" em bytes
+    parse_age(): Converte "90d" em segundos
+"""
+
+import hashlib
+import os
+import re
+import time
+from typing import Callable, Iterable, List, Optional, Pattern
+
+from .rules import _combine, _glob_to_regex, _is_literal, _RuleSet
+
+try:
+    import pwd
+except ImportError:  # Windows
+    pwd = None
+
+
+_EXPRESSION = re.compile(r"\s*([A-Za-z]+)\s*(>=|<=|!=|=|>|<)\s*(.+?)\s*\Z")
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+# Campos testados sobre o DirEntry (sem syscall) e sobre o stat
+_NAME_FIELDS = ("ext", "name", "path")
+_STAT_FIELDS = ("size", "mtime", "atime", "uid", "owner")
+_LIST_OPERATORS = ("=", "!=")
+_RANGE_OPERATORS = (">", "<", ">=", "<=")
+
+_NameCheck = Callable[[str, str], bool]
+_StatCheck = Callable[[os.stat_result], bool]
+
+
+def parse_size(text: str) -> int:
+    """Converte um tamanho como ``10G``, ``1.5T`` ou ``4096`` em bytes.
+
+    Raises:
+        ValueError: Se o texto não for um tamanho válido
+    """
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([bkmgt]?)b?\s*", text.lower())
+    if match is None:
+        raise ValueError(f"Tamanho inválido: {text!r} (ex: 500M, 10G)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def parse_age(text: str) -> float:
+    """Converte uma idade como ``90d``, ``12h`` ou ``2w`` em segundos.
+
+    Raises:
+        ValueError: Se o texto não for uma idade válida
+    """
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([smhdw]?)\s*", text.lower())
+    if match is None:
+        raise ValueError(f"Idade inválida: {text!r} (ex: 12h, 90d, 2w)")
+    return float(match.group(1)) * _AGE_UNITS[match.group(2) or "d"]
+
+
+def _compare(operator: str, attribute: str, value: float) -> _StatCheck:
+    """Monta o teste ``stat.<attribute> <operator> value``."""
+    if operator == ">":
+        return lambda stat: getattr(stat, attribute) > value
+    if operator == "<":
+        return lambda stat: getattr(stat, attribute) < value
+    if operator == ">=":
+        return lambda stat: getattr(stat, attribute) >= value
+    return lambda stat: getattr(stat, attribute) <= value
+
+
+# Idade maior = timestamp menor: inverte o operador
+_AGE_OPERATORS = {">": "<", "<": ">", ">=": "<=", "<=": ">="}
+
+
+def _owner_uid(value: str) -> int:
+    if value.isdigit():
+        return int(value)
+    if pwd is None:
+        raise ValueError(f"owner={value}: nomes de usuário exigem um sistema Unix")
+    try:
+        return pwd.getpwnam(value).pw_uid
+    except KeyError:
+        raise ValueError(f"Usuário desconhecido: {value}") from None
+
+
+def _path_regex(patterns: List[str]) -> Optional[Pattern]:
+    """Regex dos globs de caminho; sem curingas, vale também para o que há abaixo."""
+    regexes = []
+    for pattern in patterns:
+        pattern = pattern.replace("\\", "/").rstrip("/").lstrip("/").lower()
+        regex = _glob_to_regex(pattern)
+        regexes.append(regex + "(?:/.*)?" if _is_literal(pattern) else regex)
+    return _combine(regexes)
+
+
+class FileFilter:
+    """Conjunto compilado de expressões de filtro de arquivos.
+
+    Passe como ``file_filter=`` para ``scan_large_files``. Um filtro sem
+    expressões é falso e não muda nada no escaneamento.
+
+    Args:
+        expressions: Expressões ``campo operador valor`` (ver o módulo)
+        now: Momento de referência das idades (padrão: agora)
+
+    Raises:
+        ValueError: Se alguma expressão for inválida
+
+    Example:
+        >>> file_filter = FileFilter(['ext=log,dump', 'mtime>90d', 'owner=root'])
+        >>> file_filter.accepts_name('app.LOG', '/var/log/app.LOG')
+        True
+        >>> file_filter.accepts_name('app.txt', '/var/log/app.txt')
+        False
+    """
+
+    def __init__(
+        self, expressions: Iterable[str] = (), now: Optional[float] = None
+    ) -> None:
+        self.expressions = [e.strip() for e in expressions if e.strip()]
+        self.now = time.time() if now is None else now
+        # Campo -> [(teste, negado)], para ordenar os testes por custo
+        name_checks = {}  # type: dict
+        stat_checks = {}  # type: dict
+
+        for expression in self.expressions:
+            match = _EXPRESSION.match(expression)
+            if match is None:
+                raise ValueError(
+                    f"Filtro inválido: {expression!r} (use campo=valor, "
+                    "ex: ext=log, mtime>90d)"
+                )
+            field, operator, value = match.groups()
+            field = field.lower()
+            if field in _NAME_FIELDS:
+                if operator not in _LIST_OPERATORS:
+                    raise ValueError(f"{field} aceita só = e != ({expression!r})")
+                check = self._name_check(field, value)
+                name_checks.setdefault(field, []).append((check, operator == "!="))
+            elif field in _STAT_FIELDS:
+                check = self._stat_check(field, operator, value, expression)
+                stat_checks.setdefault(field, []).append(check)
+            else:
+                raise ValueError(
+                    f"Campo de filtro desconhecido: {field} (use "
+                    f"{', '.join(_NAME_FIELDS + _STAT_FIELDS)})"
+                )
+
+        # Em ordem de custo: sufixo antes de glob antes do caminho completo
+        self._name_checks = [
+            _negated(check, negate)
+            for field in _NAME_FIELDS
+            for check, negate in name_checks.get(field, [])
+        ]  # type: List[_NameCheck]
+        self._stat_checks = [
+            check for field in _STAT_FIELDS for check in stat_checks.get(field, [])
+        ]  # type: List[_StatCheck]
+        self.checks_names = bool(self._name_checks)
+        self.checks_stat = bool(self._stat_checks)
+        self._relative_time = any(field in stat_checks for field in ("mtime", "atime"))
+
+    def _name_check(self, field: str, value: str) -> _NameCheck:
+        values = [item.strip() for item in value.lower().split(",") if item.strip()]
+        if field == "ext":
+            suffixes = tuple("." + item.lstrip(".") for item in values)
+            return lambda name, path: name.endswith(suffixes)
+        if field == "name":
+            if any("/" in item or "\\" in item for item in values):
+                raise ValueError(f"name= recebe só nomes; use path= ({value!r})")
+            rules = _RuleSet(values)
+            return lambda name, path: rules.matches(name, None, name)
+        regex = _path_regex(values)
+        return lambda name, path: bool(
+            regex.match(path.replace("\\", "/").lower().lstrip("/"))
+        )
+
+    def _stat_check(
+        self, field: str, operator: str, value: str, expression: str
+    ) -> _StatCheck:
+        if field in ("uid", "owner"):
+            if operator not in _LIST_OPERATORS:
+                raise ValueError(f"{field} aceita só = e != ({expression!r})")
+            if field == "uid" and not all(
+                item.strip().isdigit() for item in value.split(",")
+            ):
+                raise ValueError(f"uid deve ser numérico ({expression!r})")
+            uids = frozenset(_owner_uid(item.strip()) for item in value.split(","))
+            if operator == "!=":
+                return lambda stat: stat.st_uid not in uids
+            return lambda stat: stat.st_uid in uids
+
+        if operator not in _RANGE_OPERATORS:
+            raise ValueError(f"{field} aceita só >, <, >= e <= ({expression!r})")
+        if field == "size":
+            return _compare(operator, "st_size", parse_size(value))
+        cutoff = self.now - parse_age(value)
+        return _compare(_AGE_OPERATORS[operator], f"st_{field}", cutoff)
+
+    def __bool__(self) -> bool:
+        return bool(self.expressions)
+
+    def __str__(self) -> str:
+        return " E ".join(self.expressions)
+
+    @property
+    def signature(self) -> str:
+        """Identificador estável do filtro (usado pelo índice incremental).
+
+        Com idades, inclui o dia de referência: entradas do índice são
+        reaproveitadas só no mesmo dia, já que um arquivo intocado pode
+        passar a ter a idade pedida sem que a pasta mude.
+        """
+        items = sorted(self.expressions)
+        if self._relative_time:
+            items.append(str(int(self.now // 86400)))
+        digest = hashlib.sha1("\0".join(items).encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    def accepts_name(self, name: str, path: str) -> bool:
+        """Testa nome, extensão e caminho, sem nenhuma chamada de sistema.
+
+        Args:
+            name: Nome do arquivo (``DirEntry.name``)
+            path: Caminho completo (``DirEntry.path``)
+
+        Returns:
+            True se o arquivo passa pelos testes de nome e caminho
+        """
+        name = name.lower()
+        for check in self._name_checks:
+            if not check(name, path):
+                return False
+        return True
+
+    def accepts_stat(self, stat: os.stat_result) -> bool:
+        """Testa tamanho, idades e dono sobre o stat já feito do arquivo."""
+        for check in self._stat_checks:
+            if not check(stat):
+                return False
+        return True
+
+
+def _negated(check: _NameCheck, negate: bool) -> _NameCheck:
+    if not negate:
+        return check
+    return lambda name, path: not check(name, path)
@@ -0,0 +1,376 @@
+"""Histogramas de tamanho, idade e extensão de todos os arquivos.
+
+O ranking guarda só os maiores arquivos; este módulo registra todos os
+arquivos vistos na travessia para responder perguntas sobre a
+distribuição do espaço ("quanto é de arquivos parados há mais de um
+ano?", "quais extensões dominam o disco?").
+
+Na travessia, cada arquivo custa quatro ``append`` em buffers tipados
+(``array``): tamanho, mtime, atime e o id da extensão numa tabela de
+extensões internadas (~20 bytes por arquivo). Cada thread escreve nos
+seus próprios buffers, sem lock. No fim, ``FileHistogram.summarize``
+agrupa tudo em faixas de tamanho (potências de 2), faixas de idade e
+extensões por espaço e por quantidade, com operações vetorizadas do
+NumPy quando instalado (extra ``histograms``) ou com a biblioteca
+padrão, com o mesmo resultado.
+
+Classes:
+    FileHistogram: Coleta e resume a distribuição dos arquivos
+
+Funções:
+    has_numpy(): Diz se o resumo vetorizado está disponível
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# NumPy (dependência opcional, extra "histograms") só é importado no
+# primeiro resumo: o escaneamento não paga pela importação
+_UNLOADED = object()
+numpy = _UNLOADED  # type: Any
+
+# Registra (tamanho, mtime, atime, nome) de um arquivo
+RecordCallback = Callable[[int, float, float, str], None]
+
+DAY = 86400.0
+
+# Limites superiores (em dias) das faixas de idade; a última é aberta
+AGE_EDGES_DAYS = (1, 7, 30, 90, 180, 365, 2 * 365, 5 * 365)
+AGE_LABELS = (
+    "< 1 dia",
+    "1-7 dias",
+    "7-30 dias",
+    "30-90 dias",
+    "90-180 dias",
+    "180 dias-1 ano",
+    "1-2 anos",
+    "2-5 anos",
+    "> 5 anos",
+)
+
+# Extensões distintas guardadas; as demais entram em "(outras)"
+MAX_EXTENSIONS = 4096
+
+NO_EXTENSION_LABEL = "(sem extensão)"
+OTHER_EXTENSIONS_LABEL = "(outras)"
+
+# Chave interna de "(outras)": nomes de arquivo não contêm NUL
+_OTHER = "\0"
+
+# Tamanho: 64 bits; tempos: float32 (precisão de ~2 min, de sobra para
+# faixas de dias); extensão: índice na tabela
+_SIZE_CODE = "q"
+_TIME_CODE = "f"
+_EXT_CODE = "i"
+
+
+def has_numpy() -> bool:
+    """Importa o NumPy, se ainda não importado, e diz se está instalado."""
+    global numpy
+    if numpy is _UNLOADED:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy is not None
+
+
+def _format_bytes(value: int) -> str:
+    """Formata uma potência de 2 em B/KB/MB/GB/TB/PB (sem casas decimais)."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024:
+            return f"{value} {unit}"
+        value //= 1024
+    return f"{value} PB"
+
+
+def _size_bucket(bucket: int) -> Dict[str, Any]:
+    """Limites e rótulo de uma faixa de tamanho: [2^(b-1), 2^b) bytes."""
+    if bucket == 0:
+        return {"label": "0 B", "min_bytes": 0, "max_bytes": 0}
+    low = 1 << (bucket - 1)
+    high = 1 << bucket
+    return {
+        "label": f"{_format_bytes(low)} - {_format_bytes(high)}",
+        "min_bytes": low,
+        "max_bytes": high - 1,
+    }
+
+
+class _Buffers:
+    """Colunas dos arquivos vistos por uma thread."""
+
+    __slots__ = ("sizes", "mtimes", "atimes", "extensions")
+
+    def __init__(self) -> None:
+        self.sizes = array(_SIZE_CODE)
+        self.mtimes = array(_TIME_CODE)
+        self.atimes = array(_TIME_CODE)
+        self.extensions = array(_EXT_CODE)
+
+
+class FileHistogram:
+    """Distribuição de tamanho, idade e extensão dos arquivos escaneados.
+
+    Seguro para várias threads: cada uma obtém o seu registrador com
+    ``recorder()`` (uma vez por diretório) e escreve nos próprios
+    buffers; só a inclusão de uma extensão nova na tabela usa lock.
+
+    Exemplo:
+        >>> histogram = FileHistogram()
+        >>> record = histogram.recorder()
+        >>> record(4096, 1700000000.0, 1700000000.0, "notas.txt")
+        >>> histogram.summarize()["files"]
+        1
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Buffers de cada thread (sobrevivem ao fim dela)
+        self._buffers = []
+        # Tabela de extensões internadas; o id 0 é "sem extensão"
+        self._extensions = [""]
+        self._extension_ids = {"": 0}
+
+    def __len__(self) -> int:
+        return sum(len(buffers.sizes) for buffers in self._buffers)
+
+    def _intern(self, suffix: str) -> int:
+        """Id de um sufixo de nome ainda não visto por ``recorder``.
+
+        O sufixo é guardado como veio (``JPG``) apontando para o id da
+        extensão em minúsculas, para que a próxima ocorrência não precise
+        de ``lower()``.
+        """
+        with self._lock:
+            extension_id = self._extension_ids.get(suffix)
+            if extension_id is not None:
+                return extension_id
+            extension = suffix.lower()
+            extension_id = self._extension_ids.get(extension)
+            if extension_id is None:
+                if len(self._extensions) >= MAX_EXTENSIONS:
+                    # Tabela cheia: não guarda o sufixo, para não crescer
+                    return self._other_id()
+                extension_id = len(self._extensions)
+                self._extensions.append(extension)
+                self._extension_ids[extension] = extension_id
+            self._extension_ids[suffix] = extension_id
+            return extension_id
+
+    def _other_id(self) -> int:
+        """Id de "(outras)", criado na primeira vez (com o lock já obtido)."""
+        extension_id = self._extension_ids.get(_OTHER)
+        if extension_id is None:
+            extension_id = len(self._extensions)
+            self._extensions.append(_OTHER)
+            self._extension_ids[_OTHER] = extension_id
+        return extension_id
+
+    def recorder(self) -> RecordCallback:
+        """Função que registra um arquivo nos buffers da thread atual.
+
+        Returns:
+            Chamável ``(tamanho, mtime, atime, nome)``; a extensão é o
+            trecho após o último ponto do nome, em minúsculas (nomes
+            ocultos como ``.bashrc`` não têm extensão)
+        """
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = _Buffers()
+            with self._lock:
+                self._buffers.append(buffers)
+
+        add_size = buffers.sizes.append
+        add_mtime = buffers.mtimes.append
+        add_atime = buffers.atimes.append
+        add_extension = buffers.extensions.append
+        extension_ids = self._extension_ids
+        intern = self._intern
+
+        def record(size: int, mtime: float, atime: float, name: str) -> None:
+            # Sem ponto, ou só o inicial (".bashrc"): head fica vazio
+            head, _, suffix = name.rpartition(".")
+            if not head:
+                extension_id = 0
+            else:
+                extension_id = extension_ids.get(suffix)
+                if extension_id is None:
+                    extension_id = intern(suffix)
+            add_size(size)
+            add_mtime(mtime)
+            add_atime(atime)
+            add_extension(extension_id)
+
+        return record
+
+    def summarize(
+        self,
+        now: Optional[float] = None,
+        top_extensions: int = 10,
+        vectorized: bool = True,
+    ) -> Dict[str, Any]:
+        """Agrupa os arquivos registrados em faixas.
+
+        Deve ser chamado depois do escaneamento (sem threads registrando).
+
+        Args:
+            now: Referência das idades (padrão: agora)
+            top_extensions: Quantidade de extensões em cada ranking
+            vectorized: Se False, não usa o NumPy mesmo se instalado; o
+                resultado é o mesmo (padrão: True)
+
+        Returns:
+            Dicionário com ``files`` e ``bytes`` totais e as listas
+            ``sizes`` (só faixas com arquivos), ``modified`` e
+            ``accessed`` (todas as faixas de idade) e
+            ``extensions_by_bytes``/``extensions_by_count``; cada item
+            traz ``label``, ``files``, ``bytes`` e ``percent`` (do espaço)
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            buffers = list(self._buffers)
+            names = list(self._extensions)
+
+        if vectorized and has_numpy():
+            counts = _numpy_counts(buffers, len(names), now)
+        else:
+            counts = _python_counts(buffers, len(names), now)
+
+        total_files = sum(len(b.sizes) for b in buffers)
+        total_bytes = sum(counts["sizes"][1])
+
+        def rows(files, sizes, labels):
+            return [
+                dict(
+                    label,
+                    files=count,
+                    bytes=size,
+                    percent=(
+                        round(100.0 * size / total_bytes, 1) if total_bytes else 0.0
+                    ),
+                )
+                for label, count, size in zip(labels, files, sizes)
+            ]
+
+        size_files, size_bytes = counts["sizes"]
+        size_rows = rows(
+            size_files, size_bytes, [_size_bucket(b) for b in range(len(size_files))]
+        )
+        age_labels = [
+            {
+                "label": label,
+                "min_days": AGE_EDGES_DAYS[i - 1] if i else None,
+                "max_days": AGE_EDGES_DAYS[i] if i < len(AGE_EDGES_DAYS) else None,
+            }
+            for i, label in enumerate(AGE_LABELS)
+        ]
+
+        ext_files, ext_bytes = counts["extensions"]
+        ext_labels = [
+            {
+                "label": (
+                    NO_EXTENSION_LABEL
+                    if name == ""
+                    else OTHER_EXTENSIONS_LABEL if name == _OTHER else f".{name}"
+                ),
+                "extension": None if name == _OTHER else name,
+            }
+            for name in names
+        ]
+        ext_rows = rows(ext_files, ext_bytes, ext_labels)
+        # Ordenação estável: empates ficam na ordem em que foram vistos
+        by_bytes = sorted(ext_rows, key=lambda row: -row["bytes"])
+        by_count = sorted(ext_rows, key=lambda row: -row["files"])
+
+        return {
+            "files": total_files,
+            "bytes": total_bytes,
+            "sizes": [row for row in size_rows if row["files"]],
+            "modified": rows(*counts["modified"], age_labels),
+            "accessed": rows(*counts["accessed"], age_labels),
+            "extensions_by_bytes": [r for r in by_bytes if r["files"]][:top_extensions],
+            "extensions_by_count": [r for r in by_count if r["files"]][:top_extensions],
+        }
+
+
+def _python_counts(
+    buffers: Sequence[_Buffers], extensions: int, now: float
+) -> Dict[str, Any]:
+    """Contagens e somas por faixa, sem NumPy."""
+    size_files = [0] * 65
+    size_bytes = [0] * 65
+    edges = [days * DAY for days in AGE_EDGES_DAYS]
+    modified_files = [0] * len(AGE_LABELS)
+    modified_bytes = [0] * len(AGE_LABELS)
+    accessed_files = [0] * len(AGE_LABELS)
+    accessed_bytes = [0] * len(AGE_LABELS)
+    ext_files = [0] * extensions
+    ext_bytes = [0] * extensions
+
+    for b in buffers:
+        for size, mtime, atime, ext in zip(b.sizes, b.mtimes, b.atimes, b.extensions):
+            bucket = size.bit_length()
+            size_files[bucket] += 1
+            size_bytes[bucket] += size
+            i = bisect_right(edges, now - mtime)
+            modified_files[i] += 1
+            modified_bytes[i] += size
+            i = bisect_right(edges, now - atime)
+            accessed_files[i] += 1
+            accessed_bytes[i] += size
+            ext_files[ext] += 1
+            ext_bytes[ext] += size
+
+    used = max((i + 1 for i, count in enumerate(size_files) if count), default=0)
+    return {
+        "sizes": (size_files[:used], size_bytes[:used]),
+        "modified": (modified_files, modified_bytes),
+        "accessed": (accessed_files, accessed_bytes),
+        "extensions": (ext_files, ext_bytes),
+    }
+
+
+def _numpy_counts(
+    buffers: Sequence[_Buffers], extensions: int, now: float
+) -> Dict[str, Any]:
+    """Contagens e somas por faixa com operações vetorizadas do NumPy."""
+
+    def column(name, dtype):
+        parts = [
+            numpy.frombuffer(getattr(b, name), dtype=dtype)
+            for b in buffers
+            if len(getattr(b, name))
+        ]
+        return numpy.concatenate(parts) if parts else numpy.zeros(0, dtype=dtype)
+
+    sizes = column("sizes", numpy.int64)
+    weights = sizes.astype(numpy.float64)
+    edges = numpy.array(AGE_EDGES_DAYS, dtype=numpy.float64) * DAY
+
+    def totals(bucket, length):
+        files = numpy.bincount(bucket, minlength=length)
+        # Somas em float64 são exatas até 2^53 bytes (8 PB)
+        sizes = numpy.bincount(bucket, weights=weights, minlength=length)
+        return [int(v) for v in files], [int(v) for v in sizes]
+
+    def ages(name):
+        times = column(name, numpy.float32).astype(numpy.float64)
+        return totals(
+            numpy.searchsorted(edges, now - times, side="right"), len(AGE_LABELS)
+        )
+
+    # frexp dá o expoente binário: 2^(e-1) <= x < 2^e, igual a int.bit_length
+    _, exponents = numpy.frexp(weights)
+    return {
+        "sizes": totals(exponents, 0),
+        "modified": ages("mtimes"),
+        "accessed": ages("atimes"),
+        "extensions": totals(column("extensions", numpy.intc), extensions),
+    }
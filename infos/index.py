@@ -0,0 +1,298 @@
+"""Índice persistente de escaneamento.
+
+Este módulo guarda, em um arquivo SQLite ao lado dos relatórios, o estado
+de cada diretório visitado: mtime, inode, subpastas e os maiores arquivos
+encontrados nele. Em um escaneamento incremental, diretórios cujo mtime e
+inode não mudaram são servidos do índice sem nova listagem.
+
+Classes:
+    ScanIndex: Índice SQLite de diretórios escaneados
+    CachedDirectory: Entrada do índice para um diretório
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_FILE = "indice_escaneamento.db"
+
+# Quantidade de diretórios acumulados antes de gravar no SQLite
+_BATCH_SIZE = 1000
+
+# Incrementado a cada mudança de esquema; índices antigos são recriados
+_SCHEMA_VERSION = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    min_size_bytes REAL NOT NULL,
+    max_files INTEGER NOT NULL,
+    rules TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    large INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    hardlinks INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    top TEXT NOT NULL,
+    generation INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class CachedDirectory(NamedTuple):
+    """Estado de um diretório gravado no índice."""
+
+    subdirs: List[str]  # nomes das subpastas (já filtradas)
+    top: List[Tuple[int, str, float, int, int]]  # TopFiles.entries()
+    files: int
+    large: int
+    total_bytes: int
+    hardlinks: int  # arquivos com mais de um hardlink
+
+
+class ScanIndex:
+    """Índice SQLite usado pelo escaneamento incremental.
+
+    Cada diretório é registrado com seu ``st_mtime_ns`` e ``st_ino``. Em
+    uma nova execução, se ambos forem iguais, a listagem do diretório
+    (subpastas e maiores arquivos) é reaproveitada e só as subpastas
+    continuam sendo verificadas. Diretórios alterados são listados de
+    novo e o índice é atualizado.
+
+    A reutilização só acontece quando os parâmetros do escaneamento são
+    compatíveis com os da execução anterior daquela raiz (mesmas regras
+    de exclusão, tamanho mínimo igual ou maior e ``max_files`` igual ou
+    menor).
+
+    Args:
+        path: Caminho do arquivo SQLite (padrão: 'indice_escaneamento.db')
+
+    Attributes:
+        cache_hits: Diretórios servidos do índice nesta execução
+        rescanned: Diretórios listados novamente nesta execução
+
+    Note:
+        O mtime de um diretório só muda quando entradas são criadas,
+        removidas ou renomeadas. Por isso os maiores arquivos de um
+        diretório reaproveitado são verificados de novo com um stat cada
+        (detecta crescimento ou redução); um arquivo pequeno que cresce
+        sem alterar o diretório só aparece quando o diretório mudar.
+        Diretórios com arquivos de vários hardlinks são listados de novo
+        pelo ``scan_large_files``, para que cada inode conte uma vez só.
+
+    Example:
+        >>> with ScanIndex() as index:
+        ...     files = scan_large_files('/dados', 1.0, index=index)
+        ...     print(index.cache_hits, index.rescanned)
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_FILE) -> None:
+        self.path = path
+        self.cache_hits = 0
+        self.rescanned = 0
+        self._lock = threading.Lock()
+        self._pending = []  # type: List[Tuple[Any, ...]]
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS roots; DROP TABLE IF EXISTS dirs;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        # Uma geração por execução: diretórios não revisitados ficam para trás
+        (last,) = self._conn.execute(
+            "SELECT COALESCE(MAX(generation), 0) FROM roots"
+        ).fetchone()
+        self._generation = last + 1
+
+    def __enter__(self) -> "ScanIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def begin(
+        self, root: str, min_size_bytes: float, max_files: int, rules: str
+    ) -> bool:
+        """Inicia o escaneamento de uma raiz.
+
+        Args:
+            root: Caminho raiz do escaneamento
+            min_size_bytes: Tamanho mínimo em bytes
+            max_files: Quantidade máxima de arquivos
+            rules: Assinatura das regras de exclusão (``IgnoreRules.signature``)
+
+        Returns:
+            True se as entradas gravadas para essa raiz podem ser reutilizadas
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT min_size_bytes, max_files, rules, generation "
+                "FROM roots WHERE path = ?",
+                (root,),
+            ).fetchone()
+
+        if row is None:
+            logger.info(f"Índice sem entradas para {root}: escaneamento completo")
+            return False
+
+        cached_min, cached_max, cached_rules, _ = row
+        compatible = (
+            cached_rules == rules
+            and cached_min <= min_size_bytes
+            and cached_max >= max_files
+        )
+        if not compatible:
+            logger.info(
+                f"Parâmetros diferentes da última execução em {root}: "
+                "o índice será reconstruído"
+            )
+        return compatible
+
+    def lookup(
+        self, path: str, mtime_ns: int, inode: int, hardlinks: bool = True
+    ) -> Optional[CachedDirectory]:
+        """Retorna a entrada de um diretório se ele não mudou desde a última vez.
+
+        A entrada reutilizada é marcada com a geração atual.
+
+        Args:
+            path: Caminho do diretório
+            mtime_ns: ``st_mtime_ns`` atual do diretório
+            inode: ``st_ino`` atual do diretório
+            hardlinks: Se False, entradas com arquivos de vários hardlinks
+                não são reutilizadas (quem deduplica inodes precisa
+                listá-las de novo)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, inode, files, large, bytes, hardlinks, "
+                "subdirs, top FROM dirs WHERE path = ?",
+                (path,),
+            ).fetchone()
+
+            if row is None or row[0] != mtime_ns or row[1] != inode:
+                return None
+            if row[5] and not hardlinks:
+                return None
+
+            self.cache_hits += 1
+            self._pending.append((path,) + row)
+            self._flush_if_needed()
+
+        subdirs = row[6].split("\0") if row[6] else []
+        top = [tuple(item) for item in json.loads(row[7])]
+        return CachedDirectory(subdirs, top, row[2], row[3], row[4], row[5])
+
+    def store(
+        self,
+        path: str,
+        mtime_ns: int,
+        inode: int,
+        subdirs: List[str],
+        top: List[Tuple[int, str, float, int, int]],
+        files: int,
+        large: int,
+        total_bytes: int,
+        hardlinks: int = 0,
+    ) -> None:
+        """Registra o resultado da listagem de um diretório."""
+        with self._lock:
+            self.rescanned += 1
+            self._pending.append(
+                (
+                    path,
+                    mtime_ns,
+                    inode,
+                    files,
+                    large,
+                    total_bytes,
+                    hardlinks,
+                    "\0".join(subdirs),
+                    json.dumps(top, separators=(",", ":")),
+                )
+            )
+            self._flush_if_needed()
+
+    def finish(
+        self, root: str, min_size_bytes: float, max_files: int, rules: str
+    ) -> None:
+        """Conclui o escaneamento de uma raiz.
+
+        Grava as entradas pendentes, remove diretórios da raiz que não
+        foram vistos nesta execução (apagados ou agora ignorados) e
+        registra os parâmetros usados.
+        """
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        with self._lock:
+            self._flush()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM dirs WHERE generation < ? AND "
+                    "(path = ? OR substr(path, 1, ?) = ?)",
+                    (self._generation, root, len(prefix), prefix),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO roots VALUES (?, ?, ?, ?, ?)",
+                    (
+                        root,
+                        min_size_bytes,
+                        max_files,
+                        rules,
+                        self._generation,
+                    ),
+                )
+
+    def remove(self, path: str) -> None:
+        """Apaga um diretório e toda a sua subárvore do índice.
+
+        Usado por quem mantém o índice atualizado entre execuções (ver
+        ``infos.watch``) quando uma pasta é apagada ou movida.
+        """
+        prefix = path if path.endswith(os.sep) else path + os.sep
+        with self._lock:
+            self._flush()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(prefix), prefix),
+                )
+
+    def flush(self) -> None:
+        """Grava as entradas pendentes sem esperar o lote encher."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Grava as entradas pendentes e fecha o banco."""
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def _flush_if_needed(self) -> None:
+        if len(self._pending) >= _BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        generation = self._generation
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (generation,) for row in self._pending],
+            )
+        self._pending = []
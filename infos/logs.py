@@ -0,0 +1,26 @@
+"""Configuração única do logging da aplicação.
+
+Só os pontos de entrada (``main.py`` e ``analyzer()``) configuram o
+logging; os módulos de biblioteca apenas criam os seus loggers, de modo
+que importar os pacotes não mexe no logging de quem os usa.
+
+Funções:
+    setup_logging(): Configura o logging raiz, se ainda não configurado
+"""
+
+import logging
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_DATEFMT = "%H:%M:%S"
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Configura o logging raiz com o formato da aplicação.
+
+    Não faz nada se o logging raiz já tiver handlers (por exemplo, num
+    programa que usa os pacotes como biblioteca e configurou o seu).
+
+    Args:
+        level: Nível do logger raiz (padrão: INFO)
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT, datefmt=LOG_DATEFMT)
@@ -4,237 +4,880 @@ Este módulo fornece funções para obter informações sobre discos,
 escanear arquivos grandes e interagir com o usuário.
 
 Funções principais:
-    get_all_disks(): Obtém lista de todos os discos disponíveis
     scan_large_files(): Escaneia diretórios em busca de arquivos grandes
     select_disks(): Interface para seleção de discos pelo usuário
-    get_size_in_gb(): Converte bytes para gigabytes
+
+``get_all_disks``, ``get_disk_for_path`` e ``get_size_in_gb`` ficam em
+``infos.disks`` e continuam importáveis daqui.
 """
 
 import os
+import heapq
+import queue
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+import threading
+from time import perf_counter
+from typing import (
+    List,
+    Dict,
+    Any,
+    Callable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import psutil
+from .budget import PriorityKey, ScanBudget
+from .checkpoint import ScanCheckpoint, ScanInterrupted
+from .disks import get_all_disks, get_disk_for_path, get_size_in_gb
+from .filters import FileFilter
+from .histogram import FileHistogram
+from .index import ScanIndex
+from .inodes import InodeSet, allocated_bytes
+from .metrics import DirectorySample, ScanMetrics
+from .mounts import disk_partitions, skipped_mountpoints
+from .records import FileRecord
+from .rules import IgnoreRules
+from .throttle import Throttle
+from .topk import TopFiles
+from .tree import DirectoryTree
 
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
-)
 logger = logging.getLogger(__name__)
 
+__all__ = [
+    "get_all_disks",
+    "get_disk_for_path",
+    "get_size_in_gb",
+    "scan_large_files",
+    "select_disks",
+    "MatchCallback",
+]
+
+
+class _ScanProgress:
+    """Contadores de progresso de um escaneamento.
+
+    Com vários workers, ``add_directory`` deve ser chamado sob o lock
+    compartilhado do escaneamento.
+    """
+
+    def __init__(self) -> None:
+        self.files_scanned = 0
+        self.dirs_scanned = 0
+        self.large_files_found = 0
+        self.errors_count = 0
+        self.last_log = 0
+
+    def add_directory(self, files: int, large: int, errors: int) -> None:
+        """Contabiliza um diretório listado e registra o progresso no log."""
+        self.dirs_scanned += 1
+        self.files_scanned += files
+        self.large_files_found += large
+        self.errors_count += errors
+
+        if (
+            self.dirs_scanned % 100 == 0
+            or (self.files_scanned - self.last_log) >= 5000
+        ):
+            logger.info(
+                f"   Progresso: {self.dirs_scanned} pastas | {self.files_scanned} arquivos | {self.large_files_found} grandes encontrados"
+            )
+            self.last_log = self.files_scanned
+
+
+# (tamanho aparente, caminho, mtime, bytes alocados)
+MatchCallback = Callable[[int, str, float, int], None]
+
 
-def get_size_in_gb(size_bytes: int) -> float:
-    """Converte bytes para gigabytes.
+def _entry_device(entry: "os.DirEntry[str]") -> int:
+    """Retorna o ``st_dev`` de uma entrada de diretório.
+
+    No Windows ``DirEntry.stat`` não preenche ``st_dev``, então é
+    necessário um stat completo.
+    """
+    if os.name == "nt":
+        return os.stat(entry.path, follow_symlinks=False).st_dev
+    return entry.stat(follow_symlinks=False).st_dev
+
+
+class _DirectoryListing(NamedTuple):
+    """Resultado da listagem de um único diretório."""
+
+    subdirs: List[str]
+    top: TopFiles
+    files: int
+    large: int
+    errors: int
+    total_bytes: int
+    hardlinks: int  # arquivos com mais de um hardlink, contados aqui ou não
+
+
+def _scan_directory(
+    root: str,
+    rules: IgnoreRules,
+    min_size_bytes: float,
+    max_files: int,
+    threshold: float,
+    on_match: Optional[MatchCallback] = None,
+    device: Optional[int] = None,
+    rank_by: str = "apparent",
+    seen_inodes: Optional[InodeSet] = None,
+    sample: Optional[DirectorySample] = None,
+    file_filter: Optional[FileFilter] = None,
+    histogram: Optional[FileHistogram] = None,
+) -> _DirectoryListing:
+    """Lista um único diretório e separa subpastas e arquivos grandes.
 
     Args:
-        size_bytes: Tamanho em bytes
+        root: Diretório a listar
+        rules: Regras compiladas que decidem quais subpastas não descer
+        min_size_bytes: Tamanho mínimo em bytes para considerar
+        max_files: Quantidade máxima de arquivos retidos
+        threshold: Limiar inicial do coletor local (>= min_size_bytes)
+        on_match: Chamada com ``(tamanho, caminho, mtime, alocado)`` para cada
+            arquivo acima do tamanho mínimo
+        device: Se informado, só desce em subpastas com esse ``st_dev``
+        rank_by: Medida usada no limiar, no ranking e no total:
+            'apparent' ou 'allocated'
+        seen_inodes: Inodes já contabilizados; hardlinks extras de um
+            mesmo inode são ignorados
+        sample: Se informado, recebe contagem de entradas e chamadas
+            stat, tempos de stat e de filtro e erros por errno
+        file_filter: Se informado, só os arquivos que passarem por ele
+            contam; nome e caminho são testados antes do stat
+        histogram: Se informado, registra medida, mtime, atime e extensão
+            de todo arquivo contado no total, grande ou não
 
     Returns:
-        Tamanho em gigabytes (GB)
+        Listagem com subpastas, coletor local, arquivos vistos, arquivos
+        acima do tamanho mínimo, erros, soma dos tamanhos dos arquivos e
+        arquivos com mais de um hardlink
 
-    Example:
-        >>> get_size_in_gb(1073741824)
-        1.0
+    Raises:
+        OSError: Se o diretório não puder ser aberto
     """
-    return size_bytes / (1024**3)
+    subdirs = []
+    local_top = TopFiles(max_files, threshold, rank_by)
+    by_allocated = rank_by == "allocated"
+    files_scanned = 0
+    large_files_found = 0
+    errors_count = 0
+    total_bytes = 0
+    hardlinks = 0
+    check_names = file_filter is not None and file_filter.checks_names
+    check_stat = file_filter is not None and file_filter.checks_stat
+    record = histogram.recorder() if histogram is not None else None
 
+    with os.scandir(root) as entries:
+        try:
+            for entry in entries:
+                try:
+                    if sample is not None:
+                        sample.entries += 1
+
+                    if entry.is_dir(follow_symlinks=False):
+                        if sample is None:
+                            ignored = rules.is_ignored(entry.name, entry.path)
+                        else:
+                            start = perf_counter()
+                            ignored = rules.is_ignored(entry.name, entry.path)
+                            sample.filter_seconds += perf_counter() - start
+                        if ignored:
+                            continue
+                        if device is not None:
+                            if sample is not None:
+                                sample.stat_calls += 1
+                            if _entry_device(entry) != device:
+                                # Outro sistema de arquivos montado aqui (du -x)
+                                continue
+                        subdirs.append(entry.path)
+                        continue
 
-def get_all_disks() -> List[Dict[str, Any]]:
-    """Identifica todos os discos montados no sistema.
+                    files_scanned += 1
 
-    Obtém informações detalhadas sobre cada disco/partição disponível,
-    incluindo espaço total, usado, livre e percentual de utilização.
+                    if entry.is_symlink():
+                        continue
+
+                    if check_names:
+                        # Só com os dados da listagem: reprovado aqui, sem stat
+                        if sample is None:
+                            accepted = file_filter.accepts_name(entry.name, entry.path)
+                        else:
+                            start = perf_counter()
+                            accepted = file_filter.accepts_name(entry.name, entry.path)
+                            sample.filter_seconds += perf_counter() - start
+                        if not accepted:
+                            continue
+
+                    if sample is None:
+                        stat = entry.stat(follow_symlinks=False)
+                    else:
+                        start = perf_counter()
+                        stat = entry.stat(follow_symlinks=False)
+                        sample.stat_seconds += perf_counter() - start
+                        sample.stat_calls += 1
+
+                    if check_stat and not file_filter.accepts_stat(stat):
+                        continue
+
+                    if stat.st_nlink > 1:
+                        hardlinks += 1
+                        if seen_inodes is not None and not seen_inodes.add(
+                            stat.st_dev, stat.st_ino
+                        ):
+                            # Outro hardlink do mesmo inode já foi contado
+                            continue
+
+                    size = stat.st_size
+                    allocated = allocated_bytes(stat)
+                    key = allocated if by_allocated else size
+                    total_bytes += key
+                    if record is not None:
+                        record(key, stat.st_mtime, stat.st_atime, entry.name)
+
+                    if key < min_size_bytes:
+                        continue
+
+                    large_files_found += 1
+                    if on_match is not None:
+                        on_match(size, entry.path, stat.st_mtime, allocated)
+
+                    # Abaixo do limiar do heap, descarta sem montar nada
+                    if key >= local_top.threshold:
+                        local_top.offer(size, entry.path, stat.st_mtime, allocated)
+
+                    if get_size_in_gb(key) >= 5.0:
+                        logger.info(
+                            f"   → Arquivo grande encontrado: {get_size_in_gb(key):.2f} GB - {entry.name}"
+                        )
+
+                except (PermissionError, FileNotFoundError, OSError) as e:
+                    errors_count += 1
+                    if sample is not None:
+                        sample.add_error(e)
+                    continue
+        except OSError as e:
+            # Falha ao continuar a listagem (ex: diretório removido durante a leitura)
+            logger.debug(f"Erro ao listar {root}: {e}")
+            errors_count += 1
+            if sample is not None:
+                sample.add_error(e)
+
+    return _DirectoryListing(
+        subdirs,
+        local_top,
+        files_scanned,
+        large_files_found,
+        errors_count,
+        total_bytes,
+        hardlinks,
+    )
+
+
+def _scan_rules(
+    path: str,
+    fast_mode: bool,
+    exclude: Optional[Sequence[str]],
+    one_filesystem: bool,
+    rank_by: str,
+) -> Tuple[IgnoreRules, Optional[int], str]:
+    """Monta as regras de travessia de um escaneamento a partir de ``path``.
 
     Returns:
-        Lista de dicionários contendo informações dos discos:
-        - drive: Letra/identificador do disco (ex: 'C:\\')
-        - mountpoint: Ponto de montagem
-        - fstype: Sistema de arquivos (NTFS, FAT32, etc)
-        - total_gb: Tamanho total em GB
-        - used_gb: Espaço usado em GB
-        - free_gb: Espaço livre em GB
-        - percent: Percentual de uso
+        Regras de exclusão compiladas, o ``st_dev`` a que a travessia se
+        restringe (None para atravessar montagens) e a assinatura que o
+        índice incremental usa para saber se pode reaproveitar entradas
+    """
+    # Compiladas uma única vez: cada pasta custa um lookup em conjunto e,
+    # só se houver globs, uma regex combinada
+    if one_filesystem:
+        device = os.stat(path).st_dev  # type: Optional[int]
+        skip_paths = set()
+    else:
+        device = None
+        skip_paths = skipped_mountpoints(path, disk_partitions())
+    rules = IgnoreRules.for_scan(path, fast_mode, exclude, skip_paths)
+    # Muda o que é percorrido, então também invalida o índice incremental
+    signature = ":".join(
+        [rules.signature, rank_by] + (["one-filesystem"] if one_filesystem else [])
+    )
+    return rules, device, signature
 
-    Note:
-        Discos sem permissão de acesso são ignorados silenciosamente.
+
+# Ordena as subpastas de uma pasta (None para as iniciais), ver ScanBudget
+OrderCallback = Callable[[Optional[str], List[str]], List[PriorityKey]]
+
+# Sentinela da fila de prioridade: sai depois de qualquer pasta
+_LAST = ((float("inf"),), None)
+
+
+def _run_directory_queue(
+    paths: List[str],
+    workers: int,
+    visit: Callable[[str], List[str]],
+    stop: Optional[Callable[[], bool]] = None,
+    order: Optional[OrderCallback] = None,
+) -> None:
+    """Distribui a travessia de uma árvore entre várias threads.
+
+    Os diretórios pendentes ficam numa fila compartilhada: cada worker
+    retira um diretório, chama ``visit`` e enfileira as subpastas
+    retornadas. Assim as subárvores de primeiro nível (e as mais
+    profundas) se espalham entre as threads conforme elas ficam livres.
+
+    Args:
+        paths: Diretórios iniciais (a raiz, ou as pastas pendentes de um
+            checkpoint)
+        workers: Quantidade de threads
+        visit: Função que processa um diretório e retorna suas subpastas
+        stop: Se retornar True, os diretórios restantes são descartados
+            sem visita e a função retorna
+        order: Se informado, a fila passa a ser de prioridade: as
+            subpastas saem na ordem das chaves devolvidas (menor primeiro)
     """
-    disks = []
-    partitions = psutil.disk_partitions()
+    if order is None:
+        pending = queue.Queue()  # type: queue.Queue
+        sentinel = None  # type: Any
 
-    for partition in partitions:
-        try:
-            usage = psutil.disk_usage(partition.mountpoint)
-            disks.append(
-                {
-                    "drive": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "fstype": partition.fstype,
-                    "total_gb": get_size_in_gb(usage.total),
-                    "used_gb": get_size_in_gb(usage.used),
-                    "free_gb": get_size_in_gb(usage.free),
-                    "percent": usage.percent,
-                }
-            )
-        except PermissionError:
-            continue
+        def enqueue(parent: Optional[str], subdirs: List[str]) -> None:
+            for subdir in subdirs:
+                pending.put(subdir)
+
+        def dequeue() -> Optional[str]:
+            return pending.get()
+
+    else:
+        pending = queue.PriorityQueue()
+        sentinel = _LAST
 
-    return disks
+        def enqueue(parent: Optional[str], subdirs: List[str]) -> None:
+            for item in zip(order(parent, subdirs), subdirs):
+                pending.put(item)
+
+        def dequeue() -> Optional[str]:
+            return pending.get()[1]
+
+    enqueue(None, paths)
+
+    def worker() -> None:
+        while True:
+            root = dequeue()
+            try:
+                if root is None:
+                    return
+                if stop is not None and stop():
+                    continue
+                enqueue(root, visit(root))
+            except Exception as e:
+                logger.error(f"Erro inesperado ao escanear {root}: {e}")
+            finally:
+                pending.task_done()
+
+    threads = [
+        threading.Thread(target=worker, name=f"scan-worker-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    pending.join()
+
+    for _ in threads:
+        pending.put(sentinel)
+    for thread in threads:
+        thread.join()
 
 
 def scan_large_files(
-    path: str, min_size_gb: float = 0.1, max_files: int = 100, fast_mode: bool = False
-) -> List[Dict[str, Any]]:
+    path: str,
+    min_size_gb: float = 0.1,
+    max_files: int = 100,
+    fast_mode: bool = False,
+    workers: int = 1,
+    index: Optional[ScanIndex] = None,
+    tree: Optional[DirectoryTree] = None,
+    on_match: Optional[MatchCallback] = None,
+    exclude: Optional[Sequence[str]] = None,
+    one_filesystem: bool = False,
+    rank_by: str = "apparent",
+    metrics: Optional[ScanMetrics] = None,
+    checkpoint: Optional[ScanCheckpoint] = None,
+    throttle: Optional[Throttle] = None,
+    budget: Optional[ScanBudget] = None,
+    file_filter: Optional[FileFilter] = None,
+    histogram: Optional[FileHistogram] = None,
+    stop: Optional[threading.Event] = None,
+) -> List[FileRecord]:
     """Escaneia um diretório recursivamente em busca de arquivos grandes.
 
     Percorre toda a estrutura de diretórios a partir do caminho especificado,
     identificando arquivos que excedem o tamanho mínimo definido. Ignora
     automaticamente pastas de sistema e temporárias.
 
+    A travessia usa ``os.scandir`` com uma pilha própria de diretórios e
+    aproveita os dados de cada ``DirEntry``: o tipo da entrada vem da
+    própria listagem e tamanho e data de modificação saem de um único
+    ``entry.stat(follow_symlinks=False)`` por arquivo.
+
     Args:
         path: Caminho raiz para iniciar o escaneamento
         min_size_gb: Tamanho mínimo em GB para considerar (padrão: 0.1)
         max_files: Quantidade máxima de arquivos a retornar (padrão: 100)
         fast_mode: Se True, ignora pastas de usuário para acelerar (padrão: False)
+        workers: Quantidade de threads que dividem a travessia através de
+            uma fila compartilhada de diretórios (padrão: 1, sequencial)
+        index: Índice persistente para escaneamento incremental. Diretórios
+            com mtime e inode inalterados são servidos do índice e apenas
+            os alterados são listados de novo (padrão: None, desativado)
+        tree: Árvore a preencher com o total de bytes de cada diretório e
+            de sua subárvore, na mesma travessia (padrão: None)
+        on_match: Chamada com ``(tamanho, caminho, mtime, alocado)`` para cada
+            arquivo acima do tamanho mínimo assim que ele é encontrado,
+            ex: ``StreamSink.write`` (padrão: None)
+        exclude: Padrões extras de exclusão de pastas: nomes, globs
+            (``*.cache``), caminhos ancorados (``/var/lib/docker``) e
+            negações (``!bin``). Ver ``IgnoreRules`` (padrão: None)
+        one_filesystem: Se True, não sai do sistema de arquivos da raiz,
+            como ``du -x``: subpastas com outro ``st_dev`` são puladas.
+            Se False, atravessa montagens mas ainda pula as virtuais e
+            remotas (``/proc``, ``/sys``, NFS...) (padrão: False)
+        rank_by: 'apparent' ordena e filtra pelo tamanho aparente
+            (``st_size``); 'allocated' pelo espaço ocupado em disco
+            (``st_blocks * 512``), que é o que de fato se recupera ao
+            apagar um arquivo esparso (padrão: 'apparent')
+        metrics: Se informado, recebe métricas do escaneamento: pastas e
+            entradas por segundo, chamadas stat, erros por errno, tempo de
+            listagem/stat/filtro e pastas mais lentas. Sem ele nenhuma
+            medição é feita (padrão: None)
+        checkpoint: Se informado, o estado da travessia (pastas pendentes,
+            contadores, top-N, árvore e inodes vistos) é gravado
+            periodicamente; com ``checkpoint.resume`` o escaneamento
+            continua de um checkpoint compatível em vez de recomeçar
+            (padrão: None)
+        throttle: Se informado, limita pastas e chamadas stat por segundo
+            e pausa a travessia enquanto o sistema estiver carregado
+            (ver ``Throttle``) (padrão: None)
+        budget: Se informado, o escaneamento tem prazo: as pastas com
+            mais bytes estimados são visitadas primeiro e, quando o prazo
+            acaba, a travessia para e devolve o melhor top-N até ali; a
+            cobertura fica em ``budget.coverage()`` (ver ``ScanBudget``)
+            (padrão: None)
+        file_filter: Se informado, só os arquivos que satisfizerem todas
+            as expressões entram no resultado, nos totais das pastas e em
+            ``on_match``. Nome, extensão e caminho são testados antes do
+            stat; tamanho, idades e dono, sobre ele (ver ``FileFilter``)
+            (padrão: None)
+        histogram: Se informado, recebe tamanho (pela medida de
+            ``rank_by``), idades e extensão de todos os arquivos contados,
+            para os histogramas de distribuição (ver ``FileHistogram``)
+            (padrão: None)
+        stop: Se informado, a travessia termina a pasta em andamento e
+            para assim que o evento for marcado, de qualquer thread (ex:
+            Ctrl+C recebido pela thread principal) (padrão: None)
 
     Returns:
-        Lista de dicionários com informações dos arquivos encontrados:
+        Lista de ``FileRecord`` (acessíveis como dicionários somente
+        leitura) com informações dos arquivos encontrados:
         - path: Caminho completo do arquivo
         - size_gb: Tamanho em GB
         - size_bytes: Tamanho em bytes
-        - modified: Data de modificação (formato: YYYY-MM-DD HH:MM:SS)
+        - allocated_gb: Espaço ocupado em disco em GB
+        - allocated_bytes: Espaço ocupado em disco em bytes
+        - modified: Data de modificação (formato: YYYY-MM-DD HH:MM:SS),
+          formatada só quando lida; o timestamp bruto fica em ``.mtime``
 
     Note:
         - Arquivos >= 5GB são reportados imediatamente no log
         - Progresso é exibido a cada 100 pastas ou 5000 arquivos
-        - Pastas de sistema são automaticamente ignoradas
+        - Pastas de sistema são automaticamente ignoradas, assim como as
+          regras do arquivo ``.diskanalyzerignore`` na raiz, se existir
         - Links simbólicos são pulados para evitar loops
+        - Arquivos com vários hardlinks (mesmo ``(st_dev, st_ino)``) são
+          contados uma única vez, no primeiro caminho encontrado; no
+          Windows ``DirEntry`` não informa ``st_nlink`` e não há essa checagem
+        - No máximo uma chamada stat por arquivo (nenhuma para symlinks
+          nem para arquivos reprovados pelo nome ou caminho no filtro)
         - Erros de permissão são tratados silenciosamente
+        - Apenas os ``max_files`` maiores ficam em memória (heap limitado);
+          arquivos abaixo do limiar atual são descartados sem alocação
+        - Com workers > 1 o ganho vem da latência de I/O sobreposta;
+          a ordem de visita dos diretórios deixa de ser determinística
+        - No modo incremental, pastas servidas do índice só repassam a
+          ``on_match`` os maiores arquivos gravados para elas
+        - Ao retomar um checkpoint, as pastas concluídas até ele não são
+          revisitadas; arquivos encontrados depois do último checkpoint
+          gravado são repassados de novo a ``on_match``
+        - Com prazo esgotado, o índice incremental não descarta as pastas
+          não visitadas e o checkpoint, se houver, é mantido com as pastas
+          pendentes para que ``resume`` complete o escaneamento
+        - Com ``histogram``, o índice incremental é gravado mas não
+          consultado: pastas servidas do índice não teriam os dados de
+          cada arquivo. Ao retomar um checkpoint ou com prazo esgotado, o
+          histograma cobre só as pastas listadas nesta execução
+
+    Raises:
+        ScanInterrupted: Se ``stop`` for marcado ou ``checkpoint.interrupt()``
+            for chamado durante o escaneamento; com checkpoint, o estado fica
+            nele para ser retomado
 
     Example:
         >>> files = scan_large_files('C:\\\\', min_size_gb=1.0, max_files=50)
         >>> print(f"Encontrados {len(files)} arquivos grandes")
     """
-    large_files = []
     min_size_bytes = min_size_gb * (1024**3)
+    top = TopFiles(max_files, min_size_bytes, rank_by)
+    seen_inodes = InodeSet(track_new=checkpoint is not None)
+    progress = _ScanProgress()
+    lock = threading.Lock()
 
-    files_scanned = 0
-    dirs_scanned = 0
-    large_files_found = 0
-    errors_count = 0
-    last_log = 0
+    rules, device, scan_signature = _scan_rules(
+        path, fast_mode, exclude, one_filesystem, rank_by
+    )
+    if not file_filter:
+        file_filter = None
+    else:
+        # Totais e top-N gravados só valem para o mesmo filtro
+        scan_signature += ":" + file_filter.signature
 
     mode = "RÁPIDO" if fast_mode else "COMPLETO"
     logger.info(f"Iniciando escaneamento {mode} de {path}")
+    if file_filter is not None:
+        logger.info(f"   • Filtro: {file_filter}")
+
+    def list_directory(
+        root: str, sample: Optional[DirectorySample]
+    ) -> _DirectoryListing:
+        return _scan_directory(
+            root,
+            rules,
+            min_size_bytes,
+            max_files,
+            max(min_size_bytes, top.threshold),
+            on_match,
+            device,
+            rank_by,
+            seen_inodes,
+            sample,
+            file_filter,
+            histogram,
+        )
 
-    try:
-        for root, dirs, files in os.walk(path):
-            ignored_folders = [
-                "system volume information",
-                "$recycle.bin",
-                "windows",
-                "program files",
-                "program files (x86)",
-                "programdata",
-                "$windows.~bt",
-                "$windows.~ws",
-                "windowsapps",
-                "winsxs",
-                "appdata",
-                ".git",
-                ".svn",
-                "node_modules",
-                "__pycache__",
-                ".cache",
-                ".npm",
-                ".nuget",
-                "temp",
-                "tmp",
-                ".vs",
-                ".vscode-server",
-                "packages",
-                "obj",
-                "bin",
-            ]
-
-            if fast_mode:
-                ignored_folders.extend(
-                    [
-                        "documents",
-                        "desktop",
-                        "downloads",
-                        "pictures",
-                        "music",
-                        "videos",
-                        "onedrive",
-                        "dropbox",
-                        "google drive",
-                        "icloud",
-                        ".minecraft",
-                        "steamapps",
-                        "%localappdata%",
-                        "%appdata%",
-                    ]
-                )
-
-            dirs[:] = [d for d in dirs if d.lower() not in ignored_folders]
-
-            dirs_scanned += 1
-
-            if dirs_scanned % 100 == 0 or (files_scanned - last_log) >= 5000:
-                logger.info(
-                    f"   Progresso: {dirs_scanned} pastas | {files_scanned} arquivos | {large_files_found} grandes encontrados"
-                )
-                last_log = files_scanned
-
-            for file in files:
-                files_scanned += 1
-
-                try:
-                    file_path = os.path.join(root, file)
-
-                    if os.path.islink(file_path):
-                        continue
+    def list_indexed(
+        root: str, sample: Optional[DirectorySample]
+    ) -> _DirectoryListing:
+        # stat antes da listagem: uma alteração no meio do caminho deixa o
+        # mtime gravado desatualizado e força nova listagem depois
+        dir_stat = os.stat(root)
+        if sample is not None:
+            sample.stat_calls += 1
+        cached = None
+        if reuse_index:
+            # Pastas com hardlinks são sempre listadas: o total gravado não
+            # diz quais inodes já foram contados por outra pasta nesta execução
+            cached = index.lookup(
+                root, dir_stat.st_mtime_ns, dir_stat.st_ino, hardlinks=False
+            )
 
-                    size = os.path.getsize(file_path)
-
-                    if size >= min_size_bytes:
-                        large_files.append(
-                            {
-                                "path": file_path,
-                                "size_gb": get_size_in_gb(size),
-                                "size_bytes": size,
-                                "modified": datetime.fromtimestamp(
-                                    os.path.getmtime(file_path)
-                                ).strftime("%Y-%m-%d %H:%M:%S"),
-                            }
-                        )
-                        large_files_found += 1
+        if cached is None:
+            # Sem o limiar global: a entrada gravada precisa valer para
+            # execuções futuras em que outros diretórios mudarem
+            listing = _scan_directory(
+                root,
+                rules,
+                min_size_bytes,
+                max_files,
+                min_size_bytes,
+                on_match,
+                device,
+                rank_by,
+                seen_inodes,
+                sample,
+                file_filter,
+                histogram,
+            )
+            index.store(
+                root,
+                dir_stat.st_mtime_ns,
+                dir_stat.st_ino,
+                [os.path.basename(d) for d in listing.subdirs],
+                listing.top.entries(),
+                listing.files,
+                listing.large,
+                listing.total_bytes,
+                listing.hardlinks,
+            )
+            return listing
+
+        found = TopFiles(max_files, min_size_bytes, rank_by)
+        for entry in cached.top:
+            file_path = entry[1]
+            if sample is not None:
+                sample.stat_calls += 1
+            try:
+                file_stat = os.stat(file_path, follow_symlinks=False)
+            except OSError:
+                continue
+            if file_filter is not None and not file_filter.accepts_stat(file_stat):
+                continue
+            if file_stat.st_nlink > 1 and not seen_inodes.add(
+                file_stat.st_dev, file_stat.st_ino
+            ):
+                continue
+            size = file_stat.st_size
+            allocated = allocated_bytes(file_stat)
+            if found.offer(size, file_path, file_stat.st_mtime, allocated):
+                if on_match is not None:
+                    on_match(size, file_path, file_stat.st_mtime, allocated)
+
+        return _DirectoryListing(
+            [os.path.join(root, name) for name in cached.subdirs],
+            found,
+            cached.files,
+            cached.large,
+            0,
+            cached.total_bytes,
+            cached.hardlinks,
+        )
 
-                        if get_size_in_gb(size) >= 5.0:
-                            logger.info(
-                                f"   → Arquivo grande encontrado: {get_size_in_gb(size):.2f} GB - {file}"
-                            )
+    def visit(root: str) -> List[str]:
+        nonlocal merging
+        if throttle is not None:
+            throttle.before_directory()
 
-                except (PermissionError, FileNotFoundError, OSError) as e:
-                    errors_count += 1
-                    continue
+        sample = None
+        if metrics is not None:
+            sample = DirectorySample()
+            start = perf_counter()
 
-    except (PermissionError, OSError) as e:
-        logger.error(f"Erro ao acessar {path}: {e}")
+        try:
+            listing = list_fn(root, sample)
+        except (PermissionError, FileNotFoundError, OSError) as e:
+            if metrics is not None:
+                metrics.add_error(e)
+            if root == path:
+                logger.error(f"Erro ao acessar {path}: {e}")
+            if tree is not None or checkpoint is not None:
+                with lock:
+                    tree_parents.pop(root, None)
+                    if checkpoint is not None:
+                        journal.append([root])
+            return []
+
+        if metrics is not None:
+            metrics.add_directory(root, perf_counter() - start, sample)
+        if throttle is not None:
+            throttle.after_directory(listing.files)
+
+        with lock:
+            merging = True
+            top.update(listing.top)
+            progress.add_directory(listing.files, listing.large, listing.errors)
+            if budget is not None:
+                budget.add_directory(listing.total_bytes)
+
+            if tree is not None:
+                add_to_tree(root, listing.subdirs, listing.total_bytes)
+
+            if checkpoint is not None:
+                # Só referências: a lista de subpastas não muda mais. Junto
+                # com o que já foi incorporado acima, é um corte consistente
+                journal.append([root, listing.subdirs, listing.total_bytes])
+                if checkpoint.tick():
+                    checkpoint.save(snapshot_locked())
+            merging = False
+
+        return listing.subdirs
+
+    def add_to_tree(root: str, subdirs: List[str], total_bytes: int) -> None:
+        parent = tree_parents.pop(root, -1)
+        name = os.path.basename(root) if parent >= 0 else root
+        node = tree.add(name, parent, total_bytes)
+        for subdir in subdirs:
+            tree_parents[subdir] = node
+
+    def snapshot_locked() -> Dict[str, Any]:
+        # Só o que mudou desde o registro anterior, mais contadores e top-N
+        nonlocal journal
+        record = {
+            "dirs": journal,
+            "inodes": seen_inodes.take_new(),
+            "progress": [
+                progress.dirs_scanned,
+                progress.files_scanned,
+                progress.large_files_found,
+                progress.errors_count,
+            ],
+            "top": top.entries(),
+        }
+        journal = []
+        return record
+
+    def snapshot() -> Optional[Dict[str, Any]]:
+        with lock:
+            # Interrompido no meio de uma incorporação: vale o anterior
+            return None if merging else snapshot_locked()
+
+    # Pasta pendente -> nó do pai na árvore (só para pastas ainda na fila)
+    tree_parents = {}  # type: Dict[str, int]
+    # Pastas concluídas desde o último checkpoint: [pasta, subpastas, bytes],
+    # ou só [pasta] se não pôde ser listada
+    journal = []  # type: List[List[Any]]
+    merging = False
+    start_paths = [path]
+    # Pedidos de parada: o de quem chamou e o do checkpoint, se houver
+    stop_events = [stop] if stop is not None else []
+
+    if checkpoint is not None:
+        stop_events.append(checkpoint.stop_event)
+        checkpoint_signature = ":".join(
+            [scan_signature, repr(min_size_bytes), str(max_files)]
+            + (["tree"] if tree is not None else [])
+        )
+        saved = checkpoint.load() if checkpoint.resume else None
+        if saved is not None and (
+            saved["root"] != path or saved["signature"] != checkpoint_signature
+        ):
+            logger.warning(
+                f"Checkpoint de {path} tem outros parâmetros: escaneamento completo"
+            )
+            saved = None
+
+        if saved is not None and saved["records"]:
+            # Reaplica as pastas concluídas na ordem em que foram gravadas
+            pending = {path}
+            for record in saved["records"]:
+                for entry in record["dirs"]:
+                    pending.discard(entry[0])
+                    if len(entry) == 1:
+                        tree_parents.pop(entry[0], None)
+                        continue
+                    pending.update(entry[1])
+                    if tree is not None:
+                        add_to_tree(*entry)
+                seen_inodes.extend(record["inodes"])
+            start_paths = list(pending)
+
+            last = saved["records"][-1]
+            (
+                progress.dirs_scanned,
+                progress.files_scanned,
+                progress.large_files_found,
+                progress.errors_count,
+            ) = last["progress"]
+            for _, file_path, mtime, size, allocated in last["top"]:
+                top.offer(size, file_path, mtime, allocated)
+            logger.info(
+                f"Retomando do checkpoint: {progress.dirs_scanned} pastas já "
+                f"concluídas, {len(start_paths)} pendentes"
+            )
+        checkpoint.begin(
+            {"root": path, "signature": checkpoint_signature}, saved is not None
+        )
+        checkpoint.attach(snapshot)
+
+    if index is not None:
+        reuse_index = index.begin(path, min_size_bytes, max_files, scan_signature)
+        # O índice não guarda os arquivos pequenos: o histograma exige listar
+        reuse_index = reuse_index and histogram is None
+        hits_before, rescanned_before = index.cache_hits, index.rescanned
+        list_fn = list_indexed
+    else:
+        list_fn = list_directory
+
+    def stopped() -> bool:
+        return any(event.is_set() for event in stop_events)
+
+    def should_stop() -> bool:
+        return stopped() or (budget is not None and budget.expired())
+
+    def traverse() -> None:
+        order = budget.order if budget is not None else None
+        if workers > 1:
+            _run_directory_queue(start_paths, workers, visit, should_stop, order)
+            return
+        if order is not None:
+            # Com prazo, a fila vira um heap: a pasta com mais bytes
+            # estimados é a próxima
+            queued = list(zip(order(None, start_paths), start_paths))
+            heapq.heapify(queued)
+            while queued and not should_stop():
+                root = heapq.heappop(queued)[1]
+                subdirs = visit(root)
+                for item in zip(order(root, subdirs), subdirs):
+                    heapq.heappush(queued, item)
+            return
+        # Pilha explícita de diretórios pendentes: os.scandir já entrega o
+        # tipo de cada entrada (d_type), então só é preciso um stat por arquivo.
+        pending = list(start_paths)
+        while pending and not stopped():
+            pending.extend(visit(pending.pop()))
+
+    if budget is not None:
+        budget.start(path)
+
+    completed = False
+    try:
+        if metrics is None:
+            traverse()
+        else:
+            with metrics.phase("scan"):
+                traverse()
+        if stopped():
+            raise ScanInterrupted(f"Escaneamento de {path} interrompido")
+        completed = budget is None or not budget.exhausted
+        if not completed and checkpoint is not None:
+            # Prazo esgotado: guarda as pastas que faltaram para o resume
+            state = snapshot()
+            if state is not None:
+                checkpoint.save(state)
+            logger.info(
+                f"Checkpoint mantido em {checkpoint.path}: use --resume para "
+                "completar o escaneamento"
+            )
+    except KeyboardInterrupt:
+        if checkpoint is not None:
+            checkpoint.interrupt()
+        raise
+    finally:
+        if checkpoint is not None:
+            checkpoint.close(completed)
 
     logger.info(
-        f"Escaneamento concluído: {files_scanned} arquivos em {dirs_scanned} pastas"
+        f"Escaneamento concluído: {progress.files_scanned} arquivos em {progress.dirs_scanned} pastas"
     )
-    logger.info(f"   • Arquivos grandes encontrados: {large_files_found}")
-    if errors_count > 0:
-        logger.warning(f"   • Arquivos sem permissão/erro: {errors_count}")
+    logger.info(f"   • Arquivos grandes encontrados: {progress.large_files_found}")
+    if budget is not None and budget.exhausted:
+        coverage = budget.coverage()
+        unscanned = coverage["unscanned_bytes_estimate"]
+        logger.warning(
+            f"   • Prazo de {budget.seconds:.1f}s esgotado: "
+            f"{coverage['directory_fraction']:.0%} das pastas conhecidas visitadas"
+            + (
+                f", ~{get_size_in_gb(unscanned):.2f} GB não escaneados"
+                if unscanned is not None
+                else ""
+            )
+        )
+    if index is not None:
+        if completed:
+            index.finish(path, min_size_bytes, max_files, scan_signature)
+        logger.info(
+            f"   • Índice: {index.cache_hits - hits_before} pasta(s) do cache | "
+            f"{index.rescanned - rescanned_before} reescaneada(s)"
+        )
+    if progress.errors_count > 0:
+        logger.warning(f"   • Arquivos sem permissão/erro: {progress.errors_count}")
+    if metrics is not None:
+        summary = metrics.to_dict()
+        logger.info(
+            f"   • Métricas: {summary['directories_per_second']:.0f} pastas/s | "
+            f"{summary['entries_per_second']:.0f} entradas/s | "
+            f"{summary['stat_calls']} chamadas stat"
+        )
 
-    large_files.sort(key=lambda x: x["size_bytes"], reverse=True)
-    return large_files[:max_files]
+    return top.results()
 
 
 def select_disks(disks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -0,0 +1,173 @@
+"""Instrumentação do escaneamento.
+
+Este módulo coleta métricas de desempenho de um escaneamento: pastas e
+entradas por segundo, chamadas stat, erros por errno, tempo gasto em
+cada fase e as pastas mais lentas de listar. A coleta só acontece
+quando um ``ScanMetrics`` é passado a ``scan_large_files``; sem ele, a
+travessia não faz nenhuma medição extra.
+
+Classes:
+    ScanMetrics: Métricas acumuladas de um escaneamento
+    DirectorySample: Contadores de uma única listagem de diretório
+
+Funções:
+    merge_metrics(): Combina as métricas de vários discos
+"""
+
+import errno
+import heapq
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator
+
+
+# Quantidade padrão de pastas mais lentas mantidas
+DEFAULT_SLOWEST = 10
+
+
+def _errno_name(exc: BaseException) -> str:
+    """Nome simbólico do errno de uma exceção (ex: 'EACCES')."""
+    code = getattr(exc, "errno", None)
+    if code is None:
+        return type(exc).__name__
+    return errno.errorcode.get(code, str(code))
+
+
+class DirectorySample:
+    """Contadores de uma listagem, preenchidos por ``_scan_directory``."""
+
+    __slots__ = ("entries", "stat_calls", "stat_seconds", "filter_seconds", "errors")
+
+    def __init__(self) -> None:
+        self.entries = 0
+        self.stat_calls = 0
+        self.stat_seconds = 0.0
+        self.filter_seconds = 0.0
+        self.errors = None
+
+    def add_error(self, exc: BaseException) -> None:
+        if self.errors is None:
+            self.errors = Counter()
+        self.errors[_errno_name(exc)] += 1
+
+
+class ScanMetrics:
+    """Métricas acumuladas de um escaneamento.
+
+    Seguro para uso com várias threads. O tempo de listagem de cada pasta
+    é dividido em stat, filtro (regras de exclusão) e o restante da
+    listagem (``os.scandir`` e processamento); com várias threads essas
+    somas podem passar do tempo de parede.
+
+    Args:
+        slowest: Quantidade de pastas mais lentas mantidas (padrão: 10)
+
+    Example:
+        >>> metrics = ScanMetrics()
+        >>> files = scan_large_files('/dados', 1.0, metrics=metrics)
+        >>> metrics.to_dict()['directories_per_second']
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST) -> None:
+        self.slowest = slowest
+        self.directories = 0
+        self.entries = 0
+        self.stat_calls = 0
+        self.errors = Counter()  # type: Counter
+        self.phases = {}  # type: Dict[str, float]
+        self._listing_seconds = 0.0
+        self._stat_seconds = 0.0
+        self._filter_seconds = 0.0
+        self._slowest = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mede o tempo de parede de uma fase (acumulado se repetida)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def add_directory(self, path: str, seconds: float, sample: DirectorySample) -> None:
+        """Registra a listagem de uma pasta."""
+        with self._lock:
+            self.directories += 1
+            self.entries += sample.entries
+            self.stat_calls += sample.stat_calls
+            self._listing_seconds += seconds
+            self._stat_seconds += sample.stat_seconds
+            self._filter_seconds += sample.filter_seconds
+            if sample.errors:
+                self.errors.update(sample.errors)
+
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, (seconds, path))
+            elif self.slowest > 0 and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (seconds, path))
+
+    def add_error(self, exc: BaseException) -> None:
+        """Registra um erro fora de uma listagem (ex: pasta inacessível)."""
+        with self._lock:
+            self.errors[_errno_name(exc)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retorna as métricas como um dicionário serializável em JSON."""
+        with self._lock:
+            wall = self.phases.get("scan", 0.0)
+            listing = self._listing_seconds - self._stat_seconds - self._filter_seconds
+            return {
+                "directories": self.directories,
+                "entries": self.entries,
+                "stat_calls": self.stat_calls,
+                "errors": dict(self.errors),
+                "directories_per_second": self.directories / wall if wall else 0.0,
+                "entries_per_second": self.entries / wall if wall else 0.0,
+                "phases": dict(self.phases),
+                "time_breakdown": {
+                    "listing": max(listing, 0.0),
+                    "stat": self._stat_seconds,
+                    "filter": self._filter_seconds,
+                },
+                "slowest_directories": [
+                    {"path": path, "seconds": seconds}
+                    for seconds, path in sorted(self._slowest, reverse=True)
+                ],
+            }
+
+
+def merge_metrics(
+    per_disk: Iterable[Dict[str, Any]], slowest: int = DEFAULT_SLOWEST
+) -> Dict[str, Any]:
+    """Soma as métricas de vários discos (saídas de ``ScanMetrics.to_dict``).
+
+    As taxas por segundo não são somadas: o chamador as recalcula com o
+    tempo de parede da execução.
+    """
+    totals = {
+        "directories": 0,
+        "entries": 0,
+        "stat_calls": 0,
+        "errors": Counter(),
+        "time_breakdown": Counter(),
+    }  # type: Dict[str, Any]
+    slow = []
+
+    for metrics in per_disk:
+        for key in ("directories", "entries", "stat_calls"):
+            totals[key] += metrics[key]
+        totals["errors"].update(metrics["errors"])
+        totals["time_breakdown"].update(metrics["time_breakdown"])
+        slow.extend(metrics["slowest_directories"])
+
+    totals["errors"] = dict(totals["errors"])
+    totals["time_breakdown"] = dict(totals["time_breakdown"])
+    totals["slowest_directories"] = heapq.nlargest(
+        slowest, slow, key=lambda d: d["seconds"]
+    )
+    return totals
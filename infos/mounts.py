@@ -0,0 +1,307 @@
+"""Pontos de montagem e limites de sistemas de arquivos.
+
+Este módulo decide quais partições entram no escaneamento para que cada
+byte seja lido uma única vez por execução:
+
+    - Sistemas de arquivos virtuais (proc, sysfs, tmpfs, overlay...) e
+      remotos (nfs, cifs, sshfs...) ficam de fora por padrão
+    - Bind mounts e montagens repetidas do mesmo dispositivo são
+      reduzidas à montagem que cobre as demais
+
+No Linux, dispositivo e subárvore montada vêm de ``/proc/self/mountinfo``
+(sem tocar nos pontos de montagem, o que evita travar em um NFS
+inacessível); nos demais sistemas usa-se o ``st_dev`` de cada ponto.
+
+A lista de partições também vem do mountinfo, só com a biblioteca padrão
+(o ``psutil`` fica para os demais sistemas), e é mantida em memória
+enquanto o conteúdo do arquivo não mudar. O mtime não serve de chave:
+no procfs ele é o momento em que o processo abriu o arquivo, não o da
+última montagem.
+
+Funções:
+    disk_partitions(): Partições montadas, como ``psutil.disk_partitions``
+    filter_partitions(): Remove partições virtuais, remotas e repetidas
+    skipped_mountpoints(): Pontos de montagem que a travessia não deve descer
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Sistemas de arquivos sem dados em disco (kernel, memória, containers)
+PSEUDO_FSTYPES = frozenset(
+    [
+        "autofs",
+        "binfmt_misc",
+        "bpf",
+        "cgroup",
+        "cgroup2",
+        "configfs",
+        "debugfs",
+        "devpts",
+        "devtmpfs",
+        "efivarfs",
+        "fusectl",
+        "hugetlbfs",
+        "mqueue",
+        "nsfs",
+        "overlay",
+        "proc",
+        "pstore",
+        "ramfs",
+        "rpc_pipefs",
+        "securityfs",
+        "selinuxfs",
+        "squashfs",
+        "sysfs",
+        "tmpfs",
+        "tracefs",
+        "fuse.gvfsd-fuse",
+        "fuse.lxcfs",
+        "fuse.portal",
+    ]
+)
+
+# Sistemas de arquivos de rede: lentos e sujeitos a travar em handles antigos
+REMOTE_FSTYPES = frozenset(
+    [
+        "afs",
+        "ceph",
+        "cifs",
+        "glusterfs",
+        "nfs",
+        "nfs4",
+        "smb3",
+        "smbfs",
+        "fuse.sshfs",
+        "fuse.rclone",
+    ]
+)
+
+_MOUNTINFO_FILE = "/proc/self/mountinfo"
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+class _MountInfo(NamedTuple):
+    """Linha de ``/proc/self/mountinfo`` relevante para a deduplicação."""
+
+    device: str
+    root: str
+    fstype: str
+
+
+class Partition(NamedTuple):
+    """Partição montada, com os campos de ``psutil.disk_partitions``."""
+
+    device: str
+    mountpoint: str
+    fstype: str
+    opts: str
+
+
+_Parsed = Tuple[List[Partition], Dict[str, _MountInfo]]
+
+# Último mountinfo lido e o resultado da sua interpretação
+_cache = (b"", ([], {}))  # type: Tuple[bytes, _Parsed]
+
+
+def _unescape(field: str) -> str:
+    """Decodifica os escapes octais do mountinfo (ex: ``\\040`` para espaço)."""
+    return _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _mount_options(mount: str, superblock: List[str]) -> str:
+    """Opções da montagem seguidas das do superbloco, como em ``/proc/mounts``."""
+    options = mount.split(",")
+    if superblock:
+        options.extend(o for o in superblock[0].split(",") if o not in options)
+    return ",".join(options)
+
+
+def _parse_mountinfo(content: bytes) -> _Parsed:
+    partitions = []
+    mounts = {}  # type: Dict[str, _MountInfo]
+    for line in content.decode("utf-8", "surrogateescape").splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index("-")
+            mountpoint = _unescape(fields[4])
+            fstype = fields[separator + 1]
+            partitions.append(
+                Partition(
+                    _unescape(fields[separator + 2]),
+                    mountpoint,
+                    fstype,
+                    _mount_options(fields[5], fields[separator + 3 :]),
+                )
+            )
+            mounts[mountpoint] = _MountInfo(fields[2], _unescape(fields[3]), fstype)
+        except (ValueError, IndexError):
+            continue
+    return partitions, mounts
+
+
+def _load_mountinfo() -> Optional[_Parsed]:
+    """Lê ``/proc/self/mountinfo``, reaproveitando a última interpretação.
+
+    Returns:
+        Partições na ordem do arquivo e, por ponto de montagem, o
+        dispositivo (``maior:menor``), a subárvore montada e o tipo (para
+        montagens empilhadas vale a última); None fora do Linux
+    """
+    global _cache
+    try:
+        with open(_MOUNTINFO_FILE, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+    cached_content, parsed = _cache
+    if content != cached_content:
+        parsed = _parse_mountinfo(content)
+        _cache = (content, parsed)
+    return parsed
+
+
+def _read_mountinfo() -> Dict[str, _MountInfo]:
+    """Ponto de montagem -> ``_MountInfo`` (vazio fora do Linux)."""
+    parsed = _load_mountinfo()
+    return parsed[1] if parsed is not None else {}
+
+
+def disk_partitions() -> List[Partition]:
+    """Lista todas as partições montadas, inclusive as virtuais.
+
+    Equivale a ``psutil.disk_partitions(all=True)``. No Linux lê o
+    mountinfo sem importar o ``psutil``; nos demais sistemas usa o
+    ``psutil``.
+
+    Returns:
+        Partições na ordem de montagem
+    """
+    parsed = _load_mountinfo()
+    if parsed is not None:
+        return list(parsed[0])
+
+    import psutil
+
+    return [
+        Partition(p.device, p.mountpoint, p.fstype, p.opts)
+        for p in psutil.disk_partitions(all=True)
+    ]
+
+
+def _is_within(path: str, parent: str) -> bool:
+    """Indica se ``path`` é ``parent`` ou está abaixo dele."""
+    return path == parent or path.startswith(parent.rstrip("/\\") + os.sep)
+
+
+def _is_skipped(fstype: str, include_fstypes: Set[str]) -> bool:
+    fstype = fstype.lower()
+    if fstype in include_fstypes:
+        return False
+    return fstype in PSEUDO_FSTYPES or fstype in REMOTE_FSTYPES
+
+
+def filter_partitions(
+    partitions: Iterable[Any],
+    include_fstypes: Optional[Iterable[str]] = None,
+    dedupe: bool = True,
+) -> List[Any]:
+    """Remove partições virtuais, remotas e montagens repetidas.
+
+    Duas montagens são do mesmo conteúdo quando apontam para o mesmo
+    dispositivo e a subárvore de uma contém a da outra (bind mount ou a
+    mesma partição montada duas vezes); fica a que cobre mais, e entre
+    iguais a de caminho mais curto.
+
+    Args:
+        partitions: Saída de ``disk_partitions`` (objetos com ``device``,
+            ``mountpoint`` e ``fstype``)
+        include_fstypes: Tipos virtuais/remotos a manter mesmo assim
+            (ex: ``['nfs4']``) (padrão: None)
+        dedupe: Se False, mantém montagens repetidas (padrão: True)
+
+    Returns:
+        Partições a escanear, na ordem original
+    """
+    include = {fstype.lower() for fstype in include_fstypes or []}
+    mountinfo = _read_mountinfo()
+
+    candidates = []
+    seen_mountpoints = set()
+    for order, partition in enumerate(partitions):
+        if partition.mountpoint in seen_mountpoints:
+            continue
+        seen_mountpoints.add(partition.mountpoint)
+
+        info = mountinfo.get(partition.mountpoint)
+        fstype = info.fstype if info is not None else partition.fstype
+        if _is_skipped(fstype, include):
+            logger.debug(f"Ignorando {partition.mountpoint} ({fstype})")
+            continue
+
+        if info is not None:
+            device, root = info.device, info.root
+        else:
+            try:
+                device, root = str(os.stat(partition.mountpoint).st_dev), os.sep
+            except OSError:
+                device, root = partition.device, os.sep
+        candidates.append((order, partition, device, root))
+
+    if not dedupe:
+        return [partition for _, partition, _, _ in candidates]
+
+    kept = []
+    candidates.sort(key=lambda c: (len(c[3]), len(c[1].mountpoint)))
+    for order, partition, device, root in candidates:
+        covering = next(
+            (
+                other
+                for _, other, other_device, other_root in kept
+                if other_device == device and _is_within(root, other_root)
+            ),
+            None,
+        )
+        if covering is not None:
+            logger.info(
+                f"Ignorando {partition.mountpoint}: mesmo conteúdo de "
+                f"{covering.mountpoint} ({partition.device})"
+            )
+            continue
+        kept.append((order, partition, device, root))
+
+    kept.sort(key=lambda c: c[0])
+    return [partition for _, partition, _, _ in kept]
+
+
+def skipped_mountpoints(
+    root: str,
+    partitions: Iterable[Any],
+    include_fstypes: Optional[Iterable[str]] = None,
+) -> Set[str]:
+    """Pontos de montagem virtuais/remotos abaixo de ``root``.
+
+    Usado quando a travessia atravessa sistemas de arquivos, para ainda
+    assim não descer em ``/proc``, ``/sys``, NFS etc.
+
+    Args:
+        root: Raiz do escaneamento
+        partitions: Saída de ``disk_partitions()``
+        include_fstypes: Tipos a não pular (padrão: None)
+
+    Returns:
+        Caminhos completos dos pontos de montagem a pular
+    """
+    include = {fstype.lower() for fstype in include_fstypes or []}
+    return {
+        partition.mountpoint
+        for partition in partitions
+        if partition.mountpoint != root
+        and _is_within(partition.mountpoint, root)
+        and _is_skipped(partition.fstype, include)
+    }
@@ -0,0 +1,105 @@
+"""Registro compacto de um arquivo encontrado.
+
+Este módulo define o tipo usado nos resultados de ``scan_large_files``.
+Em vez de um dicionário por arquivo, com tamanho em GB e data já
+formatados, cada resultado guarda só os valores brutos em um objeto com
+``__slots__``; os campos derivados são calculados quando lidos.
+
+Classes:
+    FileRecord: Arquivo encontrado, com visão de dicionário somente leitura
+
+Funções:
+    format_mtime(): Formata um timestamp como nos relatórios
+"""
+
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+
+# Chaves expostas pela visão de dicionário, na ordem dos antigos dicts
+_KEYS = (
+    "path",
+    "size_gb",
+    "size_bytes",
+    "allocated_gb",
+    "allocated_bytes",
+    "modified",
+)
+
+
+def format_mtime(mtime: float) -> str:
+    """Formata um timestamp como ``YYYY-MM-DD HH:MM:SS`` (hora local).
+
+    ``time.strftime`` sobre ``time.localtime`` gera o mesmo texto que
+    ``datetime.fromtimestamp(...).strftime(...)`` em cerca de metade do tempo.
+    """
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
+
+
+class FileRecord(Mapping):
+    """Arquivo encontrado por ``scan_large_files``.
+
+    Guarda apenas caminho, tamanho, espaço alocado e mtime bruto. Para
+    manter compatíveis os chamadores que tratavam resultados como
+    dicionários, também é um ``Mapping`` somente leitura com as chaves
+    ``path``, ``size_gb``, ``size_bytes``, ``allocated_gb``,
+    ``allocated_bytes`` e ``modified``; GB e data formatada só são
+    calculados quando acessados (tipicamente nos geradores de relatório).
+
+    Args:
+        size: Tamanho aparente em bytes
+        path: Caminho completo
+        mtime: Data de modificação (timestamp)
+        allocated: Bytes alocados em disco (padrão: igual a ``size``)
+
+    Example:
+        >>> record = FileRecord(2 * 1024**3, '/dados/vm.img', 0.0)
+        >>> record['size_gb'], record.mtime
+        (2.0, 0.0)
+        >>> dict(record)['path']
+        '/dados/vm.img'
+    """
+
+    __slots__ = ("path", "size_bytes", "allocated_bytes", "mtime")
+
+    def __init__(
+        self, size: int, path: str, mtime: float, allocated: Optional[int] = None
+    ) -> None:
+        self.path = path
+        self.size_bytes = size
+        self.allocated_bytes = size if allocated is None else allocated
+        self.mtime = mtime
+
+    @property
+    def size_gb(self) -> float:
+        return self.size_bytes / (1024**3)
+
+    @property
+    def allocated_gb(self) -> float:
+        return self.allocated_bytes / (1024**3)
+
+    @property
+    def modified(self) -> str:
+        return format_mtime(self.mtime)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return (
+            f"FileRecord(size={self.size_bytes}, path={self.path!r}, "
+            f"mtime={self.mtime}, allocated={self.allocated_bytes})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retorna um dicionário comum com todas as chaves (ex: para JSON)."""
+        return dict(self)
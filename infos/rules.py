@@ -0,0 +1,301 @@
+"""Regras de exclusão de pastas.
+
+Este módulo compila, uma única vez por escaneamento, as regras que
+decidem quais pastas não são percorridas. Cada tipo de regra usa a
+estrutura mais barata para ser consultada a cada diretório:
+
+    - Nomes literais (ex: ``node_modules``): conjunto com busca por hash
+    - Globs de nome (ex: ``*.cache``): uma única regex combinada
+    - Caminhos ancorados (ex: ``/var/lib/docker/overlay2``): regex
+      combinada aplicada ao caminho
+    - Negação estilo gitignore (ex: ``!bin``): reinclui o que casar
+
+Classes:
+    IgnoreRules: Conjunto compilado de regras de exclusão
+
+Funções:
+    load_rules_file(): Lê regras de um arquivo (uma por linha)
+"""
+
+import hashlib
+import os
+import re
+from typing import Iterable, List, Optional, Pattern
+
+
+# Arquivo de regras lido automaticamente na raiz de cada ponto de montagem
+RULES_FILE_NAME = ".diskanalyzerignore"
+
+IGNORED_FOLDERS = [
+    "system volume information",
+    "$recycle.bin",
+    "windows",
+    "program files",
+    "program files (x86)",
+    "programdata",
+    "$windows.~bt",
+    "$windows.~ws",
+    "windowsapps",
+    "winsxs",
+    "appdata",
+    ".git",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".cache",
+    ".npm",
+    ".nuget",
+    "temp",
+    "tmp",
+    ".vs",
+    ".vscode-server",
+    "packages",
+    "obj",
+    "bin",
+]
+
+FAST_MODE_IGNORED_FOLDERS = [
+    "documents",
+    "desktop",
+    "downloads",
+    "pictures",
+    "music",
+    "videos",
+    "onedrive",
+    "dropbox",
+    "google drive",
+    "icloud",
+    ".minecraft",
+    "steamapps",
+    "%localappdata%",
+    "%appdata%",
+]
+
+
+def load_rules_file(path: str) -> List[str]:
+    """Lê regras de um arquivo, uma por linha.
+
+    Linhas vazias e iniciadas por ``#`` são ignoradas.
+
+    Args:
+        path: Caminho do arquivo de regras
+
+    Returns:
+        Lista de padrões na ordem do arquivo
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _is_literal(pattern: str) -> bool:
+    """Indica se o padrão não tem curingas de glob."""
+    return not any(char in pattern for char in "*?[")
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Traduz um glob para regex: ``*`` e ``?`` não atravessam '/', ``**`` sim."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def _combine(regexes: List[str]) -> Optional[Pattern]:
+    """Une várias regex numa alternância única (ou None se vazia)."""
+    if not regexes:
+        return None
+    return re.compile("(?:" + "|".join(regexes) + r")\Z")
+
+
+class _RuleSet:
+    """Regras de um mesmo sentido (exclusão ou negação) já compiladas."""
+
+    __slots__ = ("names", "suffixes", "prefixes", "name_regex", "path_regex")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        names = set()
+        suffixes = []
+        prefixes = []
+        name_globs = []
+        path_globs = []
+
+        for pattern in patterns:
+            pattern = pattern.replace("\\", "/").rstrip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                path_globs.append(_glob_to_regex(pattern.lstrip("/").lower()))
+            elif _is_literal(pattern[1:]) and pattern.startswith("*"):
+                # "*.tmp": str.endswith com tupla, bem mais barato que regex
+                suffixes.append(pattern[1:].lower())
+            elif _is_literal(pattern[:-1]) and pattern.endswith("*"):
+                prefixes.append(pattern[:-1].lower())
+            elif not _is_literal(pattern):
+                name_globs.append(_glob_to_regex(pattern.lower()))
+            else:
+                names.add(pattern.lower())
+
+        self.names = frozenset(names)
+        self.suffixes = tuple(suffixes)
+        self.prefixes = tuple(prefixes)
+        self.name_regex = _combine(name_globs)
+        self.path_regex = _combine(path_globs)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.names
+            or self.suffixes
+            or self.prefixes
+            or self.name_regex
+            or self.path_regex
+        )
+
+    def matches(self, name: str, rel_path: Optional[str], abs_path: str) -> bool:
+        if name in self.names:
+            return True
+        if self.suffixes and name.endswith(self.suffixes):
+            return True
+        if self.prefixes and name.startswith(self.prefixes):
+            return True
+        if self.name_regex is not None and self.name_regex.match(name):
+            return True
+        if self.path_regex is not None:
+            if rel_path is not None and self.path_regex.match(rel_path):
+                return True
+            if self.path_regex.match(abs_path):
+                return True
+        return False
+
+
+class IgnoreRules:
+    """Conjunto compilado de regras de exclusão de pastas.
+
+    Sintaxe de cada padrão (sem diferenciar maiúsculas/minúsculas):
+
+    - ``nome``: pasta com esse nome em qualquer profundidade
+    - ``*.tmp``, ``cache-?``: glob aplicado ao nome da pasta
+    - ``var/lib/docker`` ou ``/var/lib/docker``: padrão com '/' é
+      ancorado ao caminho, relativo à raiz do escaneamento (como no
+      gitignore); padrões absolutos também casam com o caminho completo.
+      Aceita globs (``**`` atravessa níveis)
+    - ``!padrão``: negação; uma pasta que casar com uma negação nunca é
+      ignorada, mesmo que case com outras regras
+
+    Caminhos em ``skip_paths`` (ex: pontos de montagem de ``/proc``) são
+    sempre ignorados, comparados de forma exata e sem negação.
+
+    Args:
+        patterns: Padrões de exclusão e negação
+        root: Raiz do escaneamento, usada pelos padrões ancorados
+        skip_paths: Caminhos completos a ignorar sempre (padrão: vazio)
+
+    Example:
+        >>> rules = IgnoreRules(['node_modules', '*.cache', '/var/lib/docker', '!bin'], '/')
+        >>> rules.is_ignored('node_modules', '/srv/app/node_modules')
+        True
+        >>> rules.is_ignored('docker', '/home/docker')
+        False
+    """
+
+    def __init__(
+        self, patterns: Iterable[str], root: str = "", skip_paths: Iterable[str] = ()
+    ) -> None:
+        self.patterns = [p.strip() for p in patterns if p.strip()]
+        self.root = root
+        self.skip_paths = frozenset(skip_paths)
+        self._prefix_len = len(root.rstrip("/\\"))
+        self._ignore = _RuleSet(p for p in self.patterns if not p.startswith("!"))
+        self._negate = _RuleSet(p[1:] for p in self.patterns if p.startswith("!"))
+        self._has_paths = (
+            self._ignore.path_regex is not None or self._negate.path_regex is not None
+        )
+
+    @classmethod
+    def for_scan(
+        cls,
+        root: str,
+        fast_mode: bool = False,
+        extra_patterns: Optional[Iterable[str]] = None,
+        skip_paths: Iterable[str] = (),
+    ) -> "IgnoreRules":
+        """Monta as regras de um escaneamento.
+
+        Combina, nesta ordem: as pastas ignoradas por padrão (mais as do
+        modo rápido), os padrões extras e o arquivo
+        ``.diskanalyzerignore`` da raiz, se existir.
+
+        Args:
+            root: Raiz do escaneamento (ponto de montagem)
+            fast_mode: Se True, inclui as pastas do modo rápido
+            extra_patterns: Padrões adicionais (ex: vindos da linha de comando)
+            skip_paths: Caminhos completos a ignorar sempre
+
+        Returns:
+            Regras compiladas
+        """
+        patterns = list(IGNORED_FOLDERS)
+        if fast_mode:
+            patterns.extend(FAST_MODE_IGNORED_FOLDERS)
+        if extra_patterns:
+            patterns.extend(extra_patterns)
+
+        rules_file = os.path.join(root, RULES_FILE_NAME)
+        if os.path.isfile(rules_file):
+            patterns.extend(load_rules_file(rules_file))
+
+        return cls(patterns, root, skip_paths)
+
+    @property
+    def signature(self) -> str:
+        """Identificador estável das regras (usado pelo índice incremental)."""
+        items = sorted(self.patterns) + sorted(self.skip_paths)
+        digest = hashlib.sha1("\0".join(items).encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    def is_ignored(self, name: str, path: str) -> bool:
+        """Indica se a pasta não deve ser percorrida.
+
+        Args:
+            name: Nome da pasta
+            path: Caminho completo da pasta
+
+        Returns:
+            True se a pasta deve ser ignorada
+        """
+        if path in self.skip_paths:
+            return True
+
+        name = name.lower()
+        rel_path = None
+        abs_path = path
+
+        if self._has_paths:
+            abs_path = path.replace("\\", "/").lower().lstrip("/")
+            rel_path = path[self._prefix_len :].replace("\\", "/").lower().lstrip("/")
+
+        if not self._ignore.matches(name, rel_path, abs_path):
+            return False
+        return not (self._negate and self._negate.matches(name, rel_path, abs_path))
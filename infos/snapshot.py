@@ -0,0 +1,517 @@
+"""Snapshots compactos de uma execução e diferença entre execuções.
+
+Cada execução pode gravar um snapshot com os arquivos acima do tamanho
+mínimo e todos os diretórios da árvore (caminho, tamanho e mtime),
+ordenado por caminho. Comparar o snapshot atual com o anterior responde
+"o que cresceu desde ontem" sem guardar nenhum dos dois em memória: a
+diferença é um merge-join dos dois arquivos ordenados, em O(n).
+
+Formato do arquivo (comprimido com gzip):
+    - ``MAGIC`` e um cabeçalho JSON (data, escopo da execução)
+    - Registros binários ordenados por ``(caminho, tipo)``, com
+      codificação frontal: cada caminho guarda só o que difere do
+      anterior, o que numa lista ordenada elimina quase todo o prefixo
+
+Classes:
+    SnapshotWriter: Grava um snapshot com ordenação externa
+
+Funções:
+    snapshot_meta(): Lê o cabeçalho de um snapshot
+    iter_snapshot(): Percorre os registros de um snapshot
+    latest_snapshot(): Snapshot mais recente de um mesmo escopo
+    prune_snapshots(): Apaga os snapshots mais antigos de um escopo
+    directory_hints(): Tamanho das maiores pastas de um snapshot
+    diff_snapshots(): Merge-join de dois snapshots
+    summarize_diff(): Totais e maiores variações de uma diferença
+"""
+
+import glob
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .tree import DirectoryTree
+
+
+DEFAULT_SNAPSHOT_DIR = "snapshots_escaneamento"
+# Snapshots mantidos por escopo; os mais antigos são apagados
+DEFAULT_SNAPSHOT_KEEP = 10
+SNAPSHOT_SUFFIX = ".dasnap"
+
+# Registros ordenados em memória por vez antes de ir para um arquivo temporário
+DEFAULT_CHUNK_RECORDS = 200_000
+
+# Pastas lidas de um snapshot para priorizar um escaneamento com prazo
+DEFAULT_HINT_DIRECTORIES = 100_000
+
+MAGIC = b"DASNAP1\n"
+
+# Tipos de registro; o valor também desempata um caminho que mudou de tipo
+FILE = 0
+DIRECTORY = 1
+KINDS = {FILE: "files", DIRECTORY: "directories"}
+
+# Situações de um caminho entre dois snapshots
+NEW = "new"
+DELETED = "deleted"
+GROWN = "grown"
+SHRUNK = "shrunk"
+STATUSES = (GROWN, NEW, SHRUNK, DELETED)
+
+# tipo, bytes do prefixo comum com o caminho anterior, bytes do restante,
+# tamanho, mtime
+_RECORD = struct.Struct("<BIIqd")
+_HEADER_LENGTH = struct.Struct("<I")
+_WRITE_BUFFER = 1 << 16
+SEP = os.sep.encode()
+
+# (caminho codificado, tipo, tamanho, mtime)
+_Entry = Tuple[bytes, int, int, float]
+
+# (tipo, situação, caminho codificado, tamanho antes, tamanho depois)
+Change = Tuple[int, str, bytes, int, int]
+
+
+def _shared_prefix(a: bytes, b: bytes) -> int:
+    """Tamanho do prefixo comum, por busca binária (comparações em C)."""
+    low, high = 0, min(len(a), len(b))
+    # Vizinhos na ordem costumam estar na mesma pasta: testa esse palpite
+    # antes, e a busca fica restrita ao nome do arquivo
+    guess = a.rfind(SEP) + 1
+    if 0 < guess <= high:
+        if a[:guess] == b[:guess]:
+            low = guess
+        else:
+            high = guess - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _encode(entries: Iterable[_Entry], out: BinaryIO, front: bool = True) -> int:
+    """Grava registros já ordenados, com codificação frontal se ``front``."""
+    buffer = bytearray()
+    previous = b""
+    count = 0
+    shared = 0
+    for path, kind, size, mtime in entries:
+        if front:
+            shared = _shared_prefix(previous, path)
+        suffix = path[shared:]
+        buffer += _RECORD.pack(kind, shared, len(suffix), size, mtime)
+        buffer += suffix
+        previous = path
+        count += 1
+        if len(buffer) >= _WRITE_BUFFER:
+            out.write(buffer)
+            buffer.clear()
+    out.write(buffer)
+    return count
+
+
+def _decode(source: BinaryIO) -> Iterator[_Entry]:
+    read = source.read
+    record_size = _RECORD.size
+    previous = b""
+    while True:
+        head = read(record_size)
+        if not head:
+            return
+        if len(head) < record_size:
+            raise ValueError("Snapshot truncado")
+        kind, shared, length, size, mtime = _RECORD.unpack(head)
+        path = previous[:shared] + read(length)
+        yield path, kind, size, mtime
+        previous = path
+
+
+def _unique(entries: Iterable[_Entry]) -> Iterator[_Entry]:
+    """Descarta registros repetidos (mesmo caminho e tipo) já vizinhos."""
+    last = None
+    for entry in entries:
+        key = entry[:2]
+        if key != last:
+            last = key
+            yield entry
+
+
+def _read_run(run_path: str) -> Iterator[_Entry]:
+    with open(run_path, "rb") as f:
+        yield from _decode(f)
+
+
+def snapshot_scope(
+    roots: Iterable[str],
+    min_size_bytes: float,
+    fast_mode: bool,
+    exclude: Iterable[str],
+    one_filesystem: bool,
+    rank_by: str,
+    file_filter: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Parâmetros que precisam coincidir para dois snapshots serem comparáveis."""
+    scope = {
+        "roots": sorted(roots),
+        "min_size_bytes": min_size_bytes,
+        "fast_mode": fast_mode,
+        "exclude": list(exclude),
+        "one_filesystem": one_filesystem,
+        "rank_by": rank_by,
+    }
+    # Só com filtro: sem ele, o escopo (e o hash) das execuções antigas não muda
+    filters = sorted(file_filter)
+    if filters:
+        scope["filter"] = filters
+    return scope
+
+
+def _scope_id(scope: Dict[str, Any]) -> str:
+    text = json.dumps(scope, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+
+
+def snapshot_path(directory: str, scope: Dict[str, Any]) -> str:
+    """Arquivo para um novo snapshot de ``scope`` dentro de ``directory``.
+
+    O nome começa pelo hash do escopo e termina com data e hora, de modo
+    que a ordem alfabética dos snapshots de um escopo é a cronológica.
+    """
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.join(directory, f"{_scope_id(scope)}_{stamp}{SNAPSHOT_SUFFIX}")
+
+
+def _scope_snapshots(directory: str, scope: Dict[str, Any]) -> List[str]:
+    """Snapshots de ``scope`` em ``directory``, do mais antigo ao mais novo."""
+    pattern = os.path.join(
+        glob.escape(directory), f"{_scope_id(scope)}_*{SNAPSHOT_SUFFIX}"
+    )
+    return sorted(glob.glob(pattern))
+
+
+def latest_snapshot(directory: str, scope: Dict[str, Any]) -> Optional[str]:
+    """Snapshot mais recente de ``scope`` em ``directory``, ou None."""
+    candidates = _scope_snapshots(directory, scope)
+    return candidates[-1] if candidates else None
+
+
+def prune_snapshots(directory: str, scope: Dict[str, Any], keep: int) -> List[str]:
+    """Apaga os snapshots de ``scope`` além dos ``keep`` mais recentes.
+
+    Snapshots de outros escopos não são tocados.
+
+    Args:
+        directory: Pasta dos snapshots
+        scope: Escopo da execução (ver ``snapshot_scope``)
+        keep: Quantos manter; 0 ou menos mantém todos
+
+    Returns:
+        Caminhos apagados
+    """
+    if keep <= 0:
+        return []
+    removed = []
+    for path in _scope_snapshots(directory, scope)[:-keep]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed.append(path)
+    return removed
+
+
+class SnapshotWriter:
+    """Grava um snapshot ordenado por caminho com memória limitada.
+
+    Os registros são acumulados em blocos de ``chunk_records``; cada bloco
+    cheio é ordenado e gravado num arquivo temporário, e ``close`` intercala
+    os blocos com ``heapq.merge`` direto no arquivo final, gravado em um
+    temporário e renomeado por cima.
+
+    ``add_file`` tem a assinatura esperada por ``scan_large_files(on_match=)``
+    e é segura para uso com várias threads.
+
+    Args:
+        path: Arquivo do snapshot (ver ``snapshot_path``)
+        scope: Escopo da execução (ver ``snapshot_scope``), gravado no
+            cabeçalho
+        chunk_records: Registros ordenados em memória por vez
+
+    Example:
+        >>> writer = SnapshotWriter('hoje.dasnap', scope)
+        >>> files = scan_large_files('/dados', 1.0, tree=tree, on_match=writer.add_file)
+        >>> writer.add_tree(tree)
+        >>> writer.close()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        scope: Dict[str, Any],
+        chunk_records: int = DEFAULT_CHUNK_RECORDS,
+    ) -> None:
+        self.path = path
+        self.meta = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "scope": scope,
+        }
+        self.chunk_records = chunk_records
+        self._by_allocated = scope.get("rank_by") == "allocated"
+        self._chunk = []  # type: List[_Entry]
+        self._runs = []  # type: List[str]
+        self._tmp = None  # type: Optional[str]
+        self._lock = threading.Lock()
+
+    def add_file(
+        self, size: int, path: str, mtime: float, allocated: Optional[int] = None
+    ) -> None:
+        """Registra um arquivo, medido como no ranking da execução."""
+        if self._by_allocated and allocated is not None:
+            size = allocated
+        self._add((os.fsencode(path), FILE, size, mtime))
+
+    def add_tree(self, tree: DirectoryTree) -> None:
+        """Registra todos os diretórios da árvore com o total da subárvore."""
+        batch = []
+        for path, size in tree.directories():
+            batch.append((os.fsencode(path), DIRECTORY, size, 0.0))
+            if len(batch) >= 1000:
+                self._extend(batch)
+                batch = []
+        self._extend(batch)
+
+    def _add(self, entry: _Entry) -> None:
+        with self._lock:
+            self._chunk.append(entry)
+            if len(self._chunk) >= self.chunk_records:
+                chunk, self._chunk = self._chunk, []
+                self._spill(chunk)
+
+    def _extend(self, entries: List[_Entry]) -> None:
+        with self._lock:
+            self._chunk.extend(entries)
+            if len(self._chunk) >= self.chunk_records:
+                chunk, self._chunk = self._chunk, []
+                self._spill(chunk)
+
+    def _spill(self, chunk: List[_Entry]) -> None:
+        if self._tmp is None:
+            self._tmp = tempfile.mkdtemp(prefix="disk_analyzer_snapshot_")
+        chunk.sort()
+        fd, run_path = tempfile.mkstemp(prefix="run_", dir=self._tmp)
+        with os.fdopen(fd, "wb") as f:
+            # Temporário: tamanho importa menos que o tempo de gravação
+            _encode(chunk, f, front=False)
+        self._runs.append(run_path)
+
+    def close(self) -> int:
+        """Ordena e grava o snapshot.
+
+        Returns:
+            Quantidade de registros gravados
+        """
+        with self._lock:
+            chunk, self._chunk = self._chunk, []
+            try:
+                if self._runs:
+                    self._spill(chunk)
+                    entries = heapq.merge(*(_read_run(run) for run in self._runs))
+                else:
+                    chunk.sort()
+                    entries = iter(chunk)
+
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                header = json.dumps(self.meta, ensure_ascii=False).encode(
+                    "utf-8", "surrogateescape"
+                )
+                with open(tmp_path, "wb") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                        f.write(MAGIC)
+                        f.write(_HEADER_LENGTH.pack(len(header)))
+                        f.write(header)
+                        count = _encode(_unique(entries), f)
+                os.replace(tmp_path, self.path)
+            finally:
+                self._cleanup()
+        return count
+
+    def discard(self) -> None:
+        """Descarta o snapshot sem gravar nada."""
+        with self._lock:
+            self._chunk = []
+            self._cleanup()
+
+    def _cleanup(self) -> None:
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+        self._runs = []
+
+
+def _open(path: str) -> Tuple[BinaryIO, Dict[str, Any]]:
+    f = gzip.open(path, "rb")
+    try:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Não é um snapshot do disk-analyzer: {path}")
+        (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+        meta = json.loads(f.read(length).decode("utf-8", "surrogateescape"))
+    except BaseException:
+        f.close()
+        raise
+    return f, meta
+
+
+def snapshot_meta(path: str) -> Dict[str, Any]:
+    """Lê o cabeçalho de um snapshot (data e escopo).
+
+    Raises:
+        ValueError: Se o arquivo não for um snapshot
+    """
+    f, meta = _open(path)
+    f.close()
+    return meta
+
+
+def iter_snapshot(path: str) -> Iterator[_Entry]:
+    """Percorre ``(caminho codificado, tipo, tamanho, mtime)`` em ordem.
+
+    Os caminhos vêm como bytes (``os.fsencode``), a mesma forma usada na
+    ordenação; use ``os.fsdecode`` para exibi-los.
+    """
+    f, _ = _open(path)
+    with f:
+        yield from _decode(f)
+
+
+def directory_hints(
+    path: str, limit: int = DEFAULT_HINT_DIRECTORIES
+) -> Dict[str, int]:
+    """Bytes da subárvore das ``limit`` maiores pastas de um snapshot.
+
+    Usado por ``ScanBudget`` para visitar primeiro as pastas que eram as
+    maiores na execução anterior. Só ``limit`` pastas ficam em memória.
+    """
+    heap = []  # type: List[Tuple[int, bytes]]
+    for entry_path, kind, size, _ in iter_snapshot(path):
+        if kind != DIRECTORY:
+            continue
+        item = (size, entry_path)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return {os.fsdecode(entry_path): size for size, entry_path in heap}
+
+
+def diff_snapshots(old_path: str, new_path: str) -> Iterator[Change]:
+    """Compara dois snapshots num único passo sobre os dois arquivos.
+
+    Os dois estão ordenados por ``(caminho, tipo)``, então basta avançar
+    o lado com a menor chave (merge-join): a memória não depende do
+    tamanho dos snapshots.
+
+    Arquivos que cruzaram o tamanho mínimo entre as execuções aparecem
+    como novos ou removidos, pois o snapshot só guarda os que estavam
+    acima dele.
+
+    Yields:
+        Tuplas ``(tipo, situação, caminho codificado, antes, depois)``
+        para cada caminho novo, removido, que cresceu ou que diminuiu,
+        na ordem dos caminhos
+    """
+    old = iter_snapshot(old_path)
+    new = iter_snapshot(new_path)
+    before = next(old, None)
+    after = next(new, None)
+
+    while before is not None or after is not None:
+        if after is None or (before is not None and before[:2] < after[:2]):
+            yield before[1], DELETED, before[0], before[2], 0
+            before = next(old, None)
+        elif before is None or after[:2] < before[:2]:
+            yield after[1], NEW, after[0], 0, after[2]
+            after = next(new, None)
+        else:
+            if after[2] != before[2]:
+                status = GROWN if after[2] > before[2] else SHRUNK
+                yield after[1], status, after[0], before[2], after[2]
+            before = next(old, None)
+            after = next(new, None)
+
+
+def summarize_diff(changes: Iterable[Change], limit: int = 50) -> Dict[str, Any]:
+    """Resume uma diferença: totais e as maiores variações de cada tipo.
+
+    Só ``limit`` entradas por tipo e situação ficam em memória (heap
+    limitado pelo valor absoluto da variação).
+
+    Args:
+        changes: Saída de ``diff_snapshots``
+        limit: Entradas mantidas por tipo e situação (padrão: 50)
+
+    Returns:
+        Dicionário com:
+        - totals: ``{'files'|'directories': {situação: {'count', ...}}}``;
+          só os arquivos trazem ``bytes`` com a soma das variações, pois o
+          total de uma pasta já inclui o das subpastas e somá-los contaria
+          o mesmo crescimento uma vez por nível
+        - files, directories: ``{situação: [entradas]}``, da maior para a
+          menor variação; cada entrada tem path, old_bytes, new_bytes,
+          delta_bytes e delta_gb
+    """
+    totals = {
+        name: {
+            status: {"count": 0, "bytes": 0} if kind == FILE else {"count": 0}
+            for status in STATUSES
+        }
+        for kind, name in KINDS.items()
+    }
+    heaps = {
+        (kind, status): [] for kind in KINDS for status in STATUSES
+    }  # type: Dict[Tuple[int, str], List[Tuple[int, bytes, int, int]]]
+
+    for kind, status, path, old_bytes, new_bytes in changes:
+        delta = new_bytes - old_bytes
+        total = totals[KINDS[kind]][status]
+        total["count"] += 1
+        if kind == FILE:
+            total["bytes"] += delta
+
+        heap = heaps[kind, status]
+        item = (abs(delta), path, old_bytes, new_bytes)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    summary = {"totals": totals}  # type: Dict[str, Any]
+    for kind, name in KINDS.items():
+        summary[name] = {
+            status: [
+                {
+                    "path": os.fsdecode(path),
+                    "old_bytes": old_bytes,
+                    "new_bytes": new_bytes,
+                    "delta_bytes": new_bytes - old_bytes,
+                    "delta_gb": (new_bytes - old_bytes) / (1024**3),
+                }
+                for _, path, old_bytes, new_bytes in sorted(
+                    heaps[kind, status], reverse=True
+                )
+            ]
+            for status in STATUSES
+        }
+    return summary
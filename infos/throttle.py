@@ -0,0 +1,280 @@
+"""Modo de baixa prioridade para hosts de produção.
+
+Este módulo limita o impacto do escaneamento em servidores ocupados:
+baixa a prioridade de I/O e de CPU do processo, limita pastas e
+chamadas stat por segundo com um token bucket e pausa a travessia
+enquanto a carga do sistema ou a ocupação dos discos estiver acima de
+um limite.
+
+Classes:
+    RateLimiter: Token bucket seguro para várias threads
+    Throttle: Limites e pausas aplicados pelo escaneamento
+
+Funções:
+    set_idle_priority(): Coloca o processo em prioridade ociosa
+    disk_names(): Nomes em ``psutil.disk_io_counters`` dos dispositivos
+
+O ``psutil`` só é importado quando algum limite é de fato aplicado.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre duas leituras de carga/ocupação dos discos
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def set_idle_priority() -> List[str]:
+    """Coloca o processo em prioridade ociosa de I/O e de CPU.
+
+    No Linux a classe de I/O vale por thread e é herdada pelas threads
+    criadas depois, então chame antes de iniciar o escaneamento.
+
+    Returns:
+        Descrição do que foi aplicado (vazia se nada for suportado)
+    """
+    import psutil
+
+    applied = []
+    process = psutil.Process()
+
+    try:
+        if hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+            process.ionice(psutil.IOPRIO_CLASS_IDLE)  # Linux
+            applied.append("I/O idle")
+        elif hasattr(psutil, "IOPRIO_VERYLOW"):
+            process.ionice(psutil.IOPRIO_VERYLOW)  # Windows
+            applied.append("I/O muito baixa")
+    except (psutil.Error, OSError) as e:
+        logger.warning(f"Não foi possível baixar a prioridade de I/O: {e}")
+
+    try:
+        if hasattr(psutil, "IDLE_PRIORITY_CLASS"):
+            process.nice(psutil.IDLE_PRIORITY_CLASS)  # Windows
+        else:
+            process.nice(19)
+        applied.append("CPU ociosa")
+    except (psutil.Error, OSError) as e:
+        logger.warning(f"Não foi possível baixar a prioridade de CPU: {e}")
+
+    return applied
+
+
+def disk_names(devices: Iterable[str]) -> List[str]:
+    """Converte dispositivos (``/dev/sda1``) nos nomes de ``disk_io_counters``.
+
+    Links como ``/dev/mapper/vg-dados`` são resolvidos (``dm-0``).
+    Dispositivos sem contadores são omitidos.
+    """
+    import psutil
+
+    try:
+        known = psutil.disk_io_counters(perdisk=True) or {}
+    except (RuntimeError, OSError):
+        return []
+    names = []
+    for device in devices:
+        name = os.path.basename(os.path.realpath(device))
+        if name in known and name not in names:
+            names.append(name)
+    return names
+
+
+class RateLimiter:
+    """Token bucket seguro para várias threads.
+
+    Cada ``acquire`` consome fichas; sem fichas suficientes a thread
+    dorme até pagar a dívida. Aceitar dívida permite cobrar um lote de
+    uma vez (ex: as chamadas stat de uma pasta inteira) mantendo a taxa
+    média.
+
+    Args:
+        rate: Fichas repostas por segundo
+        burst: Máximo de fichas acumuladas (padrão: um segundo de taxa)
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"Taxa inválida: {rate}")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Consome ``amount`` fichas, dormindo se necessário.
+
+        Returns:
+            Segundos dormidos
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Throttle:
+    """Limites de ritmo e pausas por carga aplicados pelo escaneamento.
+
+    Passe como ``throttle=`` para ``scan_large_files`` (ou ``run_scan``,
+    que compartilha o mesmo objeto entre todos os discos, então os limites
+    valem para o processo inteiro).
+
+    Args:
+        dirs_per_second: Máximo de pastas listadas por segundo
+        stats_per_second: Máximo de chamadas stat por segundo, contando
+            uma por arquivo listado; cobradas por pasta, depois da listagem
+        max_load: Pausa enquanto a carga média de 1 minuto por CPU
+            (``getloadavg()[0] / cpus``) passar deste valor
+        max_disk_busy: Pausa enquanto algum dos discos monitorados passar
+            desta ocupação (%); só onde ``psutil`` informa ``busy_time``
+            (Linux, FreeBSD)
+        disks: Nomes dos discos monitorados (ver ``disk_names``); vazio
+            monitora todos
+        check_interval: Segundos entre leituras de carga/ocupação
+
+    Attributes:
+        throttled_seconds: Tempo somado que as threads esperaram pelos
+            limites de ritmo
+        paused_seconds: Tempo total das pausas por carga
+        pauses: Quantidade de pausas por carga
+    """
+
+    def __init__(
+        self,
+        dirs_per_second: Optional[float] = None,
+        stats_per_second: Optional[float] = None,
+        max_load: Optional[float] = None,
+        max_disk_busy: Optional[float] = None,
+        disks: Optional[Iterable[str]] = None,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+    ) -> None:
+        self.dirs = RateLimiter(dirs_per_second) if dirs_per_second else None
+        self.stats = RateLimiter(stats_per_second) if stats_per_second else None
+        self.max_load = max_load
+        self.max_disk_busy = max_disk_busy
+        self.disks = list(disks or [])
+        self.check_interval = check_interval
+        self.throttled_seconds = 0.0
+        self.paused_seconds = 0.0
+        self.pauses = 0
+        self._cpus = os.cpu_count() or 1
+        self._guard_lock = threading.Lock()
+        self._totals_lock = threading.Lock()
+        self._next_check = 0.0
+        self._last_io = None  # type: Optional[Any]
+
+        if max_disk_busy is not None and not self._has_busy_time():
+            logger.warning(
+                "Ocupação dos discos indisponível neste sistema: "
+                "--max-disk-busy ignorado"
+            )
+            self.max_disk_busy = None
+
+    def before_directory(self) -> None:
+        """Chamado antes de listar cada pasta: pausa e limite de pastas/s."""
+        if self.max_load is not None or self.max_disk_busy is not None:
+            if time.monotonic() >= self._next_check:
+                self._wait_for_idle_system()
+        if self.dirs is not None:
+            self._add_throttled(self.dirs.acquire())
+
+    def after_directory(self, stat_calls: int) -> None:
+        """Chamado depois de listar cada pasta: cobra as chamadas stat."""
+        if self.stats is not None and stat_calls:
+            self._add_throttled(self.stats.acquire(stat_calls))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumo do tempo perdido com limites e pausas."""
+        return {
+            "throttled_seconds": self.throttled_seconds,
+            "paused_seconds": self.paused_seconds,
+            "pauses": self.pauses,
+        }
+
+    def _add_throttled(self, seconds: float) -> None:
+        if seconds:
+            with self._totals_lock:
+                self.throttled_seconds += seconds
+
+    def _wait_for_idle_system(self) -> None:
+        # Uma thread mede; as outras chegam depois e esperam no lock, de
+        # modo que uma pausa vale para todas
+        with self._guard_lock:
+            if time.monotonic() < self._next_check:
+                return
+            pause_start = None
+            reason = self._overload()
+            while reason is not None:
+                if pause_start is None:
+                    pause_start = time.monotonic()
+                    self.pauses += 1
+                    logger.info(f"Escaneamento pausado: {reason}")
+                time.sleep(self.check_interval)
+                reason = self._overload()
+            if pause_start is not None:
+                paused = time.monotonic() - pause_start
+                self.paused_seconds += paused
+                logger.info(f"Escaneamento retomado após {paused:.1f}s")
+            self._next_check = time.monotonic() + self.check_interval
+
+    def _overload(self) -> Optional[str]:
+        """Retorna o motivo para pausar, ou None se o sistema estiver livre."""
+        import psutil
+
+        if self.max_load is not None:
+            load = psutil.getloadavg()[0] / self._cpus
+            if load > self.max_load:
+                return f"carga {load:.2f} por CPU > {self.max_load}"
+
+        if self.max_disk_busy is not None:
+            busy = self._disk_busy()
+            if busy is not None and busy > self.max_disk_busy:
+                return f"disco {busy:.0f}% ocupado > {self.max_disk_busy:.0f}%"
+        return None
+
+    def _disk_busy(self) -> Optional[float]:
+        """Maior ocupação (%) dos discos monitorados desde a última leitura."""
+        import psutil
+
+        now = time.monotonic()
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        last, self._last_io = self._last_io, (now, counters)
+        if last is None:
+            return None
+
+        elapsed_ms = (now - last[0]) * 1000
+        if elapsed_ms <= 0:
+            return None
+        names = self.disks or list(counters)
+        busy = [
+            (counters[name].busy_time - last[1][name].busy_time) / elapsed_ms * 100
+            for name in names
+            if name in counters and name in last[1]
+        ]
+        return max(busy) if busy else None
+
+    @staticmethod
+    def _has_busy_time() -> bool:
+        import psutil
+
+        try:
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+        except (RuntimeError, OSError):
+            return False
+        return any(hasattr(c, "busy_time") for c in counters.values())
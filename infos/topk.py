@@ -0,0 +1,151 @@
+"""Coletor dos N maiores arquivos.
+
+Este módulo mantém os maiores arquivos de um escaneamento em um heap
+mínimo limitado, sem acumular todas as ocorrências para ordenar no fim.
+
+Classes:
+    TopFiles: Heap mínimo limitado com limiar de tamanho dinâmico
+
+Funções:
+    file_info(): Monta o registro de resultado de um arquivo
+    merge_top_files(): Intercala listas já ordenadas (k-way merge)
+"""
+
+import heapq
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .records import FileRecord
+
+
+# Critério de ordenação -> campo do dicionário de resultado
+RANK_FIELDS = {"apparent": "size_bytes", "allocated": "allocated_bytes"}
+
+
+def file_info(
+    size: int, path: str, mtime: float, allocated: Optional[int] = None
+) -> FileRecord:
+    """Monta o registro de resultado de um arquivo.
+
+    ``allocated`` é o espaço ocupado em disco; quando desconhecido,
+    assume-se o tamanho aparente. O registro se comporta como um
+    dicionário somente leitura (ver ``FileRecord``).
+    """
+    return FileRecord(size, path, mtime, allocated)
+
+
+class TopFiles:
+    """Mantém os ``max_files`` maiores arquivos vistos até o momento.
+
+    Os candidatos ficam em um heap mínimo de tuplas ``(chave, caminho,
+    mtime, tamanho, alocado)``, em que a chave é o tamanho aparente ou o
+    espaço alocado conforme ``rank_by``: inserções custam O(log K) e a
+    memória nunca passa de K entradas. Quando o heap enche, ``threshold``
+    sobe para a menor chave retida, de modo que a travessia pode descartar
+    arquivos menores antes de montar qualquer estrutura para eles.
+
+    Args:
+        max_files: Quantidade máxima de arquivos retidos
+        min_size_bytes: Tamanho mínimo inicial em bytes
+        rank_by: 'apparent' (``st_size``) ou 'allocated'
+            (``st_blocks * 512``) (padrão: 'apparent')
+
+    Example:
+        >>> top = TopFiles(2, 0)
+        >>> for size in (10, 30, 20):
+        ...     top.offer(size, f"/f{size}", 0.0)
+        >>> [f["size_bytes"] for f in top.results()]
+        [30, 20]
+    """
+
+    __slots__ = ("max_files", "threshold", "rank_by", "_by_allocated", "_heap")
+
+    def __init__(
+        self, max_files: int, min_size_bytes: float = 0, rank_by: str = "apparent"
+    ) -> None:
+        if rank_by not in RANK_FIELDS:
+            raise ValueError(f"Critério de ordenação inválido: {rank_by}")
+        self.max_files = max_files
+        self.threshold = min_size_bytes
+        self.rank_by = rank_by
+        self._by_allocated = rank_by == "allocated"
+        self._heap = []  # type: List[Tuple[int, str, float, int, int]]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def offer(
+        self, size: int, path: str, mtime: float, allocated: Optional[int] = None
+    ) -> bool:
+        """Oferece um arquivo ao coletor.
+
+        Args:
+            size: Tamanho aparente em bytes
+            path: Caminho completo
+            mtime: Data de modificação (timestamp)
+            allocated: Bytes alocados em disco (padrão: igual a ``size``)
+
+        Returns:
+            True se o arquivo entrou no heap
+        """
+        if allocated is None:
+            allocated = size
+        key = allocated if self._by_allocated else size
+        if key < self.threshold or self.max_files <= 0:
+            return False
+
+        heap = self._heap
+        if len(heap) < self.max_files:
+            heapq.heappush(heap, (key, path, mtime, size, allocated))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, path, mtime, size, allocated))
+        else:
+            return False
+
+        if len(heap) == self.max_files:
+            # Heap cheio: só entra quem superar o menor retido
+            self.threshold = max(self.threshold, heap[0][0] + 1)
+        return True
+
+    def update(self, other: "TopFiles") -> None:
+        """Incorpora os candidatos de outro coletor."""
+        for _, path, mtime, size, allocated in other._heap:
+            self.offer(size, path, mtime, allocated)
+
+    def entries(self) -> List[Tuple[int, str, float, int, int]]:
+        """Retorna as tuplas ``(chave, caminho, mtime, tamanho, alocado)``
+        da maior para a menor chave."""
+        return sorted(self._heap, reverse=True)
+
+    def results(self) -> List[FileRecord]:
+        """Retorna os arquivos retidos, do maior para o menor.
+
+        Os registros de resultado só são montados aqui, para no máximo
+        ``max_files`` arquivos.
+        """
+        return [
+            file_info(size, path, mtime, allocated)
+            for _, path, mtime, size, allocated in self.entries()
+        ]
+
+
+def merge_top_files(
+    sorted_lists: Iterable[List[Dict[str, Any]]], limit: int, rank_by: str = "apparent"
+) -> List[Dict[str, Any]]:
+    """Intercala listas já ordenadas por tamanho e mantém as ``limit`` maiores.
+
+    Cada lista (uma por disco) já vem ordenada de forma decrescente, então
+    um k-way merge com ``heapq.merge`` evita reordenar o conjunto inteiro.
+
+    Args:
+        sorted_lists: Listas ordenadas de forma decrescente pelo campo
+            de ``rank_by``
+        limit: Quantidade máxima de arquivos no resultado
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent')
+
+    Returns:
+        Lista combinada, ordenada e limitada
+    """
+    field = RANK_FIELDS[rank_by]
+    merged = heapq.merge(*sorted_lists, key=lambda x: x[field], reverse=True)
+    return list(islice(merged, limit))
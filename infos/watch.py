@@ -0,0 +1,1024 @@
+"""Índice vivo mantido por um daemon de monitoramento.
+
+Mesmo o escaneamento incremental precisa de um stat por pasta a cada
+execução. Em hosts que mudam o tempo todo, este módulo faz um único
+escaneamento inicial e depois mantém o retrato atualizado a partir dos
+eventos do sistema de arquivos:
+
+    - No Linux, cada pasta indexada ganha um watch do inotify; um evento
+      marca a pasta como suja e, passado o intervalo de debounce sem
+      novos eventos (ou o atraso máximo, para escritas contínuas), cada
+      pasta suja é listada de novo uma única vez com ``_scan_directory``
+    - Sem inotify, ou para as pastas que não couberem no limite de
+      watches do sistema, as pastas são verificadas por polling do mtime
+      (e do tamanho dos seus maiores arquivos)
+    - Em memória ficam, por pasta, os bytes próprios e da subárvore, as
+      subpastas e os maiores arquivos; o mesmo estado é gravado no índice
+      SQLite (``ScanIndex``), de modo que o próximo início só relista as
+      pastas alteradas
+
+Consultas (maiores arquivos, maiores pastas, tamanho sob um caminho)
+são respondidas da memória, em milissegundos, inclusive por um socket
+Unix (``serve_queries`` / ``query``).
+
+Classes:
+    LiveIndex: Tamanhos por pasta e maiores arquivos, em memória
+    WatchDaemon: Escaneamento inicial e atualização por eventos
+
+Funções:
+    serve_queries(): Atende consultas ao daemon por um socket Unix
+    query(): Envia uma consulta a um daemon em execução
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import heapq
+import json
+import logging
+import os
+import select
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .index import ScanIndex
+from .inodes import allocated_bytes
+from .main import _run_directory_queue, _scan_directory, _scan_rules
+from .records import FileRecord
+from .rules import IgnoreRules
+from .topk import file_info
+from .watch_defaults import (
+    DEFAULT_DEBOUNCE,
+    DEFAULT_MAX_DELAY,
+    DEFAULT_MEMORY_MB,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SOCKET,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Consultas aceitas por WatchDaemon.query
+QUERIES = ("top-files", "top-dirs", "size", "status")
+
+# Custo aproximado em memória de uma pasta (objeto, entradas nos dicts
+# de pastas e de watches, tupla de subpastas) e de um arquivo retido,
+# sem contar o texto do caminho
+_DIRECTORY_BYTES = 400
+_FILE_BYTES = 250
+
+# (chave, caminho, mtime, tamanho, alocado), como em TopFiles.entries()
+_Entry = Tuple[int, str, float, int, int]
+
+# Constantes de <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_EXCL_UNLINK = 0x04000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+    | _IN_DONT_FOLLOW
+    | _IN_EXCL_UNLINK
+)
+_EVENT = struct.Struct("iIII")
+
+
+class _Directory:
+    """Estado em memória de uma pasta indexada."""
+
+    __slots__ = (
+        "parent",
+        "own",
+        "subtree",
+        "children",
+        "entries",
+        "mtime_ns",
+        "inode",
+    )
+
+    def __init__(
+        self,
+        parent: Optional[str],
+        own: int,
+        children: Tuple[str, ...],
+        entries: List[_Entry],
+        mtime_ns: int,
+        inode: int,
+    ) -> None:
+        self.parent = parent
+        self.own = own
+        self.subtree = own
+        self.children = children
+        self.entries = entries
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+
+
+class LiveIndex:
+    """Tamanhos por pasta e maiores arquivos, atualizáveis pasta a pasta.
+
+    Cada pasta guarda os bytes dos arquivos diretamente nela e da sua
+    subárvore; uma mudança nos bytes próprios é somada a todos os
+    ancestrais (custo proporcional à profundidade), de modo que o tamanho
+    sob qualquer pasta indexada sai em O(1). Os maiores arquivos de cada
+    pasta ficam também num dicionário global para o top-N.
+
+    A memória é limitada por ``memory_mb``: passado o limite, pastas novas
+    deixam de ser indexadas (``skipped``) e as consultas passam a ser
+    parciais.
+
+    Args:
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent')
+        memory_mb: Memória estimada máxima do índice (padrão: 512)
+
+    Attributes:
+        skipped: Pastas não indexadas por falta de memória
+    """
+
+    def __init__(
+        self, rank_by: str = "apparent", memory_mb: float = DEFAULT_MEMORY_MB
+    ) -> None:
+        self.rank_by = rank_by
+        self.memory_limit = int(memory_mb * 1024**2)
+        self.memory = 0
+        self.skipped = 0
+        self._dirs = {}  # type: Dict[str, _Directory]
+        self._files = {}  # type: Dict[str, _Entry]
+        self._lock = threading.Lock()
+        # Resultado de top_directories, válido até a próxima mudança
+        self._top_dirs = None  # type: Optional[List[Tuple[int, str]]]
+
+    def __len__(self) -> int:
+        return len(self._dirs)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._dirs
+
+    def state(self, path: str) -> Optional[Tuple[int, int, List[_Entry]]]:
+        """``(mtime_ns, inode, maiores arquivos)`` de uma pasta, ou None."""
+        with self._lock:
+            node = self._dirs.get(path)
+            if node is None:
+                return None
+            return node.mtime_ns, node.inode, list(node.entries)
+
+    def paths(self) -> List[str]:
+        """Pastas indexadas, em ordem (pais antes dos filhos)."""
+        with self._lock:
+            return sorted(self._dirs)
+
+    def add(
+        self,
+        path: str,
+        parent: Optional[str],
+        own: int,
+        children: Sequence[str],
+        entries: List[_Entry],
+        mtime_ns: int,
+        inode: int,
+    ) -> bool:
+        """Indexa uma pasta nova (o pai, se houver, já deve estar indexado).
+
+        Returns:
+            False se a pasta não coube no limite de memória
+        """
+        cost = (
+            _DIRECTORY_BYTES
+            + len(path)
+            + sum(_FILE_BYTES + len(entry[1]) for entry in entries)
+        )
+        with self._lock:
+            if path in self._dirs:
+                return True
+            if self.memory + cost > self.memory_limit:
+                self.skipped += 1
+                return False
+            if parent is not None and parent not in self._dirs:
+                return False
+            self.memory += cost
+            self._dirs[path] = _Directory(
+                parent, own, tuple(children), entries, mtime_ns, inode
+            )
+            self._files.update((entry[1], entry) for entry in entries)
+            self._add_to_ancestors(parent, own)
+            self._top_dirs = None
+        return True
+
+    def update(
+        self,
+        path: str,
+        own: int,
+        children: Sequence[str],
+        entries: List[_Entry],
+        mtime_ns: int,
+        inode: int,
+    ) -> Tuple[List[str], List[str]]:
+        """Substitui a listagem de uma pasta já indexada.
+
+        Returns:
+            Subpastas novas e subpastas que sumiram (as que sumiram ainda
+            estão indexadas: remova-as com ``remove``)
+        """
+        with self._lock:
+            node = self._dirs.get(path)
+            if node is None:
+                return [], []
+            old_children = set(node.children)
+            new_children = set(children)
+
+            for entry in node.entries:
+                self._files.pop(entry[1], None)
+            self._files.update((entry[1], entry) for entry in entries)
+            self.memory += sum(len(entry[1]) for entry in entries) - sum(
+                len(entry[1]) for entry in node.entries
+            )
+            self.memory += _FILE_BYTES * (len(entries) - len(node.entries))
+
+            delta = own - node.own
+            node.own = own
+            node.subtree += delta
+            self._add_to_ancestors(node.parent, delta)
+            node.children = tuple(children)
+            node.entries = entries
+            node.mtime_ns = mtime_ns
+            node.inode = inode
+            self._top_dirs = None
+
+        added = [child for child in children if child not in old_children]
+        removed = [child for child in old_children if child not in new_children]
+        return added, removed
+
+    def remove(self, path: str) -> List[str]:
+        """Remove uma pasta e toda a sua subárvore.
+
+        Returns:
+            Caminhos removidos
+        """
+        removed = []
+        with self._lock:
+            node = self._dirs.get(path)
+            if node is None:
+                return removed
+            self._add_to_ancestors(node.parent, -node.subtree)
+            if node.parent in self._dirs:
+                parent = self._dirs[node.parent]
+                parent.children = tuple(c for c in parent.children if c != path)
+
+            stack = [path]
+            while stack:
+                current = stack.pop()
+                node = self._dirs.pop(current, None)
+                if node is None:
+                    continue
+                removed.append(current)
+                self.memory -= _DIRECTORY_BYTES + len(current)
+                for entry in node.entries:
+                    self._files.pop(entry[1], None)
+                    self.memory -= _FILE_BYTES + len(entry[1])
+                stack.extend(node.children)
+            self._top_dirs = None
+        return removed
+
+    def top_files(self, count: int) -> List[FileRecord]:
+        """Os ``count`` maiores arquivos indexados, do maior para o menor."""
+        with self._lock:
+            largest = heapq.nlargest(count, self._files.values())
+        return [
+            file_info(size, path, mtime, allocated)
+            for _, path, mtime, size, allocated in largest
+        ]
+
+    def top_directories(self, count: int) -> List[Dict[str, Any]]:
+        """As ``count`` pastas mais pesadas, no formato de
+        ``DirectoryTree.top_directories``.
+
+        O ranking completo é calculado uma vez e reaproveitado até a
+        próxima mudança no índice.
+        """
+        with self._lock:
+            ranking = self._top_dirs
+            if ranking is None or len(ranking) < min(count, len(self._dirs)):
+                ranking = heapq.nlargest(
+                    max(count, 100),
+                    ((node.subtree, path) for path, node in self._dirs.items()),
+                )
+                self._top_dirs = ranking
+            own = {path: self._dirs[path].own for _, path in ranking[:count]}
+        return [
+            {
+                "path": path,
+                "size_gb": size / (1024**3),
+                "size_bytes": size,
+                "own_bytes": own[path],
+            }
+            for size, path in ranking[:count]
+        ]
+
+    def size_under(self, path: str) -> Optional[Dict[str, Any]]:
+        """Tamanho indexado sob uma pasta (ou de um arquivo retido).
+
+        Returns:
+            Dicionário com path, size_bytes, size_gb e own_bytes, ou None
+            se o caminho não estiver no índice
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            node = self._dirs.get(path)
+            if node is not None:
+                size, own = node.subtree, node.own
+            elif path in self._files:
+                size = own = self._files[path][0]
+            else:
+                return None
+        return {
+            "path": path,
+            "size_gb": size / (1024**3),
+            "size_bytes": size,
+            "own_bytes": own,
+        }
+
+    def counts(self) -> Tuple[int, int]:
+        """Quantidade de pastas e de arquivos retidos."""
+        with self._lock:
+            return len(self._dirs), len(self._files)
+
+    def _add_to_ancestors(self, parent: Optional[str], delta: int) -> None:
+        if not delta:
+            return
+        dirs = self._dirs
+        while parent is not None:
+            node = dirs.get(parent)
+            if node is None:
+                return
+            node.subtree += delta
+            parent = node.parent
+
+
+class _Inotify:
+    """Acesso mínimo ao inotify do Linux via ctypes (sem dependências)."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def add(self, path: str) -> int:
+        """Adiciona (ou renova) o watch de uma pasta e retorna o descritor."""
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+
+    def read(self, timeout: float) -> List[Tuple[int, int]]:
+        """Espera até ``timeout`` segundos e retorna ``(wd, máscara)`` lidos."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, name_len = _EVENT.unpack_from(data, offset)
+            events.append((wd, mask))
+            offset += _EVENT.size + name_len
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Root(NamedTuple):
+    """Regras de travessia de uma raiz monitorada."""
+
+    rules: IgnoreRules
+    device: Optional[int]
+    signature: str
+
+
+class WatchDaemon:
+    """Escaneamento inicial seguido de atualização contínua por eventos.
+
+    Uso típico: ``start()`` faz o escaneamento inicial (reaproveitando o
+    índice SQLite, se houver) e liga os watches; ``run()`` aplica os
+    eventos até ``close()`` (ou o evento ``stop``); as consultas podem
+    ser feitas de qualquer thread enquanto isso.
+
+    Args:
+        roots: Pastas monitoradas (normalmente pontos de montagem)
+        min_size_gb: Tamanho mínimo dos arquivos retidos (padrão: 0.1)
+        max_files: Maiores arquivos retidos por pasta e tamanho padrão das
+            consultas (padrão: 100)
+        fast_mode: Ignora as pastas do modo rápido (padrão: False)
+        exclude: Padrões de exclusão extras (ver ``IgnoreRules``)
+        one_filesystem: Não atravessa outros pontos de montagem
+        rank_by: 'apparent' ou 'allocated' (padrão: 'apparent')
+        index: Índice SQLite mantido atualizado junto com a memória
+            (padrão: None, só memória)
+        workers: Threads dos escaneamentos de subárvores (padrão: 1)
+        debounce: Segundos sem eventos antes de aplicar uma rajada
+            (padrão: 2)
+        max_delay: Atraso máximo de uma pasta suja sob eventos contínuos
+            (padrão: 30)
+        poll_interval: Segundos entre verificações por polling das pastas
+            sem watch (padrão: 60)
+        memory_mb: Memória estimada máxima do índice (padrão: 512)
+        use_inotify: Se False, usa só polling (padrão: True)
+
+    Attributes:
+        live: Índice em memória consultado
+        mode: 'inotify' ou 'polling'
+        updates: Pastas listadas de novo desde o escaneamento inicial
+
+    Example:
+        >>> daemon = WatchDaemon(['/dados'], min_size_gb=1.0)
+        >>> daemon.start()
+        >>> threading.Thread(target=daemon.run, daemon=True).start()
+        >>> daemon.query({'query': 'size', 'path': '/dados/logs'})
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        min_size_gb: float = 0.1,
+        max_files: int = 100,
+        fast_mode: bool = False,
+        exclude: Optional[Sequence[str]] = None,
+        one_filesystem: bool = False,
+        rank_by: str = "apparent",
+        index: Optional[ScanIndex] = None,
+        workers: int = 1,
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        memory_mb: float = DEFAULT_MEMORY_MB,
+        use_inotify: bool = True,
+    ) -> None:
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.min_size_bytes = min_size_gb * (1024**3)
+        self.max_files = max_files
+        self.fast_mode = fast_mode
+        self.exclude = exclude
+        self.one_filesystem = one_filesystem
+        self.rank_by = rank_by
+        self.index = index
+        self.workers = max(1, workers)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.live = LiveIndex(rank_by, memory_mb)
+        self.mode = "polling"
+        self.updates = 0
+        self.watch_limit_reached = False
+        self.started_at = None  # type: Optional[float]
+        self.last_update = None  # type: Optional[float]
+
+        self._roots = {}  # type: Dict[str, _Root]
+        self._inotify = None  # type: Optional[_Inotify]
+        self._use_inotify = use_inotify
+        self._watches = {}  # type: Dict[str, int]
+        self._paths_by_wd = {}  # type: Dict[int, str]
+        self._polled = set()  # type: set
+        self._cond = threading.Condition()
+        self._dirty = set()  # type: set
+        self._first_event = None  # type: Optional[float]
+        self._last_event = 0.0
+        self._resync = False
+        self._memory_logged = False
+        self._stop = threading.Event()
+        self._reader = None  # type: Optional[threading.Thread]
+
+    # Ciclo de vida
+
+    def start(self) -> None:
+        """Faz o escaneamento inicial e liga a detecção de mudanças."""
+        if self._use_inotify and _Inotify.available():
+            try:
+                self._inotify = _Inotify()
+                self.mode = "inotify"
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify indisponível ({e}): usando polling")
+
+        start = time.monotonic()
+        for root in self.roots:
+            rules, device, signature = _scan_rules(
+                root, self.fast_mode, self.exclude, self.one_filesystem, self.rank_by
+            )
+            self._roots[root] = _Root(rules, device, signature)
+            reuse = self.index is not None and self.index.begin(
+                root, self.min_size_bytes, self.max_files, signature
+            )
+            self._walk([root], reuse)
+            if self.index is not None and not self.live.skipped:
+                self.index.finish(root, self.min_size_bytes, self.max_files, signature)
+
+        directories, files = self.live.counts()
+        cached = self.index.cache_hits if self.index is not None else 0
+        logger.info(
+            f"Índice inicial: {directories} pasta(s), {files} arquivo(s) grande(s) "
+            f"em {time.monotonic() - start:.1f}s ({cached} pasta(s) do índice "
+            f"em disco); modo {self.mode}"
+        )
+        self.started_at = time.time()
+
+        if self._inotify is not None:
+            self._reader = threading.Thread(
+                target=self._read_events, name="watch-inotify", daemon=True
+            )
+            self._reader.start()
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Aplica eventos e polling até ``close()`` ou até ``stop`` ser ligado."""
+        next_poll = time.monotonic() + self.poll_interval
+        while not self._stop.is_set() and not (stop is not None and stop.is_set()):
+            now = time.monotonic()
+            if now >= next_poll:
+                self._poll()
+                next_poll = time.monotonic() + self.poll_interval
+
+            with self._cond:
+                batch, resync = self._take_batch(now)
+                if not batch and not resync:
+                    wait = min(next_poll - now, 1.0)
+                    if self._dirty:
+                        due = min(
+                            self._last_event + self.debounce,
+                            self._first_event + self.max_delay,
+                        )
+                        wait = min(wait, due - now)
+                    self._cond.wait(max(wait, 0.01))
+                    continue
+
+            start = time.monotonic()
+            if resync:
+                logger.warning(
+                    "Fila de eventos do inotify transbordou: verificando todas as pastas"
+                )
+                batch = self.live.paths()
+            for path in batch:
+                self._refresh(path)
+            if self.index is not None:
+                self.index.flush()
+            self.last_update = time.time()
+            logger.info(
+                f"{len(batch)} pasta(s) atualizada(s) em "
+                f"{time.monotonic() - start:.2f}s"
+            )
+
+    def close(self) -> None:
+        """Para ``run``, desliga os watches e grava o índice."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._reader is not None:
+            self._reader.join()
+            self._reader = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if self.index is not None:
+            self.index.flush()
+
+    # Consultas
+
+    def query(self, request: Dict[str, Any]) -> Any:
+        """Responde uma consulta.
+
+        Args:
+            request: ``{'query': tipo, ...}``, com tipo em ``QUERIES``:
+                - 'top-files' / 'top-dirs': opcional ``count``
+                  (padrão: ``max_files``)
+                - 'size': ``path``
+                - 'status': sem parâmetros
+
+        Returns:
+            Valor serializável em JSON
+
+        Raises:
+            ValueError: Consulta desconhecida ou parâmetros inválidos
+        """
+        kind = request.get("query")
+        if kind == "top-files":
+            count = int(request.get("count", self.max_files))
+            return [record.to_dict() for record in self.live.top_files(count)]
+        if kind == "top-dirs":
+            return self.live.top_directories(int(request.get("count", self.max_files)))
+        if kind == "size":
+            if not request.get("path"):
+                raise ValueError("A consulta 'size' exige 'path'")
+            return self.live.size_under(request["path"])
+        if kind == "status":
+            return self.status()
+        raise ValueError(f"Consulta desconhecida: {kind}")
+
+    def status(self) -> Dict[str, Any]:
+        """Resumo do estado do daemon."""
+        directories, files = self.live.counts()
+        with self._cond:
+            watches = len(self._watches)
+            polled = len(self._polled)
+            pending = len(self._dirty)
+        return {
+            "roots": self.roots,
+            "mode": self.mode,
+            "directories": directories,
+            "large_files": files,
+            "watches": watches,
+            "polled_directories": polled,
+            "watch_limit_reached": self.watch_limit_reached,
+            "pending_directories": pending,
+            "updates": self.updates,
+            "memory_bytes_estimate": self.live.memory,
+            "memory_limit_bytes": self.live.memory_limit,
+            "skipped_directories": self.live.skipped,
+            "complete": not self.live.skipped,
+            "started_at": self.started_at,
+            "last_update": self.last_update,
+        }
+
+    # Travessia
+
+    def _root_for(self, path: str) -> Tuple[str, _Root]:
+        best = ""
+        for root in self._roots:
+            prefix = root if root.endswith(os.sep) else root + os.sep
+            if (path == root or path.startswith(prefix)) and len(root) > len(best):
+                best = root
+        return best, self._roots[best]
+
+    def _list(
+        self, path: str, reuse: bool
+    ) -> Tuple[int, List[str], List[_Entry], os.stat_result]:
+        """Lista uma pasta (ou a serve do índice em disco, se inalterada).
+
+        Returns:
+            Bytes próprios, subpastas, maiores arquivos e o stat da pasta
+
+        Raises:
+            OSError: Se a pasta não puder ser lida
+        """
+        _, root = self._root_for(path)
+        # stat antes da listagem: uma mudança no meio do caminho deixa o
+        # mtime gravado desatualizado e força nova listagem depois
+        dir_stat = os.stat(path)
+        index = self.index
+
+        cached = None
+        if reuse and index is not None:
+            cached = index.lookup(path, dir_stat.st_mtime_ns, dir_stat.st_ino)
+        if cached is not None:
+            # Os maiores arquivos podem ter crescido sem mudar a pasta
+            own = cached.total_bytes
+            entries = []
+            for old in cached.top:
+                try:
+                    file_stat = os.stat(old[1], follow_symlinks=False)
+                except OSError:
+                    own -= old[0]
+                    continue
+                size = file_stat.st_size
+                allocated = allocated_bytes(file_stat)
+                key = allocated if self.rank_by == "allocated" else size
+                own += key - old[0]
+                entries.append((key, old[1], file_stat.st_mtime, size, allocated))
+            entries.sort(reverse=True)
+            children = [os.path.join(path, name) for name in cached.subdirs]
+            return own, children, entries, dir_stat
+
+        listing = _scan_directory(
+            path,
+            root.rules,
+            self.min_size_bytes,
+            self.max_files,
+            self.min_size_bytes,
+            device=root.device,
+            rank_by=self.rank_by,
+        )
+        entries = listing.top.entries()
+        if index is not None:
+            index.store(
+                path,
+                dir_stat.st_mtime_ns,
+                dir_stat.st_ino,
+                [os.path.basename(d) for d in listing.subdirs],
+                entries,
+                listing.files,
+                listing.large,
+                listing.total_bytes,
+                listing.hardlinks,
+            )
+        return listing.total_bytes, listing.subdirs, entries, dir_stat
+
+    def _walk(self, paths: List[str], reuse: bool = False) -> None:
+        """Indexa e monitora as subárvores de ``paths`` (pais já indexados)."""
+
+        def visit(path: str) -> List[str]:
+            # Watch antes da listagem: nada que mude depois dela se perde
+            self._watch(path)
+            try:
+                own, children, entries, dir_stat = self._list(path, reuse)
+            except OSError as e:
+                if path in self._roots:
+                    logger.error(f"Erro ao acessar {path}: {e}")
+                self._unwatch(path)
+                return []
+
+            parent = None if path in self._roots else os.path.dirname(path)
+            if not self.live.add(
+                path,
+                parent,
+                own,
+                children,
+                entries,
+                dir_stat.st_mtime_ns,
+                dir_stat.st_ino,
+            ):
+                self._unwatch(path)
+                if self.live.skipped and not self._memory_logged:
+                    self._memory_logged = True
+                    logger.warning(
+                        f"Limite de memória de "
+                        f"{self.live.memory_limit / 1024**2:g} MB atingido: "
+                        "pastas novas deixam de ser indexadas e as consultas "
+                        "passam a ser parciais"
+                    )
+                return []
+            return children
+
+        if self.workers > 1:
+            _run_directory_queue(paths, self.workers, visit)
+        else:
+            stack = list(reversed(paths))
+            while stack:
+                stack.extend(reversed(visit(stack.pop())))
+
+    def _refresh(self, path: str) -> None:
+        """Lista de novo uma pasta suja e aplica a diferença."""
+        if path not in self.live:
+            return
+        try:
+            own, children, entries, dir_stat = self._list(path, reuse=False)
+        except OSError:
+            self._remove(path)
+            return
+
+        added, removed = self.live.update(
+            path, own, children, entries, dir_stat.st_mtime_ns, dir_stat.st_ino
+        )
+        self.updates += 1
+        for child in removed:
+            self._remove(child)
+        if added:
+            self._walk(added)
+
+    def _remove(self, path: str) -> None:
+        for removed in self.live.remove(path):
+            self._unwatch(removed)
+        if self.index is not None:
+            self.index.remove(path)
+
+    # Detecção de mudanças
+
+    def _watch(self, path: str) -> None:
+        with self._cond:
+            if self._inotify is None or self.watch_limit_reached:
+                self._polled.add(path)
+                return
+            try:
+                wd = self._inotify.add(path)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    self.watch_limit_reached = True
+                    logger.warning(
+                        "Limite de watches do inotify atingido "
+                        "(fs.inotify.max_user_watches): as pastas restantes "
+                        f"serão verificadas por polling a cada "
+                        f"{self.poll_interval:g}s"
+                    )
+                self._polled.add(path)
+                return
+            # Uma pasta movida mantém o mesmo wd: o caminho novo substitui o antigo
+            self._watches[path] = wd
+            self._paths_by_wd[wd] = path
+
+    def _unwatch(self, path: str) -> None:
+        with self._cond:
+            self._polled.discard(path)
+            wd = self._watches.pop(path, None)
+            if wd is None or self._paths_by_wd.get(wd) != path:
+                return
+            del self._paths_by_wd[wd]
+            if self._inotify is not None:
+                self._inotify.remove(wd)
+
+    def _mark_dirty(self, paths: Iterable[str]) -> None:
+        """Marca pastas para nova listagem (chamado sob ``self._cond``)."""
+        now = time.monotonic()
+        for path in paths:
+            self._dirty.add(path)
+        if self._dirty:
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._cond.notify_all()
+
+    def _take_batch(self, now: float) -> Tuple[List[str], bool]:
+        """Retira as pastas sujas se a rajada terminou (sob ``self._cond``)."""
+        if self._resync:
+            self._resync = False
+            self._dirty.clear()
+            self._first_event = None
+            return [], True
+        if not self._dirty:
+            return [], False
+        if (
+            now - self._last_event < self.debounce
+            and now - self._first_event < self.max_delay
+        ):
+            return [], False
+        # Ordenadas: pais antes dos filhos, e uma pasta removida junto com
+        # o pai é ignorada quando chegar a vez dela
+        batch = sorted(self._dirty)
+        self._dirty.clear()
+        self._first_event = None
+        return batch, False
+
+    def _read_events(self) -> None:
+        inotify = self._inotify
+        while not self._stop.is_set() and inotify is not None:
+            try:
+                events = inotify.read(0.5)
+            except OSError as e:
+                logger.error(f"Falha ao ler eventos do inotify: {e}")
+                return
+            if not events:
+                continue
+            with self._cond:
+                dirty = []
+                for wd, mask in events:
+                    if mask & _IN_Q_OVERFLOW:
+                        self._resync = True
+                        self._cond.notify_all()
+                        continue
+                    path = self._paths_by_wd.get(wd)
+                    if path is None:
+                        continue
+                    if mask & _IN_IGNORED:
+                        # Watch removido pelo kernel (pasta apagada)
+                        del self._paths_by_wd[wd]
+                        if self._watches.get(path) == wd:
+                            del self._watches[path]
+                        continue
+                    dirty.append(path)
+                self._mark_dirty(dirty)
+
+    def _poll(self) -> None:
+        """Verifica por mtime as pastas sem watch."""
+        with self._cond:
+            polled = list(self._polled)
+        if not polled:
+            return
+        changed = []
+        for path in polled:
+            state = self.live.state(path)
+            if state is None:
+                continue
+            mtime_ns, inode, entries = state
+            try:
+                dir_stat = os.stat(path)
+            except OSError:
+                changed.append(path)
+                continue
+            if dir_stat.st_mtime_ns != mtime_ns or dir_stat.st_ino != inode:
+                changed.append(path)
+                continue
+            # Arquivos que crescem no lugar não mudam o mtime da pasta
+            for entry in entries:
+                try:
+                    file_stat = os.stat(entry[1], follow_symlinks=False)
+                except OSError:
+                    changed.append(path)
+                    break
+                if file_stat.st_size != entry[3]:
+                    changed.append(path)
+                    break
+        if changed:
+            with self._cond:
+                self._mark_dirty(changed)
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Uma consulta JSON por linha; responde ``{'ok': ..., 'result'|'error'}``."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                result = self.server.daemon.query(json.loads(line))
+                response = {"ok": True, "result": result}
+            except (ValueError, TypeError, AttributeError) as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(
+                json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+            )
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class _QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: str, daemon: WatchDaemon) -> None:
+            self.daemon = daemon
+            super().__init__(path, _QueryHandler)
+
+
+def serve_queries(daemon: WatchDaemon, socket_path: str = DEFAULT_SOCKET) -> Any:
+    """Atende consultas ao daemon num socket Unix, numa thread própria.
+
+    O socket é criado só com permissão para o dono (os caminhos indexados
+    podem ser sensíveis); um socket antigo no mesmo caminho é substituído.
+
+    Args:
+        daemon: Daemon consultado
+        socket_path: Caminho do socket (padrão: 'disk_analyzer.sock')
+
+    Returns:
+        O servidor; chame ``shutdown()`` e ``server_close()`` para parar
+
+    Raises:
+        OSError: Se o sistema não tiver sockets Unix
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError(errno.ENOTSUP, "Sockets Unix não suportados neste sistema")
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+    old_umask = os.umask(0o177)
+    try:
+        server = _QueryServer(socket_path, daemon)
+    finally:
+        os.umask(old_umask)
+    thread = threading.Thread(
+        target=server.serve_forever, name="watch-queries", daemon=True
+    )
+    thread.start()
+    return server
+
+
+def query(
+    request: Dict[str, Any], socket_path: str = DEFAULT_SOCKET, timeout: float = 10.0
+) -> Any:
+    """Envia uma consulta a um daemon em execução (ver ``WatchDaemon.query``).
+
+    Raises:
+        OSError: Se não houver daemon escutando em ``socket_path``
+        ValueError: Se o daemon recusar a consulta
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if not response["ok"]:
+        raise ValueError(response["error"])
+    return response["result"]
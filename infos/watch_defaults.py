@@ -0,0 +1,11 @@
+"""Valores padrão do daemon de monitoramento (``infos.watch``).
+
+Ficam num módulo sem dependências para que o parser da linha de comando
+possa mostrá-los sem importar o daemon (e, com ele, o escaneamento).
+"""
+
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_POLL_INTERVAL = 60.0
+DEFAULT_MEMORY_MB = 512
+DEFAULT_SOCKET = "disk_analyzer.sock"
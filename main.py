@@ -1,62 +1,1055 @@
 """Disk Analyzer - Ponto de Entrada Principal.
 
 Este é o ponto de entrada principal para executar o Analisador de Discos.
-Execute este script para iniciar a análise de discos e arquivos grandes.
+Sem argumentos, inicia o fluxo interativo; com argumentos, roda em modo
+não interativo (batch), próprio para cron e orquestração.
 
 Usage:
     $ python main.py
+    $ python main.py --mountpoint /dados --min-size-gb 2 --max-files 100
+    $ disk-analyzer --all --full --workers 8 --formats csv,json
+    $ disk-analyzer disks --json
+    $ disk-analyzer serve --port 8765 --max-scans 2
+
+Os módulos de escaneamento e de relatórios só são importados pelas
+funções que os usam, para que ``disks`` (chamado a cada minuto pelo
+monitoramento) não pague por eles.
 """
 
+import argparse
 import logging
+import sys
 import traceback
+from typing import Any, Dict, List, Optional
 
-from analyzer.disk_analyzer import analyzer
+from infos.logs import setup_logging
 
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
-)
 logger = logging.getLogger(__name__)
 
+REPORT_FORMATS = ("txt", "csv", "json", "columnar", "bundle")
+
+
+def build_disks_parser() -> argparse.ArgumentParser:
+    """Cria o parser do subcomando ``disks``."""
+    parser = argparse.ArgumentParser(
+        prog="disk-analyzer disks",
+        description=(
+            "Lista os discos (a mesma seleção do escaneamento) sem escanear "
+            "nada e sem carregar o escaneamento."
+        ),
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="imprime a tabela em JSON (formato de get_all_disks)",
+    )
+    parser.add_argument(
+        "--include-fstype",
+        action="append",
+        default=[],
+        metavar="TIPO",
+        help="inclui um tipo de sistema de arquivos virtual/remoto normalmente "
+        "ignorado, ex: nfs4 (repetível)",
+    )
+    parser.add_argument(
+        "--no-dedupe",
+        dest="dedupe",
+        action="store_false",
+        help="mantém bind mounts e montagens repetidas do mesmo dispositivo",
+    )
+    return parser
+
+
+def run_disks(argv: List[str]) -> int:
+    """Subcomando ``disks``: imprime a tabela de discos, em texto ou JSON.
+
+    Só importa ``infos.disks`` (biblioteca padrão, no Linux), então roda
+    em poucos milissegundos.
+
+    Args:
+        argv: Argumentos após ``disks``
+
+    Returns:
+        Código de saída: 0 se algum disco foi encontrado, senão 1
+    """
+    from infos.disks import get_all_disks
+
+    args = build_disks_parser().parse_args(argv)
+    disks = get_all_disks(args.include_fstype, args.dedupe)
+
+    if args.json:
+        import json
+
+        json.dump(disks, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(
+            f"{'Disco':<24} {'Montagem':<24} {'Tipo':<8} {'Total (GB)':>11} "
+            f"{'Usado (GB)':>11} {'Livre (GB)':>11} {'Uso':>6}"
+        )
+        for disk in disks:
+            print(
+                f"{disk['drive']:<24} {disk['mountpoint']:<24} "
+                f"{disk['fstype']:<8} {disk['total_gb']:>11.2f} "
+                f"{disk['used_gb']:>11.2f} {disk['free_gb']:>11.2f} "
+                f"{disk['percent']:>5.1f}%"
+            )
+    return 0 if disks else 1
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    """Cria o parser do subcomando ``serve``."""
+    from analyzer.server import (
+        DEFAULT_CACHE_SIZE,
+        DEFAULT_CACHE_TTL,
+        DEFAULT_HOST,
+        DEFAULT_MAX_SCANS,
+        DEFAULT_PORT,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="disk-analyzer serve",
+        description=(
+            "Serviço HTTP/JSON local: recebe pedidos de escaneamento em "
+            "POST /scans, roda-os numa fila com limite de concorrência e "
+            "guarda os resultados recentes em cache."
+        ),
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=(
+            f"endereço de escuta (padrão: {DEFAULT_HOST}); a API não tem "
+            "autenticação, evite expô-la na rede"
+        ),
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"porta (padrão: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--max-scans",
+        type=int,
+        default=DEFAULT_MAX_SCANS,
+        metavar="N",
+        help=(
+            "escaneamentos simultâneos; os demais esperam na fila "
+            f"(padrão: {DEFAULT_MAX_SCANS})"
+        ),
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        metavar="SEGUNDOS",
+        help=(
+            "validade de um resultado para pedidos idênticos "
+            f"(padrão: {DEFAULT_CACHE_TTL:g})"
+        ),
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        metavar="N",
+        help=f"resultados guardados (padrão: {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=[],
+        metavar="CAMINHO",
+        help="só aceita escaneamentos dentro desta pasta (repetível)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        metavar="N",
+        help="maior 'workers' aceito num pedido (padrão: 8)",
+    )
+    return parser
+
+
+def run_serve(argv: List[str]) -> int:
+    """Subcomando ``serve``: atende a API HTTP até Ctrl+C ou SIGTERM.
+
+    Args:
+        argv: Argumentos após ``serve``
+
+    Returns:
+        Código de saída (0 ao encerrar normalmente)
+    """
+    import signal
+    import threading
+
+    from analyzer.server import ScanService, serve_http
 
-def main() -> None:
+    args = build_serve_parser().parse_args(argv)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    service = ScanService(
+        max_scans=args.max_scans,
+        cache_ttl=args.cache_ttl,
+        cache_size=args.cache_size,
+        allowed_roots=args.allow or None,
+        max_workers=args.max_workers,
+    )
+    server = serve_http(service, args.host, args.port)
+    host, port = server.server_address[:2]
+    logger.info(
+        f"API em http://{host}:{port} (até {service.max_scans} escaneamento(s))"
+    )
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        # Para os escaneamentos em curso ao fim da pasta atual de cada um
+        service.close()
+    logger.info("Serviço encerrado")
+    return 0
+
+
+def _filter_expression(text: str) -> str:
+    """Valida uma expressão de ``--filter`` já na leitura dos argumentos."""
+    from infos.filters import FileFilter
+
+    try:
+        FileFilter([text])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return text
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o parser de argumentos do modo não interativo."""
+    from infos.checkpoint import DEFAULT_CHECKPOINT_DIR, DEFAULT_CHECKPOINT_INTERVAL
+    from infos.index import DEFAULT_INDEX_FILE
+    from infos.snapshot import DEFAULT_SNAPSHOT_DIR, DEFAULT_SNAPSHOT_KEEP
+    from infos.watch_defaults import (
+        DEFAULT_DEBOUNCE,
+        DEFAULT_MEMORY_MB,
+        DEFAULT_POLL_INTERVAL,
+        DEFAULT_SOCKET,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="disk-analyzer",
+        description=(
+            "Analisador de discos e arquivos grandes. Sem argumentos, "
+            "inicia o modo interativo."
+        ),
+        epilog=(
+            "disk-analyzer disks [--json] lista apenas a tabela de discos, "
+            "sem escanear (ver disk-analyzer disks --help). "
+            "disk-analyzer serve inicia o serviço HTTP/JSON local de "
+            "escaneamentos (ver disk-analyzer serve --help)."
+        ),
+    )
+
+    target = parser.add_argument_group("alvos")
+    target.add_argument(
+        "-m",
+        "--mountpoint",
+        action="append",
+        dest="mountpoints",
+        metavar="CAMINHO",
+        help="ponto de montagem ou diretório a escanear (repetível)",
+    )
+    target.add_argument(
+        "--all",
+        action="store_true",
+        help="escaneia todos os discos (padrão quando nenhum -m é informado)",
+    )
+    target.add_argument(
+        "--include-fstype",
+        action="append",
+        default=[],
+        metavar="TIPO",
+        help="inclui um tipo de sistema de arquivos virtual/remoto normalmente "
+        "ignorado, ex: nfs4 (repetível)",
+    )
+
+    scan = parser.add_argument_group("escaneamento")
+    mode = scan.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--fast",
+        dest="fast_mode",
+        action="store_true",
+        default=True,
+        help="modo rápido: ignora pastas de usuário (padrão)",
+    )
+    mode.add_argument(
+        "--full",
+        dest="fast_mode",
+        action="store_false",
+        help="modo completo: escaneia todas as pastas",
+    )
+    scan.add_argument(
+        "--min-size-gb",
+        type=float,
+        default=None,
+        metavar="GB",
+        help="tamanho mínimo dos arquivos (padrão: 1.0 no rápido, 0.5 no completo)",
+    )
+    scan.add_argument(
+        "--max-files",
+        type=int,
+        default=50,
+        metavar="N",
+        help="quantidade máxima de arquivos por disco (padrão: 50)",
+    )
+    scan.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="total de threads de escaneamento (padrão: 1)",
+    )
+    scan.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reaproveita pastas inalteradas a partir do índice persistente",
+    )
+    scan.add_argument(
+        "--index-file",
+        default=DEFAULT_INDEX_FILE,
+        metavar="ARQUIVO",
+        help=f"arquivo do índice incremental (padrão: {DEFAULT_INDEX_FILE})",
+    )
+    scan.add_argument(
+        "--duplicates",
+        action="store_true",
+        help="procura duplicados entre os arquivos encontrados",
+    )
+    scan.add_argument(
+        "--rank-by",
+        choices=["apparent", "allocated"],
+        default="apparent",
+        help="ordena pelo tamanho aparente ou pelo espaço ocupado em disco "
+        "(padrão: apparent)",
+    )
+    scan.add_argument(
+        "--cross-mounts",
+        action="store_true",
+        help="atravessa pontos de montagem dentro de cada disco "
+        "(padrão: fica no mesmo sistema de arquivos, como du -x)",
+    )
+    scan.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PADRÃO",
+        help="pasta a ignorar: nome, glob (*.cache), caminho ancorado "
+        "(/var/lib/docker) ou negação (!bin) (repetível)",
+    )
+    scan.add_argument(
+        "--rules-file",
+        metavar="ARQUIVO",
+        help="arquivo com padrões de exclusão, um por linha",
+    )
+    scan.add_argument(
+        "--filter",
+        action="append",
+        type=_filter_expression,
+        default=[],
+        metavar="EXPR",
+        help=(
+            "só arquivos que satisfazem a expressão: ext=log,dump, "
+            "name=core.*, path=/var/log, size>10G, mtime>90d (mais antigo), "
+            "atime<7d (mais recente), uid=1000, owner=root; != nega. "
+            "Repetível: todas precisam valer. Nome e caminho são testados "
+            "antes do stat"
+        ),
+    )
+    scan.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SEGUNDOS",
+        help=(
+            "escaneamento aproximado com prazo: visita primeiro as pastas "
+            "maiores (pelo snapshot anterior, com --snapshot) e, no fim do "
+            "prazo, relata o melhor top-N e a cobertura estimada"
+        ),
+    )
+    scan.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="grava periodicamente o progresso de cada disco para retomar "
+        "depois de uma interrupção",
+    )
+    scan.add_argument(
+        "--resume",
+        action="store_true",
+        help="continua do checkpoint de uma execução interrompida (implica "
+        "--checkpoint)",
+    )
+    scan.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIR,
+        metavar="PASTA",
+        help=f"pasta dos checkpoints (padrão: {DEFAULT_CHECKPOINT_DIR})",
+    )
+    scan.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=DEFAULT_CHECKPOINT_INTERVAL,
+        metavar="SEGUNDOS",
+        help="intervalo entre checkpoints (padrão: 60)",
+    )
+    scan.add_argument(
+        "--checkpoint-dirs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="também grava um checkpoint a cada N pastas (padrão: 0, desativado)",
+    )
+
+    nice = parser.add_argument_group("baixa prioridade")
+    nice.add_argument(
+        "--nice",
+        action="store_true",
+        help="roda com prioridade ociosa de I/O e de CPU",
+    )
+    nice.add_argument(
+        "--max-dirs-per-sec",
+        type=float,
+        metavar="N",
+        help="limita as pastas listadas por segundo",
+    )
+    nice.add_argument(
+        "--max-stats-per-sec",
+        type=float,
+        metavar="N",
+        help="limita as chamadas stat (arquivos examinados) por segundo",
+    )
+    nice.add_argument(
+        "--max-load",
+        type=float,
+        metavar="CARGA",
+        help="pausa enquanto a carga média de 1 minuto por CPU passar deste valor",
+    )
+    nice.add_argument(
+        "--max-disk-busy",
+        type=float,
+        metavar="PCT",
+        help="pausa enquanto um dos discos escaneados estiver mais ocupado que "
+        "isso (%%)",
+    )
+
+    watch = parser.add_argument_group("monitoramento")
+    watch.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "daemon: escaneia os alvos uma vez, mantém o índice atualizado "
+            "por inotify (ou polling) e atende consultas em --watch-socket "
+            "até Ctrl+C/SIGTERM; o índice em disco é o de --index-file"
+        ),
+    )
+    watch.add_argument(
+        "--watch-socket",
+        default=DEFAULT_SOCKET,
+        metavar="CAMINHO",
+        help=f"socket Unix das consultas (padrão: {DEFAULT_SOCKET})",
+    )
+    watch.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SEGUNDOS",
+        help=(
+            "espera sem eventos antes de relistar as pastas alteradas "
+            f"(padrão: {DEFAULT_DEBOUNCE:g})"
+        ),
+    )
+    watch.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar="SEGUNDOS",
+        help=(
+            "intervalo do polling das pastas sem inotify "
+            f"(padrão: {DEFAULT_POLL_INTERVAL:g})"
+        ),
+    )
+    watch.add_argument(
+        "--memory-mb",
+        type=float,
+        default=DEFAULT_MEMORY_MB,
+        metavar="MB",
+        help=f"memória máxima estimada do índice (padrão: {DEFAULT_MEMORY_MB})",
+    )
+    watch.add_argument(
+        "--query",
+        nargs="+",
+        metavar=("TIPO", "CAMINHO"),
+        help=(
+            "consulta um daemon em execução e imprime JSON: top-files, "
+            "top-dirs (até --max-files itens), size CAMINHO ou status"
+        ),
+    )
+
+    history = parser.add_argument_group("histórico")
+    history.add_argument(
+        "--snapshot",
+        action="store_true",
+        help=(
+            "grava um snapshot da execução e compara com o anterior de mesmos "
+            "parâmetros: o que cresceu, surgiu, diminuiu ou sumiu"
+        ),
+    )
+    history.add_argument(
+        "--snapshot-dir",
+        default=DEFAULT_SNAPSHOT_DIR,
+        metavar="PASTA",
+        help=f"pasta dos snapshots (padrão: {DEFAULT_SNAPSHOT_DIR})",
+    )
+    history.add_argument(
+        "--snapshot-keep",
+        type=int,
+        default=DEFAULT_SNAPSHOT_KEEP,
+        metavar="N",
+        help=(
+            "snapshots mantidos por conjunto de parâmetros; os mais antigos "
+            f"são apagados, 0 mantém todos (padrão: {DEFAULT_SNAPSHOT_KEEP})"
+        ),
+    )
+    history.add_argument(
+        "--diff-output",
+        default="relatorio_diferencas.csv",
+        metavar="ARQUIVO",
+        help="CSV das diferenças (padrão: relatorio_diferencas.csv)",
+    )
+    history.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("ANTIGO", "NOVO"),
+        help="apenas compara dois snapshots existentes e grava o CSV das diferenças",
+    )
+
+    fleet = parser.add_argument_group("frota")
+    fleet.add_argument(
+        "--merge-bundles",
+        nargs="+",
+        metavar="CAMINHO",
+        help=(
+            "apenas consolida bundles de vários hosts (arquivos ou pastas) "
+            "nos relatórios da frota, sem escanear nada"
+        ),
+    )
+    fleet.add_argument(
+        "--fleet-txt-output",
+        default="relatorio_frota.txt",
+        metavar="ARQUIVO",
+        help="relatório TXT da frota (padrão: relatorio_frota.txt)",
+    )
+    fleet.add_argument(
+        "--fleet-csv-output",
+        default="relatorio_frota.csv",
+        metavar="ARQUIVO",
+        help="relatório CSV da frota (padrão: relatorio_frota.csv)",
+    )
+
+    output = parser.add_argument_group("saída")
+    output.add_argument(
+        "--formats",
+        default="txt,csv",
+        metavar="LISTA",
+        help=(
+            "formatos separados por vírgula: txt, csv, json, columnar, "
+            "bundle (padrão: txt,csv)"
+        ),
+    )
+    output.add_argument(
+        "--txt-output",
+        default="relatorio_discos.txt",
+        metavar="ARQUIVO",
+        help="relatório TXT (padrão: relatorio_discos.txt)",
+    )
+    output.add_argument(
+        "--csv-output",
+        default="relatorio_arquivos.csv",
+        metavar="ARQUIVO",
+        help="relatório CSV (padrão: relatorio_arquivos.csv)",
+    )
+    output.add_argument(
+        "--json-output",
+        default="relatorio.json",
+        metavar="ARQUIVO",
+        help="relatório JSON, '-' para a saída padrão (padrão: relatorio.json)",
+    )
+    output.add_argument(
+        "--columnar-output",
+        default="relatorio_arquivos.parquet",
+        metavar="ARQUIVO",
+        help=(
+            "exportação colunar: .parquet ou .arrow (requer pyarrow; sem ele, "
+            "grava .dacol ao lado) ou qualquer outra extensão para o formato "
+            "próprio (padrão: relatorio_arquivos.parquet)"
+        ),
+    )
+    output.add_argument(
+        "--bundle-output",
+        metavar="ARQUIVO",
+        help=(
+            "bundle do host para consolidação com --merge-bundles "
+            "(padrão: <hostname>.bundle.jsonl.gz)"
+        ),
+    )
+    output.add_argument(
+        "--histograms",
+        action="store_true",
+        help=(
+            "inclui nos relatórios TXT/CSV/JSON a distribuição de todos os "
+            "arquivos por tamanho, idade e extensão (com --incremental, o "
+            "índice é gravado mas não consultado)"
+        ),
+    )
+    output.add_argument(
+        "--stream",
+        metavar="ARQUIVO",
+        help=(
+            "grava cada arquivo encontrado imediatamente (.jsonl ou .csv); "
+            "os relatórios TXT/CSV passam a ser gerados a partir dele"
+        ),
+    )
+    output.add_argument(
+        "--flush-interval",
+        type=float,
+        default=5.0,
+        metavar="SEGUNDOS",
+        help="intervalo máximo entre flush+fsync do stream (padrão: 5)",
+    )
+    output.add_argument(
+        "--finalize-stream",
+        metavar="ARQUIVO",
+        help="apenas gera os relatórios TXT/CSV a partir de um stream existente",
+    )
+    output.add_argument(
+        "--metrics",
+        action="store_true",
+        help=(
+            "instrumenta o escaneamento e registra no log pastas/s, tempo "
+            "por etapa, erros por errno e as pastas mais lentas"
+        ),
+    )
+    output.add_argument(
+        "--metrics-json",
+        metavar="ARQUIVO",
+        help="grava as métricas em JSON, '-' para a saída padrão (implica --metrics)",
+    )
+    output.add_argument(
+        "--prometheus-textfile",
+        metavar="ARQUIVO",
+        help=(
+            "grava as métricas no formato do Prometheus para o textfile "
+            "collector do node_exporter (implica --metrics)"
+        ),
+    )
+    output.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="exibe apenas avisos e erros no log",
+    )
+    return parser
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Executa o modo não interativo a partir dos argumentos.
+
+    Args:
+        args: Argumentos já interpretados por ``build_parser``
+
+    Returns:
+        Código de saída: 0 em caso de sucesso, 1 se algum disco falhar
+    """
+    import time
+    from contextlib import redirect_stdout
+
+    from analyzer.disk_analyzer import run_scan, write_reports
+    from generators.fleet import write_bundle
+    from generators.main import generate_diff_csv, generate_json_report
+    from generators.stream import StreamSink, finalize_stream
+    from infos.disks import get_all_disks, get_disk_for_path
+    from infos.filters import FileFilter
+    from infos.rules import load_rules_file
+    from infos.snapshot import diff_snapshots, snapshot_meta, summarize_diff
+    from infos.throttle import Throttle, disk_names, set_idle_priority
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Formato(s) desconhecido(s): {', '.join(unknown)}")
+
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    if args.diff:
+        old_path, new_path = args.diff
+        diff = summarize_diff(diff_snapshots(old_path, new_path), args.max_files)
+        diff["old"] = snapshot_meta(old_path)
+        diff["new"] = snapshot_meta(new_path)
+        if diff["old"]["scope"] != diff["new"]["scope"]:
+            logger.warning(
+                "Snapshots com parâmetros diferentes: a comparação é parcial"
+            )
+        generate_diff_csv(diff, args.diff_output)
+        return 0
+
+    if args.merge_bundles:
+        return _run_merge(args, formats)
+
+    if args.query:
+        return _run_query(args)
+
+    if args.mountpoints and not args.all:
+        disks = [get_disk_for_path(path) for path in args.mountpoints]
+    else:
+        disks = get_all_disks(args.include_fstype)
+
+    exclude = list(args.exclude)
+    if args.rules_file:
+        exclude.extend(load_rules_file(args.rules_file))
+    file_filter = FileFilter(args.filter)
+
+    min_size = args.min_size_gb
+    if min_size is None:
+        min_size = 1.0 if args.fast_mode else 0.5
+
+    if args.finalize_stream:
+        count = finalize_stream(
+            args.finalize_stream,
+            disks,
+            txt_file=args.txt_output if "txt" in formats else None,
+            csv_file=args.csv_output if "csv" in formats else None,
+            rank_by=args.rank_by,
+            columnar_file=args.columnar_output if "columnar" in formats else None,
+            filters=file_filter.expressions,
+            limit_per_disk=args.max_files,
+        )
+        logger.info(f"{count} arquivo(s) recuperado(s) de {args.finalize_stream}")
+        return 0
+
+    if args.nice:
+        applied = set_idle_priority()
+        logger.info(f"Prioridade reduzida: {', '.join(applied) or 'não suportado'}")
+
+    if args.watch:
+        if file_filter:
+            logger.warning("--filter não se aplica ao monitoramento (--watch)")
+        return _run_watch(args, disks, min_size, exclude)
+
+    throttle = None
+    if any(
+        value is not None
+        for value in (
+            args.max_dirs_per_sec,
+            args.max_stats_per_sec,
+            args.max_load,
+            args.max_disk_busy,
+        )
+    ):
+        throttle = Throttle(
+            args.max_dirs_per_sec,
+            args.max_stats_per_sec,
+            args.max_load,
+            args.max_disk_busy,
+            disks=disk_names(disk["drive"] for disk in disks),
+        )
+
+    collect_metrics = bool(
+        args.metrics or args.metrics_json or args.prometheus_textfile
+    )
+
+    sink = None
+    if args.stream:
+        # Ao retomar, os achados anteriores ao checkpoint já estão no stream
+        sink = StreamSink(
+            args.stream, flush_interval=args.flush_interval, append=args.resume
+        )
+
+    try:
+        result = run_scan(
+            disks,
+            min_size,
+            args.max_files,
+            args.fast_mode,
+            max(1, args.workers),
+            index_path=args.index_file if args.incremental else None,
+            check_duplicates=args.duplicates,
+            on_match=sink.write if sink is not None else None,
+            exclude=exclude,
+            one_filesystem=not args.cross_mounts,
+            rank_by=args.rank_by,
+            collect_metrics=collect_metrics,
+            checkpoint_dir=(
+                args.checkpoint_dir if args.checkpoint or args.resume else None
+            ),
+            resume=args.resume,
+            checkpoint_interval=args.checkpoint_interval,
+            checkpoint_dirs=args.checkpoint_dirs,
+            throttle=throttle,
+            snapshot_dir=args.snapshot_dir if args.snapshot else None,
+            snapshot_keep=args.snapshot_keep,
+            time_budget=args.time_budget,
+            file_filter=file_filter,
+            histograms=args.histograms,
+        )
+    except KeyboardInterrupt:
+        if sink is not None:
+            # Resultados parciais já estão no disco: gera os relatórios
+            sink.close()
+            logger.warning("Escaneamento interrompido: gerando relatórios parciais")
+            finalize_stream(
+                args.stream,
+                disks,
+                txt_file=args.txt_output if "txt" in formats else None,
+                csv_file=args.csv_output if "csv" in formats else None,
+                rank_by=args.rank_by,
+                columnar_file=args.columnar_output if "columnar" in formats else None,
+                filters=file_filter.expressions,
+                limit_per_disk=args.max_files,
+            )
+        raise
+    finally:
+        if sink is not None:
+            sink.close()
+
+    json_to_stdout = "json" in formats and args.json_output == "-"
+    # Com JSON na saída padrão, as mensagens dos geradores vão para stderr
+    with redirect_stdout(sys.stderr if json_to_stdout else sys.stdout):
+        if sink is not None:
+            report_start = time.time()
+            finalize_stream(
+                args.stream,
+                result["disks"],
+                txt_file=args.txt_output if "txt" in formats else None,
+                csv_file=args.csv_output if "csv" in formats else None,
+                directories=result["directories"],
+                duplicates=result["duplicates"],
+                rank_by=args.rank_by,
+                diff=result["diff"],
+                coverage=result["coverage"],
+                columnar_file=args.columnar_output if "columnar" in formats else None,
+                filters=file_filter.expressions,
+                limit_per_disk=args.max_files,
+                histograms=result["histograms"],
+            )
+            if "csv" in formats and result["diff"] is not None:
+                generate_diff_csv(result["diff"], args.diff_output)
+            if collect_metrics:
+                result["metrics"]["phases"]["reports"] = time.time() - report_start
+        else:
+            write_reports(
+                result,
+                txt_file=args.txt_output if "txt" in formats else None,
+                csv_file=args.csv_output if "csv" in formats else None,
+                diff_csv_file=args.diff_output if "csv" in formats else None,
+                columnar_file=args.columnar_output if "columnar" in formats else None,
+            )
+        if "bundle" in formats:
+            write_bundle(result, args.bundle_output)
+    if "json" in formats:
+        generate_json_report(result, args.json_output)
+    if collect_metrics:
+        _emit_metrics(result["metrics"], args)
+
+    failed = [d for d in result["per_disk"] if d["error"] is not None]
+    return 1 if failed else 0
+
+
+def _run_merge(args: argparse.Namespace, formats: List[str]) -> int:
+    """Consolida os bundles de ``--merge-bundles`` nos relatórios da frota."""
+    from contextlib import redirect_stdout
+
+    from generators.fleet import (
+        generate_fleet_csv,
+        generate_fleet_report,
+        merge_bundles,
+    )
+    from generators.main import generate_json_report
+
+    fleet = merge_bundles(args.merge_bundles, args.max_files, args.rank_by)
+    if not fleet["hosts"]:
+        logger.error("Nenhum bundle válido encontrado")
+        return 1
+
+    json_to_stdout = "json" in formats and args.json_output == "-"
+    with redirect_stdout(sys.stderr if json_to_stdout else sys.stdout):
+        if "txt" in formats:
+            generate_fleet_report(fleet, args.fleet_txt_output)
+        if "csv" in formats:
+            generate_fleet_csv(fleet, args.fleet_csv_output)
+    if "json" in formats:
+        generate_json_report(fleet, args.json_output)
+    return 0
+
+
+def _run_query(args: argparse.Namespace) -> int:
+    """Envia ``--query`` ao daemon de ``--watch-socket`` e imprime a resposta."""
+    import json
+    import os
+
+    from infos.watch import QUERIES, query
+
+    kind, params = args.query[0], args.query[1:]
+    if kind not in QUERIES:
+        raise ValueError(f"Consulta desconhecida: {kind} (use {', '.join(QUERIES)})")
+    request = {"query": kind, "count": args.max_files}  # type: Dict[str, Any]
+    if kind == "size":
+        if len(params) != 1:
+            raise ValueError("Uso: --query size CAMINHO")
+        request["path"] = os.path.abspath(params[0])
+
+    result = query(request, args.watch_socket)
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0 if result is not None else 1
+
+
+def _run_watch(
+    args: argparse.Namespace,
+    disks: List[Dict[str, Any]],
+    min_size: float,
+    exclude: List[str],
+) -> int:
+    """Executa o daemon de ``--watch`` até Ctrl+C ou SIGTERM."""
+    import os
+    import signal
+    import threading
+
+    from infos.index import ScanIndex
+    from infos.watch import WatchDaemon, serve_queries
+
+    stop = threading.Event()
+    # systemd e afins param o serviço com SIGTERM: encerra como no Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    with ScanIndex(args.index_file) as index:
+        daemon = WatchDaemon(
+            [disk["mountpoint"] for disk in disks],
+            min_size,
+            args.max_files,
+            args.fast_mode,
+            exclude,
+            one_filesystem=not args.cross_mounts,
+            rank_by=args.rank_by,
+            index=index,
+            workers=max(1, args.workers),
+            debounce=args.debounce,
+            poll_interval=args.poll_interval,
+            memory_mb=args.memory_mb,
+        )
+        daemon.start()
+        server = serve_queries(daemon, args.watch_socket)
+        logger.info(f"Consultas em {args.watch_socket}")
+        try:
+            daemon.run(stop)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            server.server_close()
+            try:
+                os.unlink(args.watch_socket)
+            except FileNotFoundError:
+                pass
+            daemon.close()
+    logger.info("Monitoramento encerrado")
+    return 0
+
+
+def _emit_metrics(metrics: Dict[str, Any], args: argparse.Namespace) -> None:
+    """Registra as métricas no log e grava os arquivos pedidos."""
+    from generators.metrics import write_metrics_json, write_prometheus_textfile
+
+    phases = ", ".join(f"{k} {v:.2f}s" for k, v in metrics["phases"].items())
+    logger.info(
+        f"Métricas: {metrics['directories']} pastas, {metrics['entries']} "
+        f"entradas, {metrics['stat_calls']} stat | "
+        f"{metrics['directories_per_second']:.0f} pastas/s | {phases}"
+    )
+    if metrics["errors"]:
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(metrics["errors"].items()))
+        logger.info(f"Erros por errno: {errors}")
+    for slow in metrics["slowest_directories"]:
+        logger.info(f"Pasta lenta: {slow['seconds']:.3f}s {slow['path']}")
+
+    if args.metrics_json:
+        write_metrics_json(metrics, args.metrics_json)
+    if args.prometheus_textfile:
+        write_prometheus_textfile(metrics, args.prometheus_textfile)
+        logger.info(f"Métricas Prometheus salvas em: {args.prometheus_textfile}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Ponto de entrada principal do programa.
 
     Esta função é chamada quando o script é executado diretamente.
-    Ela inicia o processo completo de análise de discos, incluindo:
+    Sem argumentos, inicia o processo interativo de análise de discos:
     - Identificação de discos disponíveis
     - Seleção interativa pelo usuário
     - Escaneamento de arquivos grandes
     - Geração de relatórios TXT e CSV
 
+    Com argumentos (``--help`` lista todos), executa o mesmo fluxo sem
+    nenhuma pergunta, adequado para cron e orquestração.
+
+    Args:
+        argv: Argumentos da linha de comando (padrão: sys.argv[1:])
+
     Raises:
         KeyboardInterrupt: Se o usuário cancelar com Ctrl+C
         Exception: Qualquer erro durante a execução
 
     Returns:
-        None
+        Código de saída (0 sucesso, 1 erro, 130 cancelado)
 
     Example:
         Execute diretamente via terminal:
         >>> python main.py
+        >>> python main.py -m /dados --full --formats json --json-output -
 
     Note:
         Para melhor desempenho e acesso completo, execute como
         administrador no Windows ou com sudo no Linux/macOS.
     """
+    if argv is None:
+        argv = sys.argv[1:]
+    setup_logging()
+
     try:
-        analyzer()
+        if not argv:
+            from analyzer.disk_analyzer import analyzer
+
+            analyzer()
+            return 0
+        if argv[0] == "disks":
+            return run_disks(argv[1:])
+        if argv[0] == "serve":
+            return run_serve(argv[1:])
+        return run_batch(build_parser().parse_args(argv))
     except KeyboardInterrupt:
-        print("\n\n⚠ Operação cancelada pelo usuário.")
+        print("\n\n⚠ Operação cancelada pelo usuário.", file=sys.stderr)
         logger.warning("Operação cancelada pelo usuário")
+        return 130
     except Exception as e:
-        print(f"\n\n❌ Erro: {e}")
+        print(f"\n\n❌ Erro: {e}", file=sys.stderr)
         logger.error(f"Erro durante a execução: {e}", exc_info=True)
         traceback.print_exc()
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -42,6 +42,10 @@ setup(
     install_requires=[
         "psutil>=5.9.0",
     ],
+    extras_require={
+        "columnar": ["pyarrow"],
+        "histograms": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "disk-analyzer=main:main",